@@ -1,6 +1,6 @@
 from django.db import models
 from django.utils import timezone
-from core.models import BaseModel
+from core.models import BaseModel, GeohashModel
 
 
 class ContactInquiry(BaseModel):
@@ -71,7 +71,7 @@ class ContactInquiry(BaseModel):
         return f"{self.first_name} {self.last_name}"
 
 
-class OfficeLocation(BaseModel):
+class OfficeLocation(GeohashModel, BaseModel):
     """Office locations and contact information"""
     name = models.CharField(max_length=200)
     address = models.TextField()
@@ -103,6 +103,9 @@ class OfficeLocation(BaseModel):
         ordering = ['order', 'name']
         verbose_name = "Office Location"
         verbose_name_plural = "Office Locations"
+        indexes = [
+            models.Index(fields=['geohash'], name='office_location_geohash_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name}, {self.city}"
@@ -2,6 +2,7 @@ from rest_framework import generics, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
+from core.views import GeoFilterMixin
 from .models import ContactInquiry, OfficeLocation, ContactPerson, SocialMediaAccount
 from .serializers import (
     ContactInquirySerializer, OfficeLocationSerializer, 
@@ -46,7 +47,7 @@ class ContactInquiryCreateView(generics.CreateAPIView):
 
 
 
-class OfficeLocationsListView(generics.ListAPIView):
+class OfficeLocationsListView(GeoFilterMixin, generics.ListAPIView):
     """List all public office locations"""
     serializer_class = OfficeLocationSerializer
     queryset = OfficeLocation.objects.filter(is_public=True, is_active=True)
@@ -1,10 +1,29 @@
 from django.contrib import admin
+from . import segments
 from .models import (
     Organization, ImpactStatistic, TeamMember, Partner, 
     Testimonial, FAQ, SiteSettings
 )
 
 
+class InterestSegmentFilter(admin.SimpleListFilter):
+    """Filter a changelist by interest segment, listing the cached member counts"""
+    title = 'interest segment'
+    parameter_name = 'segment'
+    segment_source = None
+
+    def lookups(self, request, model_admin):
+        return [
+            (interest, f"{interest} ({members:,})")
+            for interest, members in segments.counts(self.segment_source).items()
+        ]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(id__in=segments.members(self.segment_source, [self.value()]))
+        return queryset
+
+
 @admin.register(Organization)
 class OrganizationAdmin(admin.ModelAdmin):
     list_display = ['name', 'email', 'phone', 'updated_at']
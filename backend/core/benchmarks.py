@@ -0,0 +1,29 @@
+"""Base for the ``bench_*`` management commands.
+
+Benchmarks seed and churn large numbers of rows. They run against a freshly
+migrated test database that is dropped afterwards, so an interrupted run
+cannot leave its data (or orphans of it) behind in the real database.
+"""
+import os
+import tempfile
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test.utils import setup_databases, teardown_databases
+
+
+class BenchmarkCommand(BaseCommand):
+    """A command whose ``handle()`` runs against a throwaway test database."""
+
+    def execute(self, *args, **options):
+        test_settings = connections['default'].settings_dict.setdefault('TEST', {})
+        if connections['default'].vendor == 'sqlite' and not test_settings.get('NAME'):
+            # The default in-memory SQLite test database is private to one connection; threaded benchmarks need a file
+            test_settings['NAME'] = os.path.join(tempfile.gettempdir(), 'keefa-benchmark.sqlite3')
+
+        self.stdout.write('Creating the benchmark database...')
+        old_config = setup_databases(verbosity=0, interactive=False, aliases={'default'})
+        try:
+            return super().execute(*args, **options)
+        finally:
+            teardown_databases(old_config, verbosity=0)
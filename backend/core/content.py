@@ -0,0 +1,219 @@
+"""Derived forms of CKEditor HTML, computed once when the content is saved.
+
+``process`` walks the HTML with the standard library parser and returns an
+allowlist-sanitized copy (headings get anchor ids), the plain text, word
+count, reading time, the heading outline and the first image. Models keep
+the results in stored columns (see ``core.models.ProcessedContentModel``)
+so requests never parse HTML.
+"""
+import math
+import re
+from html import escape
+from html.parser import HTMLParser
+from urllib.parse import urlparse
+
+from django.utils.text import slugify
+
+WORDS_PER_MINUTE = 200
+DERIVED_FIELDS = ['body_html', 'body_text', 'word_count', 'reading_minutes', 'outline', 'first_image']
+
+ALLOWED_TAGS = {
+    'p', 'br', 'hr', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'strong', 'b', 'em', 'i', 'u', 's', 'sub', 'sup',
+    'blockquote', 'ul', 'ol', 'li', 'a', 'img', 'figure', 'figcaption', 'table', 'thead', 'tbody', 'tfoot',
+    'tr', 'th', 'td', 'caption', 'code', 'pre', 'span', 'div', 'mark',
+}
+ALLOWED_ATTRIBUTES = {
+    'a': {'href', 'title', 'target'},
+    'img': {'src', 'alt', 'title', 'width', 'height'},
+    'th': {'colspan', 'rowspan', 'scope'},
+    'td': {'colspan', 'rowspan'},
+    'ol': {'start', 'reversed'},
+    '*': {'class'},
+}
+URL_ATTRIBUTES = {'href', 'src'}
+SAFE_SCHEMES = {'', 'http', 'https', 'mailto', 'tel'}
+# Dropped together with everything inside them
+DISCARDED_TAGS = {'script', 'style', 'iframe', 'object', 'embed', 'noscript', 'template', 'svg', 'math', 'form'}
+# Elements that never have content or an end tag
+VOID_TAGS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'param', 'source', 'track', 'wbr',
+}
+# Tags whose boundaries separate words in the plain text
+BLOCK_TAGS = {
+    'p', 'br', 'hr', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'blockquote', 'ul', 'ol', 'li', 'figure',
+    'figcaption', 'table', 'tr', 'th', 'td', 'caption', 'pre', 'div',
+}
+# An open tag that an opening tag implicitly closes, as in <li>one<li>two
+IMPLICITLY_CLOSED = {'li': {'li'}, 'p': {'p'}, 'tr': {'tr', 'td', 'th'}, 'td': {'td', 'th'}, 'th': {'td', 'th'}}
+HEADINGS = {'h1': 1, 'h2': 2, 'h3': 3, 'h4': 4, 'h5': 5, 'h6': 6}
+# Browsers trim these from URL attributes before reading the scheme (and drop tabs and newlines anywhere)
+URL_TRIMMED = ''.join(chr(code) for code in range(0x21))
+
+
+def safe_url(value):
+    value = value.strip(URL_TRIMMED)
+    try:
+        scheme = urlparse(re.sub(r'[\t\n\r]', '', value)).scheme.lower()
+    except ValueError:
+        return None
+    return value if scheme in SAFE_SCHEMES else None
+
+
+class ContentParser(HTMLParser):
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.html = []
+        self.text = []
+        self.open_tags = []
+        self.discarding = []
+        self.outline = []
+        self.anchors = set()
+        self.heading = None
+        self.first_image = ''
+
+    def handle_starttag(self, tag, attrs):
+        if self.discarding or tag in DISCARDED_TAGS:
+            if tag in DISCARDED_TAGS and tag not in VOID_TAGS:
+                self.discarding.append(tag)
+            return
+        if tag in BLOCK_TAGS:
+            self.text.append('\n')
+        if tag not in ALLOWED_TAGS:
+            return
+        while self.open_tags and self.open_tags[-1] in IMPLICITLY_CLOSED.get(tag, ()):
+            self.handle_endtag(self.open_tags[-1])
+
+        allowed = ALLOWED_ATTRIBUTES.get(tag, set()) | ALLOWED_ATTRIBUTES['*']
+        kept = []
+        for name, value in attrs:
+            if name not in allowed or value is None:
+                continue
+            if name in URL_ATTRIBUTES:
+                value = safe_url(value)
+                if value is None:
+                    continue
+            kept.append((name, value))
+        if tag == 'a' and any(name == 'target' for name, _ in kept):
+            kept.append(('rel', 'noopener noreferrer'))
+        if tag == 'img':
+            src = dict(kept).get('src')
+            if not src:
+                return
+            if not self.first_image:
+                self.first_image = src
+        if tag in HEADINGS:
+            # The id is filled in once the heading's text is known
+            self.heading = {'level': HEADINGS[tag], 'start': len(self.html), 'text_start': len(self.text)}
+
+        rendered = ''.join(f' {name}="{escape(value)}"' for name, value in kept)
+        self.html.append(f"<{tag}{rendered}>")
+        if tag not in VOID_TAGS:
+            self.open_tags.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        discarding = len(self.discarding)
+        self.handle_starttag(tag, attrs)
+        if len(self.discarding) > discarding:
+            # A self-closed <svg/> or <iframe/> has nothing inside to discard
+            self.discarding.pop()
+            return
+        if tag not in VOID_TAGS and self.open_tags and self.open_tags[-1] == tag:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if self.discarding:
+            if tag in self.discarding:
+                # An end tag can close over unclosed discarded tags, as in <svg><math></svg>
+                del self.discarding[len(self.discarding) - 1 - self.discarding[::-1].index(tag):]
+            return
+        if tag in BLOCK_TAGS:
+            self.text.append('\n')
+        if tag not in self.open_tags:
+            return
+        # Close anything left open inside this tag
+        while self.open_tags:
+            current = self.open_tags.pop()
+            if current in HEADINGS and self.heading:
+                self.finish_heading()
+            self.html.append(f"</{current}>")
+            if current == tag:
+                break
+
+    def finish_heading(self):
+        heading, self.heading = self.heading, None
+        title = ' '.join(''.join(self.text[heading['text_start']:]).split())
+        if not title:
+            return
+        anchor = base = slugify(title) or 'section'
+        suffix = 2
+        while anchor in self.anchors:
+            anchor, suffix = f"{base}-{suffix}", suffix + 1
+        self.anchors.add(anchor)
+        start = heading['start']
+        self.html[start] = self.html[start][:-1] + f' id="{anchor}">'
+        self.outline.append({'level': heading['level'], 'text': title, 'anchor': anchor})
+
+    def handle_data(self, data):
+        if self.discarding:
+            return
+        self.html.append(escape(data, quote=False))
+        self.text.append(data)
+
+    def close(self):
+        super().close()
+        # An unclosed <iframe> or <style> swallows the rest of the document, not the closing tags
+        self.discarding.clear()
+        while self.open_tags:
+            self.handle_endtag(self.open_tags[-1])
+
+
+def process(html):
+    """Sanitized HTML, plain text, word count, reading minutes, outline and first image of CKEditor HTML"""
+    parser = ContentParser()
+    parser.feed(html or '')
+    parser.close()
+    paragraphs = (' '.join(line.split()) for line in ''.join(parser.text).split('\n'))
+    text = '\n'.join(paragraph for paragraph in paragraphs if paragraph)
+    words = len(re.findall(r'\w+', text))
+    return {
+        'body_html': ''.join(parser.html),
+        'body_text': text,
+        'word_count': words,
+        'reading_minutes': math.ceil(words / WORDS_PER_MINUTE),
+        'outline': parser.outline,
+        'first_image': parser.first_image[:500],
+    }
+
+
+def process_rows(rows):
+    """[(pk, derived fields)] for a batch of (pk, html) rows; runs in backfill worker processes"""
+    return [(pk, process(html)) for pk, html in rows]
+
+
+def store(model, results):
+    """Write processed batches with one bulk_update, bypassing save() and its side effects"""
+    objs = []
+    for pk, derived in results:
+        obj = model(pk=pk)
+        for field, value in derived.items():
+            setattr(obj, field, value)
+        objs.append(obj)
+    model.objects.bulk_update(objs, DERIVED_FIELDS, batch_size=500)
+    return len(objs)
+
+
+def source_batches(model, content_field, batch_size):
+    batch = []
+    for row in model.objects.order_by('pk').values_list('pk', content_field).iterator(chunk_size=batch_size):
+        batch.append(row)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def backfill(model, content_field, batch_size=200):
+    """Process every row of a model in this process; used by migrations"""
+    return sum(store(model, process_rows(batch)) for batch in source_batches(model, content_field, batch_size))
@@ -0,0 +1,186 @@
+"""Geo queries on plain latitude/longitude columns, without PostGIS.
+
+Every located model keeps a geohash of its point in an indexed column. A
+radius or bounding-box query first selects the few geohash cells covering
+the area (ordinary B-tree range scans on any backend), then computes exact
+great-circle distances for those candidates only. Nearest-k widens the
+radius until k points fall inside it.
+"""
+import math
+from functools import reduce
+from operator import or_
+
+from django.db.models import Q
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+GEOHASH_PRECISION = 9  # cells of about 5 x 5 m
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+MAX_COVER_CELLS = 32
+MAX_RADIUS_KM = 20038.0  # half the equator: covers the globe
+
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    latitude, longitude = float(latitude), float(longitude)
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        target, bounds = (longitude, lon_range) if even else (latitude, lat_range)
+        middle = (bounds[0] + bounds[1]) / 2
+        if target >= middle:
+            value = value * 2 + 1
+            bounds[0] = middle
+        else:
+            value *= 2
+            bounds[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits, value = 0, 0
+    return ''.join(chars)
+
+
+def cell_size(precision):
+    """(height, width) of a geohash cell in degrees"""
+    lon_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lon_bits
+
+
+def covering_cells(min_lat, min_lon, max_lat, max_lon):
+    """The geohash prefixes (at a single precision) covering a bounding box, at most MAX_COVER_CELLS"""
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        height, width = cell_size(precision)
+        rows = int((max_lat - min_lat) / height) + 2
+        columns = int((max_lon - min_lon) / width) + 2
+        if rows * columns <= MAX_COVER_CELLS:
+            break
+    else:
+        return None  # the whole world
+
+    cells = set()
+    for row in range(rows):
+        latitude = min(max_lat, min_lat + row * height)
+        for column in range(columns):
+            longitude = min(max_lon, min_lon + column * width)
+            cells.add(encode_geohash(latitude, longitude, precision))
+    return sorted(cells)
+
+
+def cells_q(cells, field='geohash'):
+    # Prefix matches as ranges, which every backend answers from the B-tree index
+    return reduce(or_, (Q(**{f"{field}__gte": cell, f"{field}__lt": cell + '~'}) for cell in cells))
+
+
+def bbox_q(min_lat, min_lon, max_lat, max_lon):
+    """Q for points inside a bounding box (not crossing the antimeridian)"""
+    q = Q(latitude__gte=min_lat, latitude__lte=max_lat, longitude__gte=min_lon, longitude__lte=max_lon)
+    cells = covering_cells(min_lat, min_lon, max_lat, max_lon)
+    return q & cells_q(cells) if cells else q
+
+
+def radius_bbox(latitude, longitude, radius_km):
+    delta_lat = radius_km / KM_PER_DEGREE
+    cos_lat = math.cos(math.radians(latitude))
+    delta_lon = 180.0 if cos_lat < 1e-6 else min(180.0, radius_km / (KM_PER_DEGREE * cos_lat))
+    return (
+        max(-90.0, latitude - delta_lat), max(-180.0, longitude - delta_lon),
+        min(90.0, latitude + delta_lat), min(180.0, longitude + delta_lon),
+    )
+
+
+def haversine_km(latitude, longitude, points):
+    """Distances from one origin to many (latitude, longitude) points, in a single pass"""
+    lat1 = math.radians(latitude)
+    lon1 = math.radians(longitude)
+    cos_lat1 = math.cos(lat1)
+    sin, cos, asin, sqrt, radians = math.sin, math.cos, math.asin, math.sqrt, math.radians
+    return [
+        2 * EARTH_RADIUS_KM * asin(sqrt(min(1.0,
+            sin((radians(lat) - lat1) / 2) ** 2
+            + cos_lat1 * cos(radians(lat)) * sin((radians(lon) - lon1) / 2) ** 2
+        )))
+        for lat, lon in points
+    ]
+
+
+def within(queryset, latitude, longitude, radius_km):
+    """[(pk, distance_km)] of rows within ``radius_km``, nearest first"""
+    candidates = list(
+        queryset.filter(bbox_q(*radius_bbox(latitude, longitude, radius_km)))
+        .values_list('pk', 'latitude', 'longitude')
+    )
+    distances = haversine_km(latitude, longitude, ((float(lat), float(lon)) for _, lat, lon in candidates))
+    found = [(row[0], distance) for row, distance in zip(candidates, distances) if distance <= radius_km]
+    found.sort(key=lambda item: (item[1], item[0]))
+    return found
+
+
+def nearest(queryset, latitude, longitude, k, start_km=5.0):
+    """[(pk, distance_km)] of the k rows nearest the point, widening the search radius as needed"""
+    radius_km = start_km
+    while True:
+        found = within(queryset, latitude, longitude, radius_km)
+        if len(found) >= k or radius_km >= MAX_RADIUS_KM:
+            return found[:k]
+        radius_km = min(MAX_RADIUS_KM, radius_km * 4)
+
+
+
+def parse_point(value):
+    """'lat,lng' -> (latitude, longitude); ValueError if malformed or out of range"""
+    try:
+        latitude, longitude = (float(part) for part in value.split(','))
+    except (AttributeError, ValueError):
+        raise ValueError("near must be 'latitude,longitude'")
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        raise ValueError("near is out of range")
+    return latitude, longitude
+
+
+def parse_bbox(value):
+    """'min_lng,min_lat,max_lng,max_lat' (GeoJSON order) -> (min_lat, min_lon, max_lat, max_lon)"""
+    try:
+        min_lon, min_lat, max_lon, max_lat = (float(part) for part in value.split(','))
+    except (AttributeError, ValueError):
+        raise ValueError("bbox must be 'min_lng,min_lat,max_lng,max_lat'")
+    if not (-90 <= min_lat <= max_lat <= 90 and -180 <= min_lon <= max_lon <= 180):
+        raise ValueError("bbox is out of range")
+    return min_lat, min_lon, max_lat, max_lon
+
+
+# Map clustering
+
+TILE_SIZE = 256
+MAX_MERCATOR_LATITUDE = 85.05112878
+
+
+def mercator_unit(latitude, longitude):
+    """Web Mercator coordinates of a point in the unit square (multiply by the map size in pixels)"""
+    latitude = max(-MAX_MERCATOR_LATITUDE, min(MAX_MERCATOR_LATITUDE, latitude))
+    sin_lat = math.sin(math.radians(latitude))
+    return (longitude + 180.0) / 360.0, 0.5 - math.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)
+
+
+def project(points):
+    """[(x, y, point)] for (latitude, longitude, ...) points; project once, cluster at every zoom"""
+    return [mercator_unit(point[0], point[1]) + (point,) for point in points]
+
+
+def grid_clusters(projected, zoom, cell_px=60):
+    """Group projected points into grid cells of ``cell_px`` screen pixels at ``zoom``.
+
+    Returns a list of (latitude, longitude, members) with the members'
+    centroid; single-member groups are the unclustered points.
+    """
+    cells_per_side = TILE_SIZE * 2 ** zoom / cell_px
+    cells = {}
+    for x, y, point in projected:
+        cells.setdefault((int(x * cells_per_side), int(y * cells_per_side)), []).append(point)
+    groups = []
+    for members in cells.values():
+        latitude = sum(member[0] for member in members) / len(members)
+        longitude = sum(member[1] for member in members) / len(members)
+        groups.append((latitude, longitude, members))
+    return groups
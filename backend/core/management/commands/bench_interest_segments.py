@@ -0,0 +1,68 @@
+import random
+import time
+import uuid
+
+from core.benchmarks import BenchmarkCommand
+from core import segments
+from news.models import Newsletter, NewsletterInterest
+
+BACKGROUND_INTERESTS = ['scholarships', 'community', 'workshops', 'fundraising', 'media']
+
+
+class Command(BenchmarkCommand):
+    help = 'Benchmark building and exporting an interest segment from a large subscriber table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000000)
+        parser.add_argument('--share', type=float, default=0.1, help='Fraction of subscribers in the benchmark segment')
+        parser.add_argument('--runs', type=int, default=3)
+
+    def handle(self, *args, **options):
+        run_id = uuid.uuid4().hex[:8]
+        interest = f"bench-{run_id}"
+        rng = random.Random(run_id)
+
+        try:
+            start = time.perf_counter()
+            for offset in range(0, options['rows'], 10000):
+                subscribers = Newsletter.objects.bulk_create([
+                    Newsletter(
+                        email=f"segment-{run_id}-{i}@example.invalid",
+                        interests=rng.sample(BACKGROUND_INTERESTS, 2) + ([interest] if rng.random() < options['share'] else []),
+                    )
+                    for i in range(offset, min(offset + 10000, options['rows']))
+                ])
+                if NewsletterInterest.in_use():
+                    # bulk_create skips save(), so index the new rows the way save() would
+                    NewsletterInterest.objects.bulk_create(
+                        NewsletterInterest.postings_for((s.pk, s.interests) for s in subscribers), batch_size=5000
+                    )
+            self.stdout.write(f"created {options['rows']} subscribers in {time.perf_counter() - start:.1f}s")
+
+            segments.invalidate('newsletter')
+            for run in range(options['runs']):
+                start = time.perf_counter()
+                counts = segments.counts('newsletter')
+                counted = time.perf_counter() - start
+
+                start = time.perf_counter()
+                exported = sum(chunk.count(b'\n') for chunk in segments.iter_ids('newsletter', [interest]))
+                streamed = time.perf_counter() - start
+                self.stdout.write(
+                    f"run {run + 1}: counts {counted * 1000:7.1f} ms ({len(counts)} segments)  "
+                    f"export {exported} ids in {streamed * 1000:7.1f} ms"
+                )
+
+            start = time.perf_counter()
+            scanned = sum(
+                1 for interests in Newsletter.objects.filter(
+                    email__startswith=f"segment-{run_id}-", is_subscribed=True, is_active=True
+                ).values_list('interests', flat=True).iterator(chunk_size=5000)
+                if interest in interests
+            )
+            self.stdout.write(
+                f"JSON scan for comparison: {scanned} members in {(time.perf_counter() - start) * 1000:.1f} ms"
+            )
+        finally:
+            Newsletter.objects.filter(email__startswith=f"segment-{run_id}-").delete()
+            segments.invalidate('newsletter')
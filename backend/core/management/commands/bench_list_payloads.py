@@ -0,0 +1,146 @@
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import CommandError
+from django.db import connection
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from core.benchmarks import BenchmarkCommand
+from core.content import process
+from core.models import FAQ
+from core.views import FAQListView
+from news.models import Event, NewsArticle, NewsCategory
+from news.views import EventsListView, NewsArticlesListView
+from programs.models import Program, SuccessStory
+from programs.views import ProgramsListView, SuccessStoriesListView
+
+# (label, list view, url, url of the same list before it was made lean)
+ENDPOINTS = [
+    ('articles', NewsArticlesListView, '/api/v1/news/articles/', None),
+    ('events', EventsListView, '/api/v1/news/events/', None),
+    ('programs', ProgramsListView, '/api/v1/programs/', '/api/v1/programs/?include=description'),
+    ('stories', SuccessStoriesListView, '/api/v1/programs/success-stories/', None),
+    ('faqs', FAQListView, '/api/v1/faqs/', None),
+]
+
+
+def sample_html(kilobytes):
+    paragraph = (
+        '<p>Students from the community scholarship programme shared how mentoring, school fees and '
+        '<strong>regular follow-up</strong> changed their results, with <a href="https://example.org">more</a>.</p>'
+    )
+    sections = []
+    while sum(map(len, sections)) < kilobytes * 1024:
+        sections.append(f"<h2>Section {len(sections) + 1}</h2>" + paragraph * 6)
+    return ''.join(sections)
+
+
+def fetched_bytes(queryset):
+    """Bytes of column data the database returns for a queryset"""
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return sum(len(str(value).encode()) for row in cursor.fetchall() for value in row if value is not None)
+
+
+def bench_host():
+    """A host name ALLOWED_HOSTS accepts, so requests reach the views rather than a DisallowedHost page"""
+    for host in settings.ALLOWED_HOSTS:
+        if host == '*':
+            return 'localhost'
+        if '*' not in host:
+            return host.lstrip('.')
+    return 'localhost'
+
+
+class Command(BenchmarkCommand):
+    help = 'Benchmark list endpoint payloads and the column bytes their queries fetch, lean versus full rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100, help='Rows created per model')
+        parser.add_argument('--content-kb', type=int, default=30, help='Size of each rich text body')
+
+    def handle(self, *args, **options):
+        run_id = uuid.uuid4().hex[:8]
+        html = sample_html(options['content_kb'])
+        derived = process(html)
+        now = timezone.now()
+        rows = range(options['rows'])
+
+        category = NewsCategory.objects.create(name=f"Bench {run_id}", slug=f"bench-{run_id}")
+        program = Program.objects.create(
+            name=f"Bench {run_id}", slug=f"bench-{run_id}", program_type='other', short_description='Bench',
+            full_description=html, image='programs/bench.jpg', icon='bench', is_active=False,
+        )
+        try:
+            NewsArticle.objects.bulk_create([NewsArticle(
+                title=f"Bench article {i}", slug=f"bench-{run_id}-{i}", excerpt='Bench excerpt', content=html,
+                featured_image='news/bench.jpg', category=category, publish_date=now - timedelta(days=1),
+                gallery_images='[]', **derived,
+            ) for i in rows])
+            Event.objects.bulk_create([Event(
+                title=f"Bench event {i}", slug=f"bench-{run_id}-{i}", description=html, event_type='other',
+                start_date=now + timedelta(days=30), end_date=now + timedelta(days=30, hours=2),
+                venue='Bench venue', address='Bench address', featured_image='events/bench.jpg',
+                publish_date=now - timedelta(days=1), **derived,
+            ) for i in rows])
+            Program.objects.bulk_create([Program(
+                name=f"Bench program {i}", slug=f"bench-{run_id}-{i}", program_type='other',
+                short_description='Bench', full_description=html, image='programs/bench.jpg', icon='bench',
+                eligibility_criteria=html, application_process=html, requirements=html, **derived,
+            ) for i in range(min(options['rows'], 20))])
+            SuccessStory.objects.bulk_create([SuccessStory(
+                name=f"Bench {i}", program=program, title=f"Bench story {i}", story=html,
+                profile_image='success_stories/bench.jpg', location='Bench', current_status='Bench',
+                achievements=html, **derived,
+            ) for i in rows])
+            FAQ.objects.bulk_create([FAQ(
+                question=f"Bench question {run_id} {i}", answer=html, category='general', **derived,
+            ) for i in range(min(options['rows'], 20))])
+            for model in (NewsArticle, Event, Program, SuccessStory):
+                model.touch_cache_version()
+
+            self.stdout.write(f"{options['rows']} rows per model, {len(html) // 1024} KB of HTML per body")
+            self.stdout.write(f"{'endpoint':>10}  {'full query':>11}  {'lean query':>11}  {'payload':>20}  {'request':>8}")
+            for label, view_class, url, baseline_url in ENDPOINTS:
+                self.report(label, view_class, url, baseline_url)
+        finally:
+            SuccessStory.objects.filter(program=program).delete()
+            Program.objects.filter(slug__startswith=f"bench-{run_id}").delete()
+            Event.objects.filter(slug__startswith=f"bench-{run_id}").delete()
+            category.delete()
+            FAQ.objects.filter(question__startswith=f"Bench question {run_id}").delete()
+            for model in (NewsArticle, Event, Program, SuccessStory):
+                model.touch_cache_version()
+
+    def fetch(self, client, url):
+        response = client.get(url)
+        if response.status_code != 200:
+            raise CommandError(f"GET {url} returned {response.status_code}")
+        return response.content
+
+    def report(self, label, view_class, url, baseline_url):
+        view = view_class()
+        view.request = Request(APIRequestFactory().get(url))
+        view.format_kwarg = None
+        view.kwargs = {}
+        lean = view.get_queryset()
+        lean = lean if lean.query.is_sliced else lean[:20]
+        full = lean._chain()
+        full.query.clear_deferred_loading()
+
+        client = APIClient(HTTP_HOST=bench_host())
+        start = time.perf_counter()
+        payload = len(self.fetch(client, url))
+        elapsed = (time.perf_counter() - start) * 1000
+        if baseline_url:
+            payload = f"{payload // 1024} KB (was {len(self.fetch(client, baseline_url)) // 1024} KB)"
+        else:
+            payload = f"{payload // 1024} KB"
+        self.stdout.write(
+            f"{label:>10}  {fetched_bytes(full) // 1024:>8} KB  {fetched_bytes(lean) // 1024:>8} KB  "
+            f"{payload:>20}  {elapsed:6.1f} ms"
+        )
@@ -0,0 +1,56 @@
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from core import content
+from core.models import ProcessedContentModel
+
+
+def content_models():
+    return {
+        model._meta.label: model for model in apps.get_models()
+        if issubclass(model, ProcessedContentModel)
+    }
+
+
+class Command(BaseCommand):
+    help = 'Recompute the stored sanitized HTML, text, reading time, outline and first image of rich content'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', action='append', help='Only this model, e.g. news.NewsArticle (repeatable)')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Processes parsing HTML in parallel')
+        parser.add_argument('--batch-size', type=int, default=200)
+
+    def handle(self, *args, **options):
+        models = content_models()
+        unknown = set(options['model'] or []) - set(models)
+        if unknown:
+            raise CommandError(f"Not a content model: {', '.join(sorted(unknown))}")
+        labels = options['model'] or sorted(models)
+
+        # Workers only parse; this process reads the rows and writes each batch back
+        with ProcessPoolExecutor(max_workers=options['workers']) as pool:
+            for label in labels:
+                model = models[label]
+                start = time.perf_counter()
+                batches = content.source_batches(model, model.CONTENT_FIELD, options['batch_size'])
+                processed = sum(content.store(model, results) for results in self.parallel(pool, batches, options))
+                if hasattr(model, 'touch_cache_version'):
+                    model.touch_cache_version()
+                self.stdout.write(self.style.SUCCESS(
+                    f"{label}: processed {processed} rows in {time.perf_counter() - start:.1f}s"
+                ))
+
+    def parallel(self, pool, batches, options):
+        """Results of each batch in order, with at most two batches per worker read ahead"""
+        pending = deque()
+        for batch in batches:
+            pending.append(pool.submit(content.process_rows, batch))
+            if len(pending) >= options['workers'] * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
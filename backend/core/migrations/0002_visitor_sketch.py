@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VisitorSketch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=20)),
+                ('object_id', models.PositiveIntegerField()),
+                ('day', models.DateField()),
+                ('registers', models.BinaryField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Visitor Sketch',
+                'verbose_name_plural': 'Visitor Sketches',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='visitorsketch',
+            constraint=models.UniqueConstraint(fields=('source', 'object_id', 'day'), name='visitor_sketch_unique_day'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:07
+
+from django.db import migrations, models
+
+from core.content import backfill
+
+
+def process_existing_content(apps, schema_editor):
+    """Derive the stored content columns of existing FAQs"""
+    backfill(apps.get_model('core', 'FAQ'), 'answer')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_visitor_sketch'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='faq',
+            name='body_html',
+            field=models.TextField(blank=True, default='', editable=False, help_text='Sanitized HTML'),
+        ),
+        migrations.AddField(
+            model_name='faq',
+            name='body_text',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='faq',
+            name='first_image',
+            field=models.CharField(blank=True, default='', editable=False, max_length=500),
+        ),
+        migrations.AddField(
+            model_name='faq',
+            name='outline',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.AddField(
+            model_name='faq',
+            name='reading_minutes',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='faq',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(process_existing_content, migrations.RunPython.noop),
+    ]
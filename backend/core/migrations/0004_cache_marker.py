@@ -0,0 +1,20 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_processed_content'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CacheMarker',
+            fields=[
+                ('key', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('value', models.BigIntegerField()),
+            ],
+        ),
+    ]
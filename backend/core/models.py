@@ -1,6 +1,13 @@
-from django.db import models
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, models, transaction
 from django.utils import timezone
 from django_ckeditor_5.fields import CKEditor5Field
+from .content import DERIVED_FIELDS, process
+from .geo import encode_geohash
+from .segments import counts_key
 
 
 class BaseModel(models.Model):
@@ -13,6 +20,221 @@ class BaseModel(models.Model):
         abstract = True
 
 
+def cache_is_shared():
+    """Whether every worker process sees the same default cache (Redis), not its own memory."""
+    backend = settings.CACHES['default']['BACKEND']
+    return not backend.endswith(('LocMemCache', 'DummyCache'))
+
+
+class CacheMarker(models.Model):
+    """Integers worker processes must agree on when the cache cannot share them.
+
+    Holds cache versions (and similar watermarks) while the default cache is
+    per-process memory; with a shared cache they live in the cache instead.
+    """
+    key = models.CharField(max_length=100, primary_key=True)
+    value = models.BigIntegerField()
+
+    def __str__(self):
+        return f"{self.key} = {self.value}"
+
+    @classmethod
+    def read(cls, key, default=None):
+        value = cls.objects.filter(key=key).values_list('value', flat=True).first()
+        return default if value is None else value
+
+    @classmethod
+    def add(cls, key, value):
+        """Store value unless the key exists; returns the stored value."""
+        cls.objects.bulk_create([cls(key=key, value=value)], ignore_conflicts=True)
+        return cls.read(key, value)
+
+    @classmethod
+    def write(cls, key, value):
+        cls.objects.bulk_create(
+            [cls(key=key, value=value)], update_conflicts=True, unique_fields=['key'], update_fields=['value']
+        )
+
+
+class CacheVersionMixin:
+    """A cache version per model that moves after every committed write.
+
+    Anything cached from the model's rows carries ``cache_version()`` in its
+    key, so one write retires all of it without tracking individual keys.
+    The version lives in the cache when it is shared and in ``CacheMarker``
+    otherwise, so a write in one process still retires every other
+    process's local copies.
+    """
+    CACHE_VERSION_KEY = None
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        transaction.on_commit(type(self).touch_cache_version)
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        transaction.on_commit(type(self).touch_cache_version)
+        return result
+
+    @classmethod
+    def cache_version(cls):
+        if not cache_is_shared():
+            return CacheMarker.read(cls.CACHE_VERSION_KEY) or CacheMarker.add(cls.CACHE_VERSION_KEY, time.time_ns())
+        version = cache.get(cls.CACHE_VERSION_KEY)
+        if version is None:
+            version = time.time_ns()
+            cache.add(cls.CACHE_VERSION_KEY, version, None)
+            version = cache.get(cls.CACHE_VERSION_KEY, version)
+        return version
+
+    @classmethod
+    def touch_cache_version(cls):
+        if not cache_is_shared():
+            CacheMarker.write(cls.CACHE_VERSION_KEY, time.time_ns())
+            return
+        cache.set(cls.CACHE_VERSION_KEY, time.time_ns(), None)
+
+
+class GeohashModel(models.Model):
+    """Keeps an indexed ``geohash`` of the model's latitude and longitude for geo queries"""
+    geohash = models.CharField(max_length=12, blank=True, default='', editable=False)
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        if self.latitude is not None and self.longitude is not None:
+            self.geohash = encode_geohash(self.latitude, self.longitude)
+        else:
+            self.geohash = ''
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'latitude', 'longitude'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'geohash'}
+        super().save(*args, **kwargs)
+
+
+class ProcessedContentModel(models.Model):
+    """Stored derived forms of the model's CKEditor field ``CONTENT_FIELD``, recomputed when it is saved"""
+    CONTENT_FIELD = None
+    body_html = models.TextField(blank=True, default='', editable=False, help_text="Sanitized HTML")
+    body_text = models.TextField(blank=True, default='', editable=False)
+    word_count = models.PositiveIntegerField(default=0, editable=False)
+    reading_minutes = models.PositiveSmallIntegerField(default=0, editable=False)
+    outline = models.JSONField(default=list, blank=True, editable=False)
+    first_image = models.CharField(max_length=500, blank=True, default='', editable=False)
+
+    class Meta:
+        abstract = True
+
+    def process_content(self):
+        for field, value in process(getattr(self, self.CONTENT_FIELD)).items():
+            setattr(self, field, value)
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or self.CONTENT_FIELD in update_fields:
+            self.process_content()
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | set(DERIVED_FIELDS)
+        super().save(*args, **kwargs)
+
+
+class InterestPosting(models.Model):
+    """(interest, owner) rows behind interest segments on databases without a GIN index.
+
+    Subclasses declare an ``interest`` column and a foreign key named by
+    ``owner_field`` to the model whose JSON ``interests`` array they index.
+    """
+    owner_field = None
+    segment_source = None
+
+    class Meta:
+        abstract = True
+
+    @staticmethod
+    def normalize(interests):
+        """Interest keys from a JSON array, lowercased and de-duplicated"""
+        if not isinstance(interests, (list, tuple)):
+            return []
+        return sorted({str(interest).strip().lower() for interest in interests if str(interest).strip()})
+
+    @staticmethod
+    def stored(interests):
+        """The form owners store ``interests`` in: normalized keys in their submitted order.
+
+        The PostgreSQL lookups match the stored JSON exactly, so it has to hold the
+        same keys as the postings; anything that is not an array is left as it is.
+        """
+        if not isinstance(interests, (list, tuple)):
+            return interests
+        return list(dict.fromkeys(str(interest).strip().lower() for interest in interests if str(interest).strip()))
+
+    @staticmethod
+    def in_use():
+        # PostgreSQL answers interest lookups from the GIN index on the owner instead
+        return connection.vendor != 'postgresql'
+
+    @classmethod
+    def owner_model(cls):
+        return cls._meta.get_field(cls.owner_field).related_model
+
+    @classmethod
+    def postings_for(cls, rows):
+        return [
+            cls(**{f"{cls.owner_field}_id": pk, 'interest': interest})
+            for pk, interests in rows
+            for interest in cls.normalize(interests)
+        ]
+
+    @classmethod
+    def sync(cls, owners):
+        """Replace the postings of the given owners with their current interests"""
+        cls.objects.filter(**{f"{cls.owner_field}__in": [owner.pk for owner in owners]}).delete()
+        cls.objects.bulk_create(cls.postings_for((owner.pk, owner.interests) for owner in owners))
+
+    @classmethod
+    def refresh(cls, owners):
+        """Called from the owner's save: update postings and drop the cached segment counts"""
+        if cls.in_use():
+            cls.sync(owners)
+        transaction.on_commit(lambda: cache.delete(counts_key(cls.segment_source)))
+
+    @classmethod
+    def rebuild(cls, batch_size=1000):
+        """Re-index every owner from scratch; returns the number of postings written"""
+        written = 0
+        with transaction.atomic():
+            cls.objects.all().delete()
+            batch = []
+            for row in cls.owner_model().objects.values_list('id', 'interests').iterator(chunk_size=batch_size):
+                batch.append(row)
+                if len(batch) == batch_size:
+                    written += len(cls.objects.bulk_create(cls.postings_for(batch), batch_size=batch_size))
+                    batch = []
+            written += len(cls.objects.bulk_create(cls.postings_for(batch), batch_size=batch_size))
+        cache.delete(counts_key(cls.segment_source))
+        return written
+
+
+class VisitorSketch(models.Model):
+    """HyperLogLog registers of the visitors of one object on one day (see core.sketches)"""
+    source = models.CharField(max_length=20)
+    object_id = models.PositiveIntegerField()
+    day = models.DateField()
+    registers = models.BinaryField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Visitor Sketch"
+        verbose_name_plural = "Visitor Sketches"
+        constraints = [
+            models.UniqueConstraint(fields=['source', 'object_id', 'day'], name='visitor_sketch_unique_day'),
+        ]
+
+    def __str__(self):
+        return f"{self.source} {self.object_id} on {self.day}"
+
+
 class Organization(models.Model):
     """Organization information"""
     name = models.CharField(max_length=200, default="KEEFA")
@@ -136,8 +358,10 @@ class Testimonial(BaseModel):
         return f"{self.name} - {self.program_type}"
 
 
-class FAQ(BaseModel):
+class FAQ(ProcessedContentModel, BaseModel):
     """Frequently Asked Questions"""
+    CONTENT_FIELD = 'answer'
+
     question = models.CharField(max_length=300)
     answer = CKEditor5Field()
     category = models.CharField(max_length=50, choices=[
@@ -0,0 +1,98 @@
+"""Interest segments over the JSON ``interests`` arrays of subscribers and volunteers.
+
+A segment is the audience of a source holding one interest. Membership is
+answered from an inverted index rather than a JSON scan: a GIN index on the
+``interests`` column on PostgreSQL, the normalized ``InterestPosting`` side
+tables elsewhere (kept current by the owning models' ``save``, which also
+stores the arrays lowercased so both paths match the same keys). Per-interest
+counts are cached for the admin and dropped whenever a member is saved.
+"""
+from functools import reduce
+from operator import or_
+
+from django.apps import apps
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count, Q
+
+SEGMENT_COUNT_CACHE_SECONDS = 60 * 10
+EXPORT_CHUNK_SIZE = 5000
+
+# source -> (owner model, postings model, audience filter)
+SOURCES = {
+    'newsletter': ('news.Newsletter', 'news.NewsletterInterest', {'is_subscribed': True, 'is_active': True}),
+    'volunteers': ('donations.Volunteer', 'donations.VolunteerInterest', {'is_active': True}),
+}
+
+
+def source(name):
+    """(owner model, postings model, audience filter) of a segment source; KeyError if unknown"""
+    owner, postings, audience = SOURCES[name]
+    return apps.get_model(owner), apps.get_model(postings), audience
+
+
+def counts_key(name):
+    return f"interest-segments:{name}"
+
+
+def invalidate(name):
+    cache.delete(counts_key(name))
+
+
+def members(name, interests):
+    """Ids of the source's audience holding any of ``interests``, ascending"""
+    model, postings, audience = source(name)
+    interests = postings.normalize(interests)
+    if postings.in_use():
+        owner_id = f"{postings.owner_field}_id"
+        ids = postings.objects.filter(
+            interest__in=interests, **{f"{postings.owner_field}__{field}": value for field, value in audience.items()}
+        ).values_list(owner_id, flat=True).order_by(owner_id)
+        return ids.distinct() if len(interests) > 1 else ids
+    if not interests:
+        return model.objects.none().values_list('id', flat=True)
+    return model.objects.filter(
+        reduce(or_, (Q(interests__contains=[interest]) for interest in interests)), **audience
+    ).values_list('id', flat=True).order_by('id')
+
+
+def counts(name):
+    """{interest: members} for a source, largest segments first; cached"""
+    result = cache.get(counts_key(name))
+    if result is None:
+        model, postings, audience = source(name)
+        if postings.in_use():
+            rows = postings.objects.filter(
+                **{f"{postings.owner_field}__{field}": value for field, value in audience.items()}
+            ).values_list('interest').annotate(count=Count('id'))
+        else:
+            rows = postgres_counts(model, audience)
+        result = dict(sorted(rows, key=lambda row: (-row[1], row[0])))
+        cache.set(counts_key(name), result, SEGMENT_COUNT_CACHE_SECONDS)
+    return result
+
+
+def postgres_counts(model, audience):
+    # Unnest the arrays once; counts are over distinct members so repeated entries count once
+    sql, params = model.objects.filter(**audience).values('id', 'interests').query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT lower(item), count(DISTINCT audience.id) "
+            f"FROM ({sql}) audience CROSS JOIN LATERAL jsonb_array_elements_text("
+            "CASE WHEN jsonb_typeof(audience.interests) = 'array' THEN audience.interests ELSE '[]'::jsonb END"
+            ") item GROUP BY 1",
+            params,
+        )
+        return cursor.fetchall()
+
+
+def iter_ids(name, interests):
+    """Member ids as newline-separated text, streamed in chunks"""
+    chunk = []
+    for pk in members(name, interests).iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        chunk.append(str(pk))
+        if len(chunk) == EXPORT_CHUNK_SIZE:
+            yield ('\n'.join(chunk) + '\n').encode()
+            chunk = []
+    if chunk:
+        yield ('\n'.join(chunk) + '\n').encode()
@@ -36,6 +36,8 @@ class TestimonialSerializer(serializers.ModelSerializer):
 
 
 class FAQSerializer(serializers.ModelSerializer):
+    answer = serializers.CharField(source='body_html', read_only=True)
+
     class Meta:
         model = FAQ
         fields = ['id', 'question', 'answer', 'category']
@@ -0,0 +1,98 @@
+"""XML sitemaps of the public pages, split into shards per model.
+
+The index lists every shard; a shard holds at most ``SHARD_SIZE`` URLs (the
+sitemaps.org limit), so a section simply gains shards as its archive grows.
+Shards are rendered from a ``values_list`` of the key field and
+``updated_at`` and cached with their ETag under the model's
+``cache_version()``, so a write to one model re-renders only that model's
+shards. Only models the frontend links to a detail page of are listed.
+"""
+import hashlib
+from datetime import timezone as dt_timezone
+from xml.sax.saxutils import escape
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+
+SHARD_SIZE = 50000
+SITEMAP_CACHE_SECONDS = 60 * 60 * 24
+SITEMAP_CONTENT_TYPE = 'application/xml; charset=utf-8'
+XMLNS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+# section -> (model, queryset of its public rows, key field, frontend path of a row); articles,
+# events, campaigns and stories have no detail page yet, only their list pages
+SECTIONS = {
+    'programs': ('programs.Program', None, 'slug', '/programs/{}/'),
+}
+
+
+def section(name):
+    """(model, public queryset, key field, path template) of a section; KeyError if unknown"""
+    label, queryset, field, path = SECTIONS[name]
+    model = apps.get_model(label)
+    rows = import_string(queryset)() if queryset else model.objects.filter(is_active=True)
+    return model, rows.order_by('id'), field, path
+
+
+def lastmod(moment):
+    return moment.astimezone(dt_timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def shard_count(name):
+    model, rows, _, _ = section(name)
+    key = f"sitemap:{name}:{model.cache_version()}:count"
+    count = cache.get(key)
+    if count is None:
+        count = rows.count()
+        cache.set(key, count, SITEMAP_CACHE_SECONDS)
+    return max(1, -(-count // SHARD_SIZE))
+
+
+def render_shard(rows, field, path):
+    site = settings.FRONTEND_URL.rstrip('/')
+    parts = ['<?xml version="1.0" encoding="UTF-8"?>\n', f'<urlset xmlns="{XMLNS}">\n']
+    newest = None
+    for key, updated_at in rows.values_list(field, 'updated_at').iterator(chunk_size=5000):
+        newest = max(newest, updated_at) if newest else updated_at
+        parts.append(
+            f"<url><loc>{escape(site + path.format(key))}</loc><lastmod>{lastmod(updated_at)}</lastmod></url>\n"
+        )
+    parts.append('</urlset>\n')
+    return ''.join(parts).encode('utf-8'), newest
+
+
+def shard(name, number):
+    """(etag, body, newest updated_at) of one shard of a section, or None past the last shard"""
+    if number >= shard_count(name):
+        return None
+    model, rows, field, path = section(name)
+    key = f"sitemap:{name}:{model.cache_version()}:{number}"
+    cached = cache.get(key)
+    if cached is None:
+        body, newest = render_shard(rows[number * SHARD_SIZE:(number + 1) * SHARD_SIZE], field, path)
+        cached = (f'"{hashlib.md5(body).hexdigest()}"', body, newest)
+        cache.set(key, cached, SITEMAP_CACHE_SECONDS)
+    return cached
+
+
+def index(base_url):
+    """(etag, body) of the sitemap index; ``base_url`` is where the shards are served"""
+    versions = ':'.join(str(apps.get_model(SECTIONS[name][0]).cache_version()) for name in SECTIONS)
+    key = f"sitemap-index:{hashlib.md5(f'{base_url}:{versions}'.encode()).hexdigest()}"
+    cached = cache.get(key)
+    if cached is None:
+        parts = ['<?xml version="1.0" encoding="UTF-8"?>\n', f'<sitemapindex xmlns="{XMLNS}">\n']
+        for name in SECTIONS:
+            for number in range(shard_count(name)):
+                _, _, newest = shard(name, number)
+                parts.append(f"<sitemap><loc>{escape(f'{base_url}sitemap-{name}-{number}.xml')}</loc>")
+                if newest:
+                    parts.append(f"<lastmod>{lastmod(newest)}</lastmod>")
+                parts.append('</sitemap>\n')
+        parts.append('</sitemapindex>\n')
+        body = ''.join(parts).encode('utf-8')
+        cached = (f'"{hashlib.md5(body).hexdigest()}"', body)
+        cache.set(key, cached, SITEMAP_CACHE_SECONDS)
+    return cached
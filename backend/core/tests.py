@@ -0,0 +1,102 @@
+from django.test import SimpleTestCase
+
+from .content import process
+
+
+def sanitize(html):
+    return process(html)['body_html']
+
+
+class ContentSanitizerTests(SimpleTestCase):
+
+    def test_discarded_tags_drop_their_content(self):
+        for tag in ('script', 'style', 'iframe'):
+            with self.subTest(tag=tag):
+                result = process(f"<p>before</p><{tag}>alert('x') p {{}}</{tag}><p>after</p>")
+                self.assertEqual(result['body_html'], '<p>before</p><p>after</p>')
+                self.assertEqual(result['body_text'], 'before\nafter')
+
+    def test_unknown_tags_keep_their_text(self):
+        self.assertEqual(sanitize('<p><font color="red">plain</font></p>'), '<p>plain</p>')
+
+    def test_event_handlers_and_styles_are_stripped(self):
+        self.assertEqual(
+            sanitize('<p onclick="steal()" style="color:red" class="lead">text</p>'),
+            '<p class="lead">text</p>',
+        )
+
+    def test_javascript_urls_are_removed(self):
+        for href in (
+            'javascript:alert(1)',
+            'JavaScript:alert(1)',
+            ' javascript:alert(1)',
+            '&#106;avascript&#58;alert(1)',
+            '&#x6A;avascript&colon;alert(1)',
+            'java&#x09;script:alert(1)',
+            '&#x01;javascript:alert(1)',
+            'data:text/html;base64,PHNjcmlwdD4=',
+        ):
+            with self.subTest(href=href):
+                self.assertEqual(sanitize(f'<a href="{href}">link</a>'), '<a>link</a>')
+
+    def test_safe_urls_are_kept(self):
+        self.assertEqual(
+            sanitize('<a href="https://example.org/?a=1&amp;b=2" target="_blank">link</a>'),
+            '<a href="https://example.org/?a=1&amp;b=2" target="_blank" rel="noopener noreferrer">link</a>',
+        )
+        self.assertEqual(sanitize('<a href="/donate">give</a>'), '<a href="/donate">give</a>')
+
+    def test_images_without_a_safe_src_are_dropped(self):
+        result = process('<img src="javascript:x"><img src="/media/a.jpg" alt="A"><img src="/media/b.jpg">')
+        self.assertEqual(result['body_html'], '<img src="/media/a.jpg" alt="A"><img src="/media/b.jpg">')
+        self.assertEqual(result['first_image'], '/media/a.jpg')
+
+    def test_void_discarded_tags_do_not_swallow_what_follows(self):
+        self.assertEqual(sanitize('<p>before</p><embed src="x"><p>after</p>'), '<p>before</p><p>after</p>')
+
+    def test_self_closed_discarded_tags_do_not_swallow_what_follows(self):
+        for tag in ('svg', 'iframe', 'embed', 'math'):
+            with self.subTest(tag=tag):
+                self.assertEqual(sanitize(f'<p>before</p><{tag} /><p>after</p>'), '<p>before</p><p>after</p>')
+
+    def test_nested_discarded_tags_are_dropped_whole(self):
+        self.assertEqual(
+            sanitize('<svg><path d="M0"/><math><mi>x</mi></math><text>hidden</text></svg><p>shown</p>'),
+            '<p>shown</p>',
+        )
+
+    def test_unclosed_discarded_tags_still_close_open_tags(self):
+        self.assertEqual(sanitize('<p>hello <iframe src="x">'), '<p>hello </p>')
+        self.assertEqual(sanitize('<p>hi<style>'), '<p>hi</p>')
+        self.assertEqual(sanitize('<p>hi<script>alert(1)'), '<p>hi</p>')
+
+    def test_end_tag_closes_unclosed_discarded_tags_inside_it(self):
+        self.assertEqual(sanitize('<div><svg><math></svg></div>'), '<div></div>')
+        self.assertEqual(sanitize('<div><svg><math></svg><p>shown</p></div>'), '<div><p>shown</p></div>')
+
+    def test_void_and_self_closing_allowed_tags(self):
+        self.assertEqual(sanitize('<p>one<br>two<br/>three</p><hr />'), '<p>one<br>two<br>three</p><hr>')
+
+    def test_unclosed_tags_are_closed(self):
+        self.assertEqual(sanitize('<ul><li>one<li>two</ul><p>open'), '<ul><li>one</li><li>two</li></ul><p>open</p>')
+
+    def test_headings_get_unique_anchors_and_an_outline(self):
+        result = process('<h2>Our <em>Impact</em></h2><p>x</p><h3>Our Impact</h3><h2>   </h2><h2>!!</h2>')
+        self.assertEqual(
+            result['body_html'],
+            '<h2 id="our-impact">Our <em>Impact</em></h2><p>x</p>'
+            '<h3 id="our-impact-2">Our Impact</h3><h2>   </h2><h2 id="section">!!</h2>',
+        )
+        self.assertEqual(result['outline'], [
+            {'level': 2, 'text': 'Our Impact', 'anchor': 'our-impact'},
+            {'level': 3, 'text': 'Our Impact', 'anchor': 'our-impact-2'},
+            {'level': 2, 'text': '!!', 'anchor': 'section'},
+        ])
+
+    def test_text_is_escaped(self):
+        self.assertEqual(sanitize('<p>&lt;script&gt;x&lt;/script&gt; &amp; more</p>'), '<p>&lt;script&gt;x&lt;/script&gt; &amp; more</p>')
+
+    def test_word_count_and_reading_time(self):
+        result = process('<p>' + 'word ' * 450 + '</p>')
+        self.assertEqual(result['word_count'], 450)
+        self.assertEqual(result['reading_minutes'], 3)
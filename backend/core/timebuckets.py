@@ -0,0 +1,30 @@
+"""Wall-clock time quantized to fixed buckets.
+
+Filtering on a bucketed "now" instead of ``timezone.now()`` makes every
+request within a bucket build the same query, so its results can be cached
+and shared until the next boundary.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.utils import timezone
+
+
+def bucket_start(moment, seconds):
+    """Start of the ``seconds``-long bucket containing ``moment`` (buckets are aligned to the epoch)"""
+    stamp = int(moment.timestamp()) // seconds * seconds
+    return datetime.fromtimestamp(stamp, dt_timezone.utc)
+
+
+def bucket_end(moment, seconds):
+    """First bucket boundary strictly after ``moment``"""
+    return bucket_start(moment, seconds) + timedelta(seconds=seconds)
+
+
+def bucket_ceil(moment, seconds):
+    """First bucket boundary at or after ``moment``"""
+    start = bucket_start(moment, seconds)
+    return start if start == moment else start + timedelta(seconds=seconds)
+
+
+def bucket_now(seconds=60):
+    return bucket_start(timezone.now(), seconds)
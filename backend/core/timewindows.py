@@ -0,0 +1,59 @@
+"""Time-relative windows (upcoming, past, ongoing, ending soon) over date ranges.
+
+Windows are built per request against a bucketed clock, never at import
+time, so a list cannot freeze at the moment a worker started. Because every
+request in a bucket sees the same "now", results can be cached per bucket
+with ``cached``; passing a model cache version retires them early on writes.
+"""
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils import timezone
+
+from .timebuckets import bucket_now
+
+WINDOWS = ('upcoming', 'ongoing', 'ending_soon', 'past')
+
+
+class TimeWindows:
+    """Windows over a model's ``start``/``end`` fields; either may be absent (open-ended)"""
+
+    def __init__(self, start=None, end=None, dates=False, soon=timedelta(days=7), bucket_seconds=60):
+        self.start = start
+        self.end = end
+        self.dates = dates
+        self.soon = soon
+        self.bucket_seconds = bucket_seconds
+
+    def now(self):
+        return timezone.localdate() if self.dates else bucket_now(self.bucket_seconds)
+
+    def q(self, window, now=None):
+        """Q object for ``window``; ValueError if it is unknown or meaningless for these fields"""
+        now = now or self.now()
+        started = Q(**{f"{self.start}__lte": now}) if self.start else Q()
+        running = Q(**{f"{self.end}__gte": now}) | Q(**{f"{self.end}__isnull": True}) if self.end else Q()
+
+        if window == 'upcoming' and self.start:
+            return Q(**{f"{self.start}__gte": now})
+        if window == 'past' and self.end:
+            return Q(**{f"{self.end}__lt": now})
+        if window == 'ongoing':
+            return started & running
+        if window == 'ending_soon' and self.end:
+            return started & Q(**{f"{self.end}__gte": now, f"{self.end}__lte": now + self.soon})
+        raise ValueError(f"Unsupported time window: {window}")
+
+    def filter(self, queryset, window):
+        return queryset.filter(self.q(window))
+
+    def cached(self, name, build, version=''):
+        """``build()`` cached for the current bucket (and model ``version``, if given)"""
+        bucket = int(bucket_now(self.bucket_seconds).timestamp())
+        key = f"time-window:{name}:{version}:{bucket}"
+        value = cache.get(key)
+        if value is None:
+            value = build()
+            cache.set(key, value, self.bucket_seconds * 2)
+        return value
@@ -2,7 +2,8 @@ from django.urls import path
 from .views import (
     OrganizationDetailView, ImpactStatisticsListView, TeamMembersListView,
     PartnersListView, TestimonialsListView, FeaturedTestimonialsListView,
-    FAQListView, SiteSettingsDetailView, homepage_data, about_data
+    FAQListView, SiteSettingsDetailView, homepage_data, about_data,
+    interest_segments, interest_segment_members, unique_visitors
 )
 
 urlpatterns = [
@@ -16,4 +17,7 @@ urlpatterns = [
     path('site-settings/', SiteSettingsDetailView.as_view(), name='site-settings'),
     path('homepage-data/', homepage_data, name='homepage-data'),
     path('about-data/', about_data, name='about-data'),
+    path('segments/<str:source>/', interest_segments, name='interest-segments'),
+    path('segments/<str:source>/<str:interests>/ids/', interest_segment_members, name='interest-segment-members'),
+    path('visitors/<str:source>/<slug:slug>/', unique_visitors, name='unique-visitors'),
 ]
\ No newline at end of file
@@ -1,7 +1,16 @@
 from rest_framework import generics, status
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
+from datetime import timedelta
+
+from django.apps import apps
+from django.http import Http404, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.views.decorators.http import require_GET
+from . import geo, segments, sitemaps, sketches
 from .models import (
     Organization, ImpactStatistic, TeamMember, Partner, 
     Testimonial, FAQ, SiteSettings
@@ -12,6 +21,94 @@ from .serializers import (
 )
 
 
+class VisitorSketchMixin:
+    """Counts each retrieved object's visitor into its daily unique-visitor sketch"""
+    visitor_source = None
+
+    def get_object(self):
+        obj = super().get_object()
+        sketches.record(self.visitor_source, obj.pk, self.request)
+        return obj
+
+
+class GeoFilterMixin:
+    """Geo filters for list views of located models.
+
+    ?bbox=min_lng,min_lat,max_lng,max_lat keeps points inside the box;
+    ?near=lat,lng with ?radius=km keeps points within the radius and
+    ?near=lat,lng with ?nearest=k the k closest. The two ?near= forms order
+    results nearest first and add ``distance_km`` to each.
+    """
+    MAX_RADIUS_KM = 500
+    MAX_NEAREST = 50
+
+    def list(self, request, *args, **kwargs):
+        try:
+            self.geo_filter = self.parse_geo_filter(request.query_params)
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        self.distances = self.found = None
+        response = super().list(request, *args, **kwargs)
+        if self.distances is not None:
+            rows = response.data['results'] if isinstance(response.data, dict) else response.data
+            for row in rows:
+                row['distance_km'] = round(self.distances[row['id']], 3)
+        return response
+
+    def parse_geo_filter(self, params):
+        result = {}
+        if params.get('bbox'):
+            result['bbox'] = geo.parse_bbox(params['bbox'])
+        if params.get('near'):
+            result['near'] = geo.parse_point(params['near'])
+            if params.get('nearest'):
+                try:
+                    result['nearest'] = int(params['nearest'])
+                except ValueError:
+                    raise ValueError("nearest must be a whole number")
+                if not 1 <= result['nearest'] <= self.MAX_NEAREST:
+                    raise ValueError(f"nearest must be between 1 and {self.MAX_NEAREST}")
+            else:
+                try:
+                    result['radius'] = float(params.get('radius', 10))
+                except ValueError:
+                    raise ValueError("radius must be a number of kilometres")
+                if not 0 < result['radius'] <= self.MAX_RADIUS_KM:
+                    raise ValueError(f"radius must be between 0 and {self.MAX_RADIUS_KM} km")
+        return result
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        geo_filter = getattr(self, 'geo_filter', None)
+        if not geo_filter:
+            return queryset
+
+        if 'bbox' in geo_filter:
+            queryset = queryset.filter(geo.bbox_q(*geo_filter['bbox']))
+        if 'near' in geo_filter:
+            latitude, longitude = geo_filter['near']
+            if 'nearest' in geo_filter:
+                found = geo.nearest(queryset, latitude, longitude, geo_filter['nearest'])
+            else:
+                found = geo.within(queryset, latitude, longitude, geo_filter['radius'])
+            self.distances = dict(found)
+            self.found = found
+            if self.paginator is None:
+                return self.load_found(queryset, found)
+        return queryset
+
+    def paginate_queryset(self, queryset):
+        if getattr(self, 'found', None) is None:
+            return super().paginate_queryset(queryset)
+        # Page through the ranked (pk, distance) pairs in memory, then load only that page's rows
+        return self.load_found(queryset, super().paginate_queryset(self.found))
+
+    def load_found(self, queryset, found):
+        """Rows of the queryset for the (pk, distance) pairs, in their order"""
+        rows = queryset.in_bulk([pk for pk, _ in found])
+        return [rows[pk] for pk, _ in found if pk in rows]
+
+
 class OrganizationDetailView(generics.RetrieveAPIView):
     """Get organization information"""
     serializer_class = OrganizationSerializer
@@ -53,7 +150,8 @@ class FeaturedTestimonialsListView(generics.ListAPIView):
 class FAQListView(generics.ListAPIView):
     """List all active FAQs"""
     serializer_class = FAQSerializer
-    queryset = FAQ.objects.filter(is_active=True)
+    # Only the sanitized answer is served
+    queryset = FAQ.objects.filter(is_active=True).defer('answer', 'body_text', 'outline')
 
 
 class SiteSettingsDetailView(generics.RetrieveAPIView):
@@ -105,4 +203,96 @@ def about_data(request):
         return Response(
             {'error': 'Failed to fetch about data'}, 
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
-        )
\ No newline at end of file
+        )
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def interest_segments(request, source):
+    """Member count of every interest segment of a source (newsletter or volunteers)"""
+    if source not in segments.SOURCES:
+        return Response({'error': 'Unknown segment source'}, status=status.HTTP_404_NOT_FOUND)
+
+    return Response({
+        'source': source,
+        'segments': [
+            {'interest': interest, 'members': members}
+            for interest, members in segments.counts(source).items()
+        ],
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def interest_segment_members(request, source, interests):
+    """Stream the member ids of one or more comma-separated interest segments, one id per line"""
+    if source not in segments.SOURCES:
+        return Response({'error': 'Unknown segment source'}, status=status.HTTP_404_NOT_FOUND)
+
+    response = StreamingHttpResponse(
+        segments.iter_ids(source, interests.split(',')), content_type='text/plain; charset=utf-8'
+    )
+    response['Content-Disposition'] = f'attachment; filename="{source}-segment.txt"'
+    return response
+
+
+MAX_VISITOR_DAYS = 366
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def unique_visitors(request, source, slug):
+    """Estimated unique visitors of an article, event or campaign, per day and over ?from= to ?to= (default 30 days)"""
+    if source not in sketches.SOURCES:
+        return Response({'error': 'Unknown visitor source'}, status=status.HTTP_404_NOT_FOUND)
+    obj = get_object_or_404(apps.get_model(sketches.SOURCES[source]), slug=slug)
+
+    end = parse_date(request.query_params.get('to', '')) or timezone.localdate()
+    start = parse_date(request.query_params.get('from', '')) or end - timedelta(days=29)
+    if start > end or (end - start).days >= MAX_VISITOR_DAYS:
+        return Response(
+            {'error': f"from must not be after to, and the range at most {MAX_VISITOR_DAYS} days"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    # Include what this worker has not merged yet
+    sketches.buffer.flush()
+    total, daily = sketches.unique_visitors(source, obj.pk, start, end)
+    return Response({
+        'source': source,
+        'slug': slug,
+        'from': start,
+        'to': end,
+        'unique_visitors': total,
+        'days': [{'date': day, 'unique_visitors': count} for day, count in daily.items()],
+    })
+
+
+def sitemap_response(request, etag, body):
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH', '')
+    if if_none_match.strip() == '*' or etag in [tag.strip() for tag in if_none_match.split(',')]:
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(body, content_type=sitemaps.SITEMAP_CONTENT_TYPE)
+    response['ETag'] = etag
+    response['Cache-Control'] = 'public, max-age=3600'
+    return response
+
+
+@require_GET
+def sitemap_index(request):
+    """Sitemap index listing every shard of every section"""
+    etag, body = sitemaps.index(request.build_absolute_uri('/'))
+    return sitemap_response(request, etag, body)
+
+
+@require_GET
+def sitemap_shard(request, section, number):
+    """One shard of up to 50,000 URLs of a section"""
+    if section not in sitemaps.SECTIONS:
+        raise Http404("Unknown sitemap section")
+    cached = sitemaps.shard(section, number)
+    if cached is None:
+        raise Http404("No such sitemap shard")
+    etag, body, _ = cached
+    return sitemap_response(request, etag, body)
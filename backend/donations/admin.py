@@ -1,6 +1,10 @@
 from django.contrib import admin
 from django.utils.html import format_html
-from .models import DonationCampaign, Donation, DonationImpact, Volunteer, Partnership
+from core.admin import InterestSegmentFilter
+from .models import (
+    DonationCampaign, Donation, DonorProfile, MpesaC2BConfirmation, DonationImpact, Volunteer,
+    VolunteerTimeEntry, Partnership
+)
 
 
 @admin.register(DonationCampaign)
@@ -9,10 +13,14 @@ class DonationCampaignAdmin(admin.ModelAdmin):
     list_editable = ['is_featured', 'is_active']
     list_filter = ['campaign_type', 'is_featured', 'is_urgent', 'is_active']
     search_fields = ['title', 'description']
+    readonly_fields = ['donor_count']
     prepopulated_fields = {'slug': ('title',)}
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_progress()
     
     def progress_bar(self, obj):
-        percentage = obj.progress_percentage
+        percentage = obj.progress
         color = 'green' if percentage >= 75 else 'orange' if percentage >= 50 else 'red'
         return format_html(
             '<div style="width: 100px; background-color: #f0f0f0;">'
@@ -21,6 +29,7 @@ class DonationCampaignAdmin(admin.ModelAdmin):
             percentage, color, round(percentage, 1)
         )
     progress_bar.short_description = 'Progress'
+    progress_bar.admin_order_field = 'progress'
 
 
 @admin.register(Donation)
@@ -57,6 +66,28 @@ class DonationAdmin(admin.ModelAdmin):
     )
 
 
+@admin.register(DonorProfile)
+class DonorProfileAdmin(admin.ModelAdmin):
+    list_display = ['email', 'donor_name', 'total_donated', 'donations_count', 'last_donation_at']
+    search_fields = ['email', 'donor_name']
+    readonly_fields = [
+        'email', 'donor_name', 'total_donated', 'donations_count',
+        'first_donation_at', 'last_donation_at', 'campaign_breakdown',
+        'created_at', 'updated_at'
+    ]
+
+
+@admin.register(MpesaC2BConfirmation)
+class MpesaC2BConfirmationAdmin(admin.ModelAdmin):
+    list_display = ['trans_id', 'bill_ref_number', 'amount', 'msisdn', 'trans_time', 'status', 'donation']
+    list_filter = ['status']
+    search_fields = ['trans_id', 'bill_ref_number', 'account_reference', 'msisdn', 'payer_name']
+    readonly_fields = ['trans_id', 'trans_time', 'amount', 'business_short_code', 'bill_ref_number',
+                       'account_reference', 'msisdn', 'payer_name', 'payload', 'matched_at',
+                       'created_at', 'updated_at']
+    raw_id_fields = ['donation']
+
+
 @admin.register(DonationImpact)
 class DonationImpactAdmin(admin.ModelAdmin):
     list_display = ['donation', 'beneficiaries_count', 'report_date', 'report_sent']
@@ -64,11 +95,16 @@ class DonationImpactAdmin(admin.ModelAdmin):
     search_fields = ['donation__donor_name', 'impact_description']
 
 
+class VolunteerSegmentFilter(InterestSegmentFilter):
+    segment_source = 'volunteers'
+
+
 @admin.register(Volunteer)
 class VolunteerAdmin(admin.ModelAdmin):
     list_display = ['full_name', 'email', 'location', 'status', 'hours_contributed', 'created_at']
-    list_filter = ['status', 'availability', 'location']
+    list_filter = [VolunteerSegmentFilter, 'status', 'availability', 'location']
     search_fields = ['first_name', 'last_name', 'email', 'skills_experience']
+    readonly_fields = ['hours_contributed', 'projects_participated']
     
     fieldsets = (
         ('Personal Information', {
@@ -86,6 +122,29 @@ class VolunteerAdmin(admin.ModelAdmin):
     )
 
 
+@admin.register(VolunteerTimeEntry)
+class VolunteerTimeEntryAdmin(admin.ModelAdmin):
+    list_display = ['volunteer', 'event', 'program', 'date', 'hours', 'recorded_by']
+    list_filter = ['date']
+    search_fields = ['volunteer__first_name', 'volunteer__last_name', 'volunteer__email']
+    raw_id_fields = ['volunteer', 'event', 'program']
+    date_hierarchy = 'date'
+
+    # Entries feed Volunteer.hours_contributed; they are added and removed, never edited
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def save_model(self, request, obj, form, change):
+        obj.recorded_by = request.user.get_username()
+        VolunteerTimeEntry.record([obj])
+
+    def delete_model(self, request, obj):
+        VolunteerTimeEntry.remove([obj])
+
+    def delete_queryset(self, request, queryset):
+        VolunteerTimeEntry.remove(queryset)
+
+
 @admin.register(Partnership)
 class PartnershipAdmin(admin.ModelAdmin):
     list_display = ['organization_name', 'contact_person', 'organization_type', 'status', 'created_at']
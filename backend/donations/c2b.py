@@ -0,0 +1,142 @@
+"""Match M-Pesa C2B paybill confirmations to alumni donors.
+
+The confirmation endpoint only appends to ``MpesaC2BConfirmation`` so it stays
+cheap during month-end bursts; this module drains that intake table in
+batches. Each batch costs a handful of queries regardless of its size:
+confirmations are resolved through the indexed
+``Donation.mpesa_account_reference`` and applied with bulk writes.
+"""
+import logging
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Donation, MpesaC2BConfirmation
+
+logger = logging.getLogger(__name__)
+
+
+def _new_donation(template, confirmation, processed_at):
+    """A completed donation for a paybill payment, carrying the donor details of their last gift"""
+    return Donation(
+        donor_name=template.donor_name,
+        donor_email=template.donor_email,
+        donor_phone=template.donor_phone or confirmation.msisdn,
+        is_anonymous=template.is_anonymous,
+        is_alumni=template.is_alumni,
+        alumni_donation_period=template.alumni_donation_period,
+        amount=confirmation.amount,
+        currency='KES',
+        donation_type=template.donation_type,
+        campaign_id=template.campaign_id,
+        designation=template.designation,
+        payment_method='mpesa',
+        transaction_id=f"c2b-{confirmation.trans_id}",
+        payment_reference=confirmation.trans_id,
+        mpesa_account_reference=confirmation.account_reference,
+        status='completed',
+        processed_at=processed_at,
+        is_recurring=template.is_recurring,
+    )
+
+
+def match_batch(batch_size=500):
+    """Match one batch of received confirmations; returns counts for the batch."""
+    now = timezone.now()
+
+    with transaction.atomic():
+        confirmations = list(
+            MpesaC2BConfirmation.objects.select_for_update(skip_locked=True)
+            .filter(status='received').order_by('id')[:batch_size]
+        )
+        if not confirmations:
+            return {'received': 0, 'completed': 0, 'created': 0, 'unmatched': 0}
+
+        refs = {c.account_reference for c in confirmations if c.account_reference}
+
+        # Alumni sign-ups still waiting for their first paybill payment, oldest first
+        pending = {}
+        for donation in Donation.objects.filter(
+            mpesa_account_reference__in=refs, status='pending'
+        ).order_by('created_at'):
+            pending.setdefault(donation.mpesa_account_reference, []).append(donation)
+
+        # The latest donation per reference supplies donor details for repeat payments
+        templates = {}
+        for donation in Donation.objects.filter(
+            mpesa_account_reference__in=refs
+        ).order_by('mpesa_account_reference', '-created_at'):
+            templates.setdefault(donation.mpesa_account_reference, donation)
+
+        completed, created, unmatched = [], [], []
+        for confirmation in confirmations:
+            processed_at = confirmation.trans_time or now
+            waiting = pending.get(confirmation.account_reference)
+            if waiting and waiting[0].amount != confirmation.amount:
+                # The donor paid something other than what they pledged: leave the sign-up
+                # pending and park the payment against it for a person to review
+                confirmation.donation = waiting[0]
+                unmatched.append(confirmation)
+                continue
+            if waiting:
+                donation = waiting.pop(0)
+                donation.status = 'completed'
+                donation.payment_reference = confirmation.trans_id
+                donation.processed_at = processed_at
+                donation.updated_at = now
+                completed.append(donation)
+            elif confirmation.account_reference in templates:
+                donation = _new_donation(templates[confirmation.account_reference], confirmation, processed_at)
+                created.append(donation)
+            else:
+                unmatched.append(confirmation)
+                continue
+            confirmation.donation = donation
+            confirmation.status = 'matched'
+            confirmation.matched_at = now
+
+        for confirmation in unmatched:
+            confirmation.status = 'unmatched'
+
+        Donation.objects.bulk_update(
+            completed, ['status', 'payment_reference', 'processed_at', 'updated_at']
+        )
+        Donation.objects.bulk_create(created)
+        if any(donation.pk is None for donation in created):
+            ids = dict(Donation.objects.filter(
+                transaction_id__in=[d.transaction_id for d in created]
+            ).values_list('transaction_id', 'id'))
+            for donation in created:
+                donation.pk = ids[donation.transaction_id]
+
+        Donation.apply_completion_effects(completed + created)
+
+        for confirmation in confirmations:
+            confirmation.updated_at = now
+            if confirmation.donation is not None:
+                confirmation.donation_id = confirmation.donation.pk
+        MpesaC2BConfirmation.objects.bulk_update(
+            confirmations, ['status', 'donation', 'matched_at', 'updated_at']
+        )
+
+    return {
+        'received': len(confirmations),
+        'completed': len(completed),
+        'created': len(created),
+        'unmatched': len(unmatched),
+    }
+
+
+def match_confirmations(batch_size=500, max_batches=None):
+    """Drain the intake table; returns totals across batches."""
+    totals = {'received': 0, 'completed': 0, 'created': 0, 'unmatched': 0}
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        counts = match_batch(batch_size)
+        if not counts['received']:
+            break
+        batches += 1
+        for key, value in counts.items():
+            totals[key] += value
+        logger.info("Matched C2B batch %s: %s", batches, counts)
+    return totals
@@ -0,0 +1,70 @@
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Max, Min, Sum
+from django.db.models.functions import Coalesce, Lower, Trim
+from donations.models import Donation, DonorProfile
+
+
+class Command(BaseCommand):
+    help = 'Rebuild donor profiles from completed donations'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        # Older rows were stored as typed; profiles are keyed by normalized email
+        normalized = Donation.objects.update(donor_email=Lower(Trim('donor_email')))
+        self.stdout.write(f"Normalized donor emails on {normalized} donations.")
+
+        completed = Donation.objects.filter(status='completed')
+        gift_date = Coalesce('processed_at', 'created_at')
+
+        totals = completed.values('donor_email').annotate(
+            total=Sum('amount'),
+            count=Count('id'),
+            first=Min(gift_date),
+            last=Max(gift_date),
+            name=Max('donor_name'),
+        )
+
+        breakdowns = {}
+        per_campaign = completed.values('donor_email', 'campaign_id', 'campaign__title').annotate(
+            total=Sum('amount'), count=Count('id')
+        )
+        for row in per_campaign.iterator():
+            breakdowns.setdefault(row['donor_email'], {})[DonorProfile.campaign_key(row['campaign_id'])] = {
+                'title': row['campaign__title'] or 'General Fund',
+                'amount': str(Decimal(row['total']).quantize(Decimal('0.01'))),
+                'count': row['count'],
+            }
+
+        profiles = [
+            DonorProfile(
+                email=row['donor_email'],
+                donor_name=row['name'] or '',
+                total_donated=row['total'],
+                donations_count=row['count'],
+                first_donation_at=row['first'],
+                last_donation_at=row['last'],
+                campaign_breakdown=breakdowns.get(row['donor_email'], {}),
+            )
+            for row in totals.iterator()
+        ]
+
+        with transaction.atomic():
+            DonorProfile.objects.exclude(email__in=completed.values('donor_email')).delete()
+            DonorProfile.objects.bulk_create(
+                profiles,
+                batch_size=batch_size,
+                update_conflicts=True,
+                unique_fields=['email'],
+                update_fields=[
+                    'donor_name', 'total_donated', 'donations_count',
+                    'first_donation_at', 'last_donation_at', 'campaign_breakdown', 'updated_at'
+                ],
+            )
+
+        self.stdout.write(self.style.SUCCESS(f"Backfilled {len(profiles)} donor profiles."))
@@ -0,0 +1,106 @@
+import statistics
+import threading
+import time
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.utils import timezone
+from core.benchmarks import BenchmarkCommand
+from donations.models import CampaignCounterShard, DonationCampaign, Donation, DonorProfile
+
+
+class Command(BenchmarkCommand):
+    help = 'Benchmark many concurrent completions against one campaign, direct versus sharded counters'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--donations', type=int, default=1000)
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument('--shards', type=int, default=16)
+
+    def handle(self, *args, **options):
+        run_id = uuid.uuid4().hex[:8]
+        campaign = DonationCampaign.objects.create(
+            title=f"Counter benchmark {run_id}",
+            slug=f"counter-benchmark-{run_id}",
+            description='Temporary campaign for bench_campaign_counters',
+            goal_amount=Decimal('1000000.00'),
+            start_date=timezone.now().date(),
+            end_date=timezone.now().date() + timedelta(days=1),
+            campaign_type='emergency',
+            is_urgent=True,
+            is_active=False,
+        )
+        try:
+            for label, shards in (('direct', 0), (f"{options['shards']} shards", options['shards'])):
+                DonationCampaign.objects.filter(pk=campaign.pk).update(counter_shards=shards)
+                result = self.run(campaign, f"{run_id}-{shards}", options['donations'], options['concurrency'])
+                self.report(label, result)
+
+            CampaignCounterShard.compact([campaign.pk])
+            campaign.refresh_from_db()
+            expected = Donation.objects.filter(campaign=campaign, status='completed').count()
+            self.stdout.write(
+                f"after compaction: raised {campaign.raised_amount} from {campaign.donor_count} donors "
+                f"({expected} completed donations)"
+            )
+        finally:
+            # Donation.campaign is SET_NULL, so the donations must go before the campaign
+            donations = Donation.objects.filter(campaign=campaign)
+            DonorProfile.objects.filter(email__in=list(donations.values_list('donor_email', flat=True))).delete()
+            donations.delete()
+            campaign.delete()
+
+    def run(self, campaign, prefix, total, concurrency):
+        latencies, errors = [], []
+        lock = threading.Lock()
+
+        def worker(indexes):
+            try:
+                for i in indexes:
+                    start = time.perf_counter()
+                    try:
+                        Donation.objects.create(
+                            donor_name='Bench Donor',
+                            donor_email=f"bench-{prefix}-{i}@example.com",
+                            amount=Decimal('100.00'),
+                            campaign_id=campaign.pk,
+                            payment_method='card',
+                            transaction_id=f"bench-{prefix}-{i}",
+                            status='completed',
+                        )
+                    except Exception as exc:
+                        with lock:
+                            errors.append(exc)
+                        continue
+                    with lock:
+                        latencies.append(time.perf_counter() - start)
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=worker, args=(range(n, total, concurrency),))
+            for n in range(concurrency)
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.perf_counter() - start, sorted(latencies), errors
+
+    def report(self, label, result):
+        elapsed, latencies, errors = result
+        if not latencies:
+            self.stdout.write(f"{label:>12}: all {len(errors)} completions failed ({errors[0]})")
+            return
+
+        def pct(p):
+            return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+
+        self.stdout.write(
+            f"{label:>12}: {len(latencies) / elapsed:8.1f} completions/s  "
+            f"p50 {pct(0.50):6.1f} ms  p95 {pct(0.95):6.1f} ms  p99 {pct(0.99):6.1f} ms  "
+            f"mean {statistics.mean(latencies) * 1000:6.1f} ms  errors {len(errors)}"
+        )
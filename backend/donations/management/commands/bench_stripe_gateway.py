@@ -0,0 +1,79 @@
+import statistics
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+import requests
+import stripe
+from core.benchmarks import BenchmarkCommand
+from donations import stripe_gateway
+from donations.mock_stripe import MockStripeServer
+from donations.models import Donation
+
+
+class Command(BenchmarkCommand):
+    help = 'Benchmark PaymentIntent creation through the Stripe gateway against the local mock server'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--concurrency', type=int, default=10)
+        parser.add_argument('--latency-ms', type=int, default=20, help='Simulated Stripe response time')
+
+    def handle(self, *args, **options):
+        server = MockStripeServer(port=0, latency_ms=options['latency_ms'])
+        server.start_in_background()
+
+        original = (stripe.api_base, stripe.default_http_client, stripe.max_network_retries)
+        stripe.api_base = server.api_base
+        stripe.max_network_retries = 0
+        try:
+            donations = [
+                Donation(
+                    id=i, transaction_id=str(uuid.uuid4()), amount=Decimal('1000.00'),
+                    currency='KES', donor_name='Bench Donor', donor_email='bench@example.com',
+                )
+                for i in range(options['requests'])
+            ]
+
+            # Baseline: a fresh TCP connection for every request
+            unpooled = requests.Session()
+            unpooled.headers['Connection'] = 'close'
+            stripe.default_http_client = stripe.http_client.RequestsClient(timeout=10, session=unpooled)
+            self.report('fresh connections', self.run(donations, options['concurrency']))
+
+            stripe.default_http_client = stripe_gateway.build_http_client()
+            self.report('pooled gateway', self.run(donations, options['concurrency']))
+
+            # Every donation above was sent twice with the same key; Stripe must hold one intent each
+            self.stdout.write(
+                f"intents created: {len(server.intents)} for {len(donations)} donations "
+                f"({server.stats['idempotent_replays']} idempotent replays)"
+            )
+        finally:
+            stripe.api_base, stripe.default_http_client, stripe.max_network_retries = original
+            server.shutdown()
+            server.server_close()
+
+    def run(self, donations, concurrency):
+        def timed(donation):
+            start = time.perf_counter()
+            stripe_gateway.request_payment_intent(donation)
+            return time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            latencies = sorted(pool.map(timed, donations))
+        return time.perf_counter() - start, latencies
+
+    def report(self, label, result):
+        elapsed, latencies = result
+
+        def pct(p):
+            return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+
+        self.stdout.write(
+            f"{label:>18}: {len(latencies) / elapsed:8.1f} req/s  "
+            f"p50 {pct(0.50):6.1f} ms  p95 {pct(0.95):6.1f} ms  p99 {pct(0.99):6.1f} ms  "
+            f"mean {statistics.mean(latencies) * 1000:6.1f} ms"
+        )
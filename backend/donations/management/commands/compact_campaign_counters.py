@@ -0,0 +1,20 @@
+import time
+from django.core.management.base import BaseCommand
+from donations.models import CampaignCounterShard
+
+
+class Command(BaseCommand):
+    help = 'Fold sharded campaign counters back into their campaign rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Keep compacting on an interval')
+        parser.add_argument('--interval', type=float, default=60, help='Seconds between passes with --loop')
+
+    def handle(self, *args, **options):
+        while True:
+            compacted = CampaignCounterShard.compact()
+            if compacted or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(f"Compacted counters for {compacted} campaigns."))
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,23 @@
+import time
+from django.core.management.base import BaseCommand
+from donations.c2b import match_confirmations
+
+
+class Command(BaseCommand):
+    help = 'Match received M-Pesa C2B confirmations to alumni donors'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--loop', action='store_true', help='Keep polling the intake table')
+        parser.add_argument('--interval', type=float, default=5, help='Seconds between polls with --loop')
+
+    def handle(self, *args, **options):
+        while True:
+            totals = match_confirmations(batch_size=options['batch_size'])
+            if totals['received'] or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(
+                    ' '.join(f"{key}={value}" for key, value in totals.items())
+                ))
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
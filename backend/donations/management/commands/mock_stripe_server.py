@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from donations.mock_stripe import MockStripeServer
+
+
+class Command(BaseCommand):
+    help = 'Run a local mock of the Stripe PaymentIntents API (set STRIPE_API_BASE to use it)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=12111)
+        parser.add_argument('--latency-ms', type=int, default=0, help='Simulated Stripe response time')
+
+    def handle(self, *args, **options):
+        server = MockStripeServer(options['host'], options['port'], options['latency_ms'])
+        self.stdout.write(self.style.SUCCESS(f"Mock Stripe listening on {server.api_base}"))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(f"Served {server.stats['create_requests']} create requests "
+                              f"({server.stats['idempotent_replays']} idempotent replays).")
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from donations.models import VolunteerInterest
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the volunteer interest postings used for matching (not needed on PostgreSQL)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if not VolunteerInterest.in_use():
+            self.stdout.write('PostgreSQL matches through volunteer_interests_gin; nothing to rebuild.')
+            return
+
+        written = VolunteerInterest.rebuild(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {written} volunteer interests."))
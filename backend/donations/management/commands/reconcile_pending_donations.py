@@ -0,0 +1,30 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from donations.reconciler import CHECKERS, reconcile_pending
+
+
+class Command(BaseCommand):
+    help = 'Resolve stale pending donations against M-Pesa and Stripe, failing those past the timeout'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--method', action='append', choices=sorted(CHECKERS), dest='methods')
+        parser.add_argument('--grace-minutes', type=int, default=10,
+                            help='Leave donations younger than this to their callbacks')
+        parser.add_argument('--timeout-hours', type=int, default=24,
+                            help='Fail donations still unpaid after this long')
+        parser.add_argument('--batch-size', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--rate', type=float, default=20, help='Max provider queries per second')
+
+    def handle(self, *args, **options):
+        metrics = reconcile_pending(
+            methods=options['methods'] or sorted(CHECKERS),
+            grace=timedelta(minutes=options['grace_minutes']),
+            timeout=timedelta(hours=options['timeout_hours']),
+            batch_size=options['batch_size'],
+            concurrency=options['concurrency'],
+            rate=options['rate'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            ' '.join(f"{key}={value}" for key, value in metrics.items())
+        ))
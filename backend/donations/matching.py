@@ -0,0 +1,155 @@
+"""Match volunteers to events and programs on interests and availability.
+
+Event and program types map onto the volunteer interest keys. Candidates are
+the members of the matching interest segments (see ``core.segments``), so
+only volunteers sharing at least one interest are loaded and ranked.
+"""
+import hashlib
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from core import segments
+from news.models import Event
+from .models import Volunteer
+
+MATCHABLE_STATUSES = ('approved', 'active')
+
+# Interests a volunteer needs for each activity type, most relevant first
+EVENT_INTERESTS = {
+    'workshop': ['workshops', 'mentorship'],
+    'ceremony': ['media', 'admin'],
+    'fundraising': ['fundraising', 'media'],
+    'community': ['community'],
+    'meeting': ['admin'],
+    'conference': ['workshops', 'media', 'admin'],
+    'other': ['other', 'admin'],
+}
+
+PROGRAM_INTERESTS = {
+    'scholarship': ['mentorship', 'admin'],
+    'workshop': ['workshops', 'mentorship'],
+    'community': ['community', 'fundraising'],
+    'other': ['other', 'admin'],
+}
+
+MATCH_CACHE_SECONDS = 60 * 60
+
+
+def weighted_interests(interests):
+    """The first interest of an activity weighs 2, the rest 1"""
+    return {interest: 2.0 if position == 0 else 1.0 for position, interest in enumerate(interests)}
+
+
+def event_slot(start):
+    """The availability choice an event's start time falls into"""
+    start = timezone.localtime(start)
+    if start.weekday() >= 5:
+        return 'weekends'
+    if start.hour >= 17:
+        return 'evenings'
+    return 'weekdays'
+
+
+def event_availability(start):
+    slot = event_slot(start)
+    return {slot: 1.0, 'flexible': 1.0, 'events': 1.0}
+
+
+def program_availability():
+    # Programs run over weeks; anyone but event-only volunteers can take part
+    return {'flexible': 1.0, 'weekdays': 0.8, 'weekends': 0.8, 'evenings': 0.8}
+
+
+def score(matched_weight, availability_weight, hours_contributed):
+    # Experience only breaks ties between equally suited volunteers
+    return round(matched_weight + availability_weight + min(float(hours_contributed), 100) / 1000, 3)
+
+
+def candidate_rows(interests):
+    """(id, first_name, last_name, email, interests, availability, hours) for volunteers sharing an interest"""
+    volunteers = Volunteer.objects.filter(
+        status__in=MATCHABLE_STATUSES, id__in=segments.members('volunteers', interests)
+    )
+    return volunteers.values_list(
+        'id', 'first_name', 'last_name', 'email', 'interests', 'availability', 'hours_contributed'
+    )
+
+
+def rank(rows, interest_weights, availability_weights, limit):
+    ranked = []
+    for pk, first_name, last_name, email, interests, availability, hours in rows:
+        matched = [i for i in Volunteer.normalize_interests(interests) if i in interest_weights]
+        if not matched or availability not in availability_weights:
+            continue
+        ranked.append({
+            'id': pk,
+            'full_name': f"{first_name} {last_name}",
+            'email': email,
+            'availability': availability,
+            'matched_interests': matched,
+            'score': score(
+                sum(interest_weights[i] for i in matched), availability_weights[availability], hours
+            ),
+        })
+    ranked.sort(key=lambda candidate: (-candidate['score'], candidate['id']))
+    return ranked[:limit]
+
+
+def match_event(event, limit=20):
+    interests = weighted_interests(EVENT_INTERESTS.get(event.event_type, ['other']))
+    return rank(candidate_rows(list(interests)), interests, event_availability(event.start_date), limit)
+
+
+def match_program(program, limit=20):
+    interests = weighted_interests(PROGRAM_INTERESTS.get(program.program_type, ['other']))
+    return rank(candidate_rows(list(interests)), interests, program_availability(), limit)
+
+
+def volunteers_signature():
+    """Changes whenever a volunteer is added, edited or removed"""
+    row = Volunteer.objects.aggregate(count=Count('id'), updated=Max('updated_at'))
+    return f"{row['count']}-{row['updated'].timestamp() if row['updated'] else 0}"
+
+
+def match_upcoming_events(limit=20):
+    """Ranked candidates for every upcoming event, cached until volunteers or events change.
+
+    All matchable volunteers are read once into an in-memory inverted index;
+    each event then only scores the postings of its own interests.
+    """
+    events = list(
+        Event.objects.filter(is_active=True, status='upcoming', start_date__gte=timezone.now())
+        .order_by('start_date').values('id', 'slug', 'title', 'event_type', 'start_date', 'updated_at')
+    )
+    events_signature = hashlib.md5(
+        ','.join(f"{e['id']}.{e['updated_at'].timestamp()}" for e in events).encode()
+    ).hexdigest()
+    key = f"volunteer-matches:upcoming:{limit}:{volunteers_signature()}:{events_signature}"
+    matches = cache.get(key)
+    if matches is not None:
+        return matches
+
+    volunteers = {}
+    postings = {}
+    for row in Volunteer.objects.filter(status__in=MATCHABLE_STATUSES, is_active=True).values_list(
+        'id', 'first_name', 'last_name', 'email', 'interests', 'availability', 'hours_contributed'
+    ):
+        volunteers[row[0]] = row
+        for interest in Volunteer.normalize_interests(row[4]):
+            postings.setdefault(interest, set()).add(row[0])
+
+    matches = []
+    for event in events:
+        interests = weighted_interests(EVENT_INTERESTS.get(event['event_type'], ['other']))
+        candidate_ids = set().union(*(postings.get(interest, ()) for interest in interests))
+        matches.append({
+            'event': {field: event[field] for field in ('id', 'slug', 'title', 'event_type', 'start_date')},
+            'candidates': rank(
+                (volunteers[pk] for pk in candidate_ids),
+                interests, event_availability(event['start_date']), limit,
+            ),
+        })
+
+    cache.set(key, matches, MATCH_CACHE_SECONDS)
+    return matches
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-19 13:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('donations', '0002_donation_alumni_donation_period_donation_is_alumni'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DonorProfile',
+            fields=[
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('email', models.EmailField(max_length=254, primary_key=True, serialize=False)),
+                ('donor_name', models.CharField(blank=True, max_length=200)),
+                ('total_donated', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('donations_count', models.PositiveIntegerField(default=0)),
+                ('first_donation_at', models.DateTimeField(blank=True, null=True)),
+                ('last_donation_at', models.DateTimeField(blank=True, null=True)),
+                ('campaign_breakdown', models.JSONField(blank=True, default=dict)),
+            ],
+            options={
+                'verbose_name': 'Donor Profile',
+                'verbose_name_plural': 'Donor Profiles',
+                'ordering': ['-total_donated'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='donation',
+            index=models.Index(fields=['donor_email', '-created_at', 'status', 'amount', 'currency'], name='donation_donor_history_idx'),
+        ),
+    ]
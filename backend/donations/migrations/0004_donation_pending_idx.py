@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-19 13:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('donations', '0003_donorprofile_donation_donor_history_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='donation',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['payment_method', 'created_at'], name='donation_pending_idx'),
+        ),
+    ]
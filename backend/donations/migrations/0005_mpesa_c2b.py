@@ -0,0 +1,59 @@
+# Generated by Django 4.2.7 on 2026-10-19 13:34
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_account_references(apps, schema_editor):
+    """Index existing alumni donations by their normalized paybill account reference"""
+    from donations.utils import normalize_account_reference
+
+    Donation = apps.get_model('donations', 'Donation')
+    donations = list(Donation.objects.filter(is_alumni=True).only('id', 'donor_name'))
+    for donation in donations:
+        depositor_name = donation.donor_name.replace(' ', '').upper() if donation.donor_name else "ALUMNI"
+        donation.mpesa_account_reference = normalize_account_reference(depositor_name)
+    Donation.objects.bulk_update(donations, ['mpesa_account_reference'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('donations', '0004_donation_pending_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='donation',
+            name='mpesa_account_reference',
+            field=models.CharField(blank=True, db_index=True, help_text='Normalized paybill account reference, used to match C2B payments', max_length=200, null=True),
+        ),
+        migrations.CreateModel(
+            name='MpesaC2BConfirmation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('trans_id', models.CharField(max_length=50, unique=True)),
+                ('trans_time', models.DateTimeField(blank=True, null=True)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('business_short_code', models.CharField(blank=True, max_length=20)),
+                ('bill_ref_number', models.CharField(blank=True, max_length=200)),
+                ('account_reference', models.CharField(blank=True, help_text='Normalized bill_ref_number', max_length=200)),
+                ('msisdn', models.CharField(blank=True, max_length=50)),
+                ('payer_name', models.CharField(blank=True, max_length=200)),
+                ('payload', models.JSONField()),
+                ('status', models.CharField(choices=[('received', 'Received'), ('matched', 'Matched'), ('unmatched', 'Unmatched')], default='received', max_length=20)),
+                ('matched_at', models.DateTimeField(blank=True, null=True)),
+                ('donation', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='c2b_confirmations', to='donations.donation')),
+            ],
+            options={
+                'verbose_name': 'M-Pesa C2B Confirmation',
+                'verbose_name_plural': 'M-Pesa C2B Confirmations',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(condition=models.Q(('status', 'received')), fields=['id'], name='c2b_received_idx')],
+            },
+        ),
+        migrations.RunPython(populate_account_references, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-19 13:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('donations', '0005_mpesa_c2b'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='donationcampaign',
+            index=models.Index(fields=['is_active', 'campaign_type'], name='campaign_active_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='donationcampaign',
+            index=models.Index(fields=['is_active', 'is_urgent'], name='campaign_active_urgent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='donationcampaign',
+            index=models.Index(fields=['is_active', 'end_date'], name='campaign_active_end_idx'),
+        ),
+    ]
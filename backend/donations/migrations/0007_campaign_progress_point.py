@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-19 13:38
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('donations', '0006_campaign_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CampaignProgressPoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.DateTimeField(help_text='Start of the hour')),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('donor_count', models.PositiveIntegerField(default=0)),
+                ('cumulative_amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('cumulative_donor_count', models.PositiveIntegerField(default=0)),
+                ('campaign', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='progress_points', to='donations.donationcampaign')),
+            ],
+            options={
+                'verbose_name': 'Campaign Progress Point',
+                'verbose_name_plural': 'Campaign Progress Points',
+                'ordering': ['campaign', 'bucket'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='campaignprogresspoint',
+            constraint=models.UniqueConstraint(fields=('campaign', 'bucket'), name='campaign_progress_bucket_unique'),
+        ),
+    ]
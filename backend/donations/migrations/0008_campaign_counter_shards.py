@@ -0,0 +1,55 @@
+# Generated by Django 4.2.7 on 2026-10-19 13:39
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_donor_counts(apps, schema_editor):
+    """Count the completed donations each campaign has already received"""
+    from django.db.models import Count, OuterRef, Subquery
+    from django.db.models.functions import Coalesce
+
+    DonationCampaign = apps.get_model('donations', 'DonationCampaign')
+    Donation = apps.get_model('donations', 'Donation')
+    completed = Donation.objects.filter(campaign_id=OuterRef('pk'), status='completed').order_by().values(
+        'campaign_id'
+    ).annotate(count=Count('id')).values('count')
+    DonationCampaign.objects.update(donor_count=Coalesce(Subquery(completed), 0))
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('donations', '0007_campaign_progress_point'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='donationcampaign',
+            name='counter_shards',
+            field=models.PositiveSmallIntegerField(default=0, help_text='Spread completions over this many counter rows (0 updates the campaign row directly). Use for urgent campaigns that take many donations at once.'),
+        ),
+        migrations.AddField(
+            model_name='donationcampaign',
+            name='donor_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(populate_donor_counts, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='CampaignCounterShard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shard', models.PositiveSmallIntegerField()),
+                ('raised_amount', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('donor_count', models.PositiveIntegerField(default=0)),
+                ('campaign', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='counter_shard_rows', to='donations.donationcampaign')),
+            ],
+            options={
+                'verbose_name': 'Campaign Counter Shard',
+                'verbose_name_plural': 'Campaign Counter Shards',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='campaigncountershard',
+            constraint=models.UniqueConstraint(fields=('campaign', 'shard'), name='campaign_counter_shard_unique'),
+        ),
+    ]
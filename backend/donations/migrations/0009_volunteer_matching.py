@@ -0,0 +1,63 @@
+# Generated by Django 4.2.7 on 2026-10-19 13:41
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def build_interest_index(apps, schema_editor):
+    """GIN index on PostgreSQL; interest postings for existing volunteers elsewhere"""
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE INDEX IF NOT EXISTS volunteer_interests_gin '
+            'ON donations_volunteer USING gin (interests jsonb_path_ops)'
+        )
+        return
+
+    Volunteer = apps.get_model('donations', 'Volunteer')
+    VolunteerInterest = apps.get_model('donations', 'VolunteerInterest')
+    postings = []
+    for pk, interests in Volunteer.objects.values_list('id', 'interests').iterator():
+        if isinstance(interests, list):
+            keys = {str(interest).strip().lower() for interest in interests if str(interest).strip()}
+            postings.extend(VolunteerInterest(volunteer_id=pk, interest=key) for key in sorted(keys))
+    VolunteerInterest.objects.bulk_create(postings, batch_size=1000)
+
+
+def drop_interest_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS volunteer_interests_gin')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('donations', '0008_campaign_counter_shards'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VolunteerInterest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('interest', models.CharField(max_length=50)),
+            ],
+            options={
+                'verbose_name': 'Volunteer Interest',
+                'verbose_name_plural': 'Volunteer Interests',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='volunteer',
+            index=models.Index(fields=['status', 'is_active'], name='volunteer_status_idx'),
+        ),
+        migrations.AddField(
+            model_name='volunteerinterest',
+            name='volunteer',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='interest_postings', to='donations.volunteer'),
+        ),
+        migrations.AddConstraint(
+            model_name='volunteerinterest',
+            constraint=models.UniqueConstraint(fields=('interest', 'volunteer'), name='volunteer_interest_unique'),
+        ),
+        migrations.RunPython(build_interest_index, drop_interest_index),
+    ]
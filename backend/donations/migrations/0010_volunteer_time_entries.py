@@ -0,0 +1,51 @@
+# Generated by Django 4.2.7 on 2026-10-19 13:42
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0002_delete_organization_alter_event_description_and_more'),
+        ('programs', '0002_alter_program_application_process_and_more'),
+        ('donations', '0009_volunteer_matching'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='volunteer',
+            name='hours_contributed',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.CreateModel(
+            name='VolunteerTimeEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('date', models.DateField()),
+                ('hours', models.DecimalField(decimal_places=2, max_digits=5)),
+                ('notes', models.CharField(blank=True, max_length=200, null=True)),
+                ('recorded_by', models.CharField(blank=True, max_length=150, null=True)),
+                ('event', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='volunteer_time_entries', to='news.event')),
+                ('program', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='volunteer_time_entries', to='programs.program')),
+                ('volunteer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='time_entries', to='donations.volunteer')),
+            ],
+            options={
+                'verbose_name': 'Volunteer Time Entry',
+                'verbose_name_plural': 'Volunteer Time Entries',
+                'ordering': ['-date', '-created_at'],
+                'indexes': [models.Index(fields=['date', 'hours'], name='time_entry_date_idx'), models.Index(fields=['event', 'date', 'hours'], name='time_entry_event_idx'), models.Index(fields=['program', 'date', 'hours'], name='time_entry_program_idx'), models.Index(fields=['volunteer', 'event', 'program'], name='time_entry_volunteer_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='volunteertimeentry',
+            constraint=models.CheckConstraint(check=models.Q(models.Q(('event__isnull', False), ('program__isnull', True)), models.Q(('event__isnull', True), ('program__isnull', False)), _connector='OR'), name='time_entry_one_activity'),
+        ),
+        migrations.AddConstraint(
+            model_name='volunteertimeentry',
+            constraint=models.CheckConstraint(check=models.Q(('hours__gt', 0)), name='time_entry_positive_hours'),
+        ),
+    ]
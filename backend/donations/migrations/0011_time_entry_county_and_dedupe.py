@@ -0,0 +1,54 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:25
+
+from collections import defaultdict
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def merge_duplicate_entries(apps, schema_editor):
+    """Keep the first entry per volunteer, activity and day; resubmitted sheets had added the rest"""
+    VolunteerTimeEntry = apps.get_model('donations', 'VolunteerTimeEntry')
+    Volunteer = apps.get_model('donations', 'Volunteer')
+
+    kept, duplicates, excess = set(), [], defaultdict(int)
+    rows = VolunteerTimeEntry.objects.order_by('id').values_list('id', 'volunteer_id', 'event_id', 'program_id', 'date', 'hours')
+    for pk, volunteer_id, event_id, program_id, date, hours in rows.iterator():
+        key = (volunteer_id, event_id, program_id, date)
+        if key in kept:
+            duplicates.append(pk)
+            excess[volunteer_id] += hours
+        else:
+            kept.add(key)
+
+    VolunteerTimeEntry.objects.filter(pk__in=duplicates).delete()
+    for volunteer_id, hours in excess.items():
+        Volunteer.objects.filter(pk=volunteer_id).update(hours_contributed=F('hours_contributed') - hours)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('donations', '0010_volunteer_time_entries'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_entries, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='volunteertimeentry',
+            name='county',
+            field=models.CharField(blank=True, default='', help_text='County the session took place in', max_length=100),
+        ),
+        migrations.AddIndex(
+            model_name='volunteertimeentry',
+            index=models.Index(fields=['county', 'date', 'hours'], name='time_entry_county_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='volunteertimeentry',
+            constraint=models.UniqueConstraint(condition=models.Q(('event__isnull', False)), fields=('volunteer', 'event', 'date'), name='time_entry_unique_event_day'),
+        ),
+        migrations.AddConstraint(
+            model_name='volunteertimeentry',
+            constraint=models.UniqueConstraint(condition=models.Q(('program__isnull', False)), fields=('volunteer', 'program', 'date'), name='time_entry_unique_program_day'),
+        ),
+    ]
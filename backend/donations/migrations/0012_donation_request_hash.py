@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('donations', '0011_time_entry_county_and_dedupe'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='donation',
+            name='request_hash',
+            field=models.CharField(blank=True, editable=False, help_text='SHA-256 of the create request an Idempotency-Key was first used with', max_length=64),
+        ),
+    ]
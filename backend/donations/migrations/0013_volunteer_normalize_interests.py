@@ -0,0 +1,30 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:40
+
+from django.db import migrations
+
+
+def normalize_interests(apps, schema_editor):
+    """Store volunteer interests lowercased, as Volunteer.save now does"""
+    Volunteer = apps.get_model('donations', 'Volunteer')
+    changed = []
+    for volunteer in Volunteer.objects.only('id', 'interests').iterator():
+        if not isinstance(volunteer.interests, list):
+            continue
+        interests = list(dict.fromkeys(
+            str(interest).strip().lower() for interest in volunteer.interests if str(interest).strip()
+        ))
+        if interests != volunteer.interests:
+            volunteer.interests = interests
+            changed.append(volunteer)
+    Volunteer.objects.bulk_update(changed, ['interests'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('donations', '0012_donation_request_hash'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_interests, migrations.RunPython.noop),
+    ]
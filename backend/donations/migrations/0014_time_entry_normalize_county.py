@@ -0,0 +1,26 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:41
+
+from django.db import migrations
+
+
+def normalize_counties(apps, schema_editor):
+    """Rewrite stored counties in the form VolunteerTimeEntry.normalize_county now writes"""
+    VolunteerTimeEntry = apps.get_model('donations', 'VolunteerTimeEntry')
+    for county in VolunteerTimeEntry.objects.exclude(county='').values_list('county', flat=True).distinct():
+        normalized = ' '.join(
+            '-'.join(part[:1].upper() + part[1:].lower() for part in word.split('-'))
+            for word in county.split()
+        )
+        if normalized != county:
+            VolunteerTimeEntry.objects.filter(county=county).update(county=normalized)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('donations', '0013_volunteer_normalize_interests'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_counties, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,103 @@
+"""Minimal offline stand-in for the Stripe PaymentIntents API.
+
+Only the endpoints used by ``donations.stripe_gateway`` are implemented, with
+Stripe's idempotency semantics, so the gateway can be exercised and benchmarked
+without network access.
+"""
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl
+
+
+class MockStripeHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, so connection reuse is measurable
+    disable_nagle_algorithm = True  # headers and body go out as separate writes
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Request-Id', f"req_{uuid.uuid4().hex[:14]}")
+        if self.close_connection:
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status, message):
+        self._send(status, {'error': {'type': 'invalid_request_error', 'message': message}})
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        params = dict(parse_qsl(self.rfile.read(length).decode()))
+        if self.path.rstrip('/') != '/v1/payment_intents':
+            return self._error(404, f"Unrecognized request URL (POST: {self.path})")
+
+        self.server.simulate_latency()
+        key = self.headers.get('Idempotency-Key')
+        with self.server.lock:
+            self.server.stats['create_requests'] += 1
+            if key and key in self.server.idempotency:
+                self.server.stats['idempotent_replays'] += 1
+                return self._send(200, self.server.intents[self.server.idempotency[key]])
+
+            intent_id = f"pi_{uuid.uuid4().hex[:24]}"
+            intent = {
+                'id': intent_id,
+                'object': 'payment_intent',
+                'amount': int(params.get('amount', 0)),
+                'currency': params.get('currency', 'kes'),
+                'client_secret': f"{intent_id}_secret_{uuid.uuid4().hex[:24]}",
+                'status': 'requires_payment_method',
+                'livemode': False,
+                'metadata': {
+                    k[len('metadata['):-1]: v for k, v in params.items() if k.startswith('metadata[')
+                },
+            }
+            self.server.intents[intent_id] = intent
+            if key:
+                self.server.idempotency[key] = intent_id
+        self._send(200, intent)
+
+    def do_GET(self):
+        prefix = '/v1/payment_intents/'
+        if not self.path.startswith(prefix):
+            return self._error(404, f"Unrecognized request URL (GET: {self.path})")
+
+        self.server.simulate_latency()
+        intent = self.server.intents.get(self.path[len(prefix):].rstrip('/'))
+        if not intent:
+            return self._error(404, 'No such payment_intent')
+        self._send(200, intent)
+
+
+class MockStripeServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host='127.0.0.1', port=12111, latency_ms=0):
+        super().__init__((host, port), MockStripeHandler)
+        self.latency_ms = latency_ms
+        self.lock = threading.Lock()
+        self.intents = {}
+        self.idempotency = {}
+        self.stats = {'create_requests': 0, 'idempotent_replays': 0}
+
+    @property
+    def api_base(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def simulate_latency(self):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+    def start_in_background(self):
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
@@ -1,16 +1,54 @@
-from django.db import models
+import random
+from collections import defaultdict
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models import Case, DecimalField, F, FloatField, Q, Sum, Value, When
+from django.db.models.functions import Cast, Greatest, Least
 from django.utils import timezone
 from decimal import Decimal
-from core.models import BaseModel
-
-
-class DonationCampaign(BaseModel):
+from core.models import BaseModel, CacheVersionMixin, InterestPosting
+from core.timewindows import TimeWindows
+from .utils import normalize_account_reference
+
+
+class DonationCampaignQuerySet(models.QuerySet):
+    def with_progress(self):
+        """Annotate ``progress`` (0-100) and ``remaining`` in SQL so they can be filtered and sorted"""
+        return self.annotate(
+            progress=Case(
+                When(goal_amount__gt=0, then=Least(
+                    Cast('raised_amount', FloatField()) * 100 / Cast('goal_amount', FloatField()),
+                    Value(100.0),
+                )),
+                default=Value(0.0),
+                output_field=FloatField(),
+            ),
+            remaining=Greatest(
+                F('goal_amount') - F('raised_amount'),
+                Value(Decimal('0')),
+                output_field=DecimalField(max_digits=12, decimal_places=2),
+            ),
+        )
+
+
+class DonationCampaign(CacheVersionMixin, BaseModel):
     """Donation campaigns and fundraising initiatives"""
+    CACHE_VERSION_KEY = 'donations:campaign-version'
+    TIME_WINDOWS = TimeWindows(start='start_date', end='end_date', dates=True, soon=timedelta(days=7))
+
     title = models.CharField(max_length=200)
     slug = models.SlugField(unique=True)
     description = models.TextField()
     goal_amount = models.DecimalField(max_digits=12, decimal_places=2)
     raised_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    donor_count = models.PositiveIntegerField(default=0)
+    counter_shards = models.PositiveSmallIntegerField(
+        default=0,
+        help_text="Spread completions over this many counter rows (0 updates the campaign row directly). "
+                  "Use for urgent campaigns that take many donations at once."
+    )
     
     # Campaign details
     start_date = models.DateField()
@@ -33,10 +71,17 @@ class DonationCampaign(BaseModel):
     
     order = models.PositiveIntegerField(default=0)
 
+    objects = DonationCampaignQuerySet.as_manager()
+
     class Meta:
         ordering = ['order', '-created_at']
         verbose_name = "Donation Campaign"
         verbose_name_plural = "Donation Campaigns"
+        indexes = [
+            models.Index(fields=['is_active', 'campaign_type'], name='campaign_active_type_idx'),
+            models.Index(fields=['is_active', 'is_urgent'], name='campaign_active_urgent_idx'),
+            models.Index(fields=['is_active', 'end_date'], name='campaign_active_end_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -51,6 +96,18 @@ class DonationCampaign(BaseModel):
     def remaining_amount(self):
         return max(0, self.goal_amount - self.raised_amount)
 
+    def pending_counter_totals(self):
+        """(amount, donor count) held in counter shards and not yet compacted into this row"""
+        if not self.counter_shards:
+            return Decimal('0'), 0
+        key = f"campaign-counter-shards:{self.pk}"
+        totals = cache.get(key)
+        if totals is None:
+            row = self.counter_shard_rows.aggregate(amount=Sum('raised_amount'), count=Sum('donor_count'))
+            totals = (row['amount'] or Decimal('0'), row['count'] or 0)
+            cache.set(key, totals, settings.CAMPAIGN_COUNTER_CACHE_SECONDS)
+        return totals
+
 
 class Donation(BaseModel):
     """Individual donations"""
@@ -106,7 +163,15 @@ class Donation(BaseModel):
         ('other', 'Other'),
     ])
     transaction_id = models.CharField(max_length=200, unique=True)
+    request_hash = models.CharField(
+        max_length=64, blank=True, editable=False,
+        help_text="SHA-256 of the create request an Idempotency-Key was first used with"
+    )
     payment_reference = models.CharField(max_length=200, blank=True, null=True)
+    mpesa_account_reference = models.CharField(
+        max_length=200, blank=True, null=True, db_index=True,
+        help_text="Normalized paybill account reference, used to match C2B payments"
+    )
 
     # Status and Processing
     status = models.CharField(max_length=20, choices=DONATION_STATUS, default='pending')
@@ -126,6 +191,19 @@ class Donation(BaseModel):
         ordering = ['-created_at']
         verbose_name = "Donation"
         verbose_name_plural = "Donations"
+        indexes = [
+            # Covers the donor history listing without touching the table
+            models.Index(
+                fields=['donor_email', '-created_at', 'status', 'amount', 'currency'],
+                name='donation_donor_history_idx',
+            ),
+            # Only pending rows are indexed, so the reconciler's scan stays small
+            models.Index(
+                fields=['payment_method', 'created_at'],
+                condition=Q(status='pending'),
+                name='donation_pending_idx',
+            ),
+        ]
 
     def __str__(self):
         donor = "Anonymous" if self.is_anonymous else self.donor_name
@@ -170,18 +248,312 @@ class Donation(BaseModel):
             if not self.payment_method:
                 self.payment_method = 'mpesa'
 
-        # Update campaign raised amount when donation is completed
-        if self.status == 'completed' and self.campaign:
+            self.mpesa_account_reference = normalize_account_reference(self.get_mpesa_account_number())
+
+        self.donor_email = DonorProfile.normalize_email(self.donor_email)
+
+        # Detect the transition to completed so totals are only counted once
+        is_completion = False
+        if self.status == 'completed':
             if self.pk:  # Existing donation
-                old_donation = Donation.objects.get(pk=self.pk)
-                if old_donation.status != 'completed':
-                    self.campaign.raised_amount += self.amount
-                    self.campaign.save()
+                old_status = Donation.objects.filter(pk=self.pk).values_list('status', flat=True).first()
+                is_completion = old_status != 'completed'
             else:  # New donation
-                self.campaign.raised_amount += self.amount
-                self.campaign.save()
+                is_completion = True
+
+        if is_completion and not self.processed_at:
+            self.processed_at = timezone.now()
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+            if is_completion:
+                Donation.apply_completion_effects([self])
+
+    @classmethod
+    def apply_completion_effects(cls, donations):
+        """Roll newly completed donations into campaign and donor totals"""
+        now = timezone.now()
+        campaign_totals = defaultdict(lambda: [Decimal('0'), 0])
+        for donation in donations:
+            if donation.campaign_id:
+                campaign_totals[donation.campaign_id][0] += Decimal(donation.amount)
+                campaign_totals[donation.campaign_id][1] += 1
+
+        # Update campaign raised amount when donation is completed; sharded campaigns
+        # take the increment on a random shard row instead of the contended campaign row
+        shard_counts = dict(
+            DonationCampaign.objects.filter(pk__in=campaign_totals).values_list('id', 'counter_shards')
+        )
+        for campaign_id, (total, count) in campaign_totals.items():
+            if shard_counts.get(campaign_id):
+                CampaignCounterShard.increment(
+                    campaign_id, random.randrange(shard_counts[campaign_id]), total, count
+                )
+            else:
+                DonationCampaign.objects.filter(pk=campaign_id).update(
+                    raised_amount=F('raised_amount') + total,
+                    donor_count=F('donor_count') + count,
+                    updated_at=now,
+                )
+
+        DonorProfile.record_donations(donations)
+        # Sharded campaigns reach the series when their shards are compacted
+        CampaignProgressPoint.record_donations(
+            [donation for donation in donations if not shard_counts.get(donation.campaign_id)]
+        )
+
+
+class DonorProfile(BaseModel):
+    """Denormalized lifetime giving stats per donor, keyed by normalized email"""
+    email = models.EmailField(primary_key=True)
+    donor_name = models.CharField(max_length=200, blank=True)
+
+    # Lifetime totals over completed donations
+    total_donated = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    donations_count = models.PositiveIntegerField(default=0)
+    first_donation_at = models.DateTimeField(blank=True, null=True)
+    last_donation_at = models.DateTimeField(blank=True, null=True)
+
+    # {"<campaign id or 'general'>": {"title": ..., "amount": "...", "count": n}}
+    campaign_breakdown = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        ordering = ['-total_donated']
+        verbose_name = "Donor Profile"
+        verbose_name_plural = "Donor Profiles"
+
+    def __str__(self):
+        return f"{self.email} - {self.total_donated}"
+
+    @staticmethod
+    def normalize_email(email):
+        return (email or '').strip().lower()
+
+    @staticmethod
+    def campaign_key(campaign_id):
+        return str(campaign_id) if campaign_id else 'general'
+
+    @classmethod
+    def record_donations(cls, donations):
+        """Fold newly completed donations into their donors' lifetime totals"""
+        by_email = defaultdict(list)
+        for donation in donations:
+            by_email[cls.normalize_email(donation.donor_email)].append(donation)
+        if not by_email:
+            return []
+
+        campaign_ids = {d.campaign_id for d in donations if d.campaign_id}
+        titles = dict(DonationCampaign.objects.filter(pk__in=campaign_ids).values_list('id', 'title'))
+
+        with transaction.atomic():
+            # Make sure every donor has a row, then lock them all
+            cls.objects.bulk_create([cls(email=email) for email in by_email], ignore_conflicts=True)
+            profiles = cls.objects.select_for_update().in_bulk(list(by_email))
+
+            for email, group in by_email.items():
+                profile = profiles[email]
+                breakdown = profile.campaign_breakdown or {}
+                for donation in group:
+                    gift_date = donation.processed_at or donation.created_at
+                    profile.donor_name = donation.donor_name or profile.donor_name
+                    profile.total_donated += Decimal(donation.amount)
+                    profile.donations_count += 1
+                    if not profile.first_donation_at or gift_date < profile.first_donation_at:
+                        profile.first_donation_at = gift_date
+                    if not profile.last_donation_at or gift_date > profile.last_donation_at:
+                        profile.last_donation_at = gift_date
+
+                    entry = breakdown.setdefault(cls.campaign_key(donation.campaign_id), {
+                        'title': titles.get(donation.campaign_id, 'General Fund'),
+                        'amount': '0',
+                        'count': 0,
+                    })
+                    entry['amount'] = str((Decimal(entry['amount']) + Decimal(donation.amount)).quantize(Decimal('0.01')))
+                    entry['count'] += 1
+                profile.campaign_breakdown = breakdown
+                profile.updated_at = timezone.now()
+
+            cls.objects.bulk_update(profiles.values(), [
+                'donor_name', 'total_donated', 'donations_count', 'first_donation_at',
+                'last_donation_at', 'campaign_breakdown', 'updated_at'
+            ])
+        return list(profiles.values())
+
+
+class CampaignCounterShard(models.Model):
+    """One slice of a sharded campaign's raised amount and donor count, folded back by compaction"""
+    campaign = models.ForeignKey(DonationCampaign, on_delete=models.CASCADE, related_name='counter_shard_rows')
+    shard = models.PositiveSmallIntegerField()
+    raised_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    donor_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Campaign Counter Shard"
+        verbose_name_plural = "Campaign Counter Shards"
+        constraints = [
+            models.UniqueConstraint(fields=['campaign', 'shard'], name='campaign_counter_shard_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.campaign} #{self.shard}: {self.raised_amount}"
+
+    @classmethod
+    def increment(cls, campaign_id, shard, amount, count):
+        shard_row = cls.objects.filter(campaign_id=campaign_id, shard=shard)
+        if not shard_row.update(raised_amount=F('raised_amount') + amount, donor_count=F('donor_count') + count):
+            cls.objects.bulk_create([cls(campaign_id=campaign_id, shard=shard)], ignore_conflicts=True)
+            shard_row.update(raised_amount=F('raised_amount') + amount, donor_count=F('donor_count') + count)
+
+    @classmethod
+    def compact(cls, campaign_ids=None):
+        """Fold shard totals into their campaign rows; returns the number of campaigns compacted"""
+        pending = cls.objects.filter(Q(raised_amount__gt=0) | Q(donor_count__gt=0))
+        if campaign_ids is not None:
+            pending = pending.filter(campaign_id__in=campaign_ids)
+
+        compacted = 0
+        for campaign_id in pending.values_list('campaign_id', flat=True).distinct().order_by('campaign_id'):
+            with transaction.atomic():
+                # Locking the shards holds back their increments for the length of the fold
+                shards = list(cls.objects.select_for_update().filter(campaign_id=campaign_id))
+                amount = sum((shard.raised_amount for shard in shards), Decimal('0'))
+                count = sum(shard.donor_count for shard in shards)
+                DonationCampaign.objects.filter(pk=campaign_id).update(
+                    raised_amount=F('raised_amount') + amount,
+                    donor_count=F('donor_count') + count,
+                    updated_at=timezone.now(),
+                )
+                cls.objects.filter(pk__in=[shard.pk for shard in shards]).update(raised_amount=0, donor_count=0)
+                CampaignProgressPoint.add(
+                    campaign_id, CampaignProgressPoint.bucket_for(timezone.now()), amount, count
+                )
+            cache.delete(f"campaign-counter-shards:{campaign_id}")
+            compacted += 1
+        return compacted
+
+
+class CampaignProgressPoint(models.Model):
+    """Append-only hourly raised-amount series per campaign, for progress charts"""
+    campaign = models.ForeignKey(DonationCampaign, on_delete=models.CASCADE, related_name='progress_points')
+    bucket = models.DateTimeField(help_text="Start of the hour")
+
+    # Completed donations within the hour
+    amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    donor_count = models.PositiveIntegerField(default=0)
+
+    # Running totals at the end of the hour
+    cumulative_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    cumulative_donor_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['campaign', 'bucket']
+        verbose_name = "Campaign Progress Point"
+        verbose_name_plural = "Campaign Progress Points"
+        constraints = [
+            models.UniqueConstraint(fields=['campaign', 'bucket'], name='campaign_progress_bucket_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.campaign} @ {self.bucket}: {self.cumulative_amount}"
+
+    @staticmethod
+    def bucket_for(moment):
+        return moment.replace(minute=0, second=0, microsecond=0)
+
+    @classmethod
+    def record_donations(cls, donations):
+        """Add newly completed donations to their campaigns' hourly buckets"""
+        deltas = defaultdict(lambda: [Decimal('0'), 0])
+        for donation in donations:
+            if donation.campaign_id:
+                moment = donation.processed_at or donation.created_at or timezone.now()
+                delta = deltas[(donation.campaign_id, cls.bucket_for(moment))]
+                delta[0] += Decimal(donation.amount)
+                delta[1] += 1
+
+        for (campaign_id, bucket), (amount, count) in sorted(deltas.items()):
+            cls.add(campaign_id, bucket, amount, count)
+
+    @classmethod
+    def add(cls, campaign_id, bucket, amount, count):
+        with transaction.atomic():
+            # Open the bucket at the running totals of the bucket before it
+            previous = cls.objects.filter(campaign_id=campaign_id, bucket__lt=bucket).order_by('-bucket').values(
+                'cumulative_amount', 'cumulative_donor_count'
+            ).first() or {'cumulative_amount': 0, 'cumulative_donor_count': 0}
+            cls.objects.bulk_create([cls(
+                campaign_id=campaign_id,
+                bucket=bucket,
+                cumulative_amount=previous['cumulative_amount'],
+                cumulative_donor_count=previous['cumulative_donor_count'],
+            )], ignore_conflicts=True)
+
+            cls.objects.filter(campaign_id=campaign_id, bucket=bucket).update(
+                amount=F('amount') + amount, donor_count=F('donor_count') + count
+            )
+            # A late donation also lifts the running totals of every later bucket
+            cls.objects.filter(campaign_id=campaign_id, bucket__gte=bucket).update(
+                cumulative_amount=F('cumulative_amount') + amount,
+                cumulative_donor_count=F('cumulative_donor_count') + count,
+            )
+
+
+class MpesaC2BConfirmation(BaseModel):
+    """Raw Safaricom C2B paybill confirmations, matched to donors asynchronously"""
+    MATCH_STATUS = [
+        ('received', 'Received'),
+        ('matched', 'Matched'),
+        ('unmatched', 'Unmatched'),
+    ]
+
+    trans_id = models.CharField(max_length=50, unique=True)
+    trans_time = models.DateTimeField(blank=True, null=True)
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    business_short_code = models.CharField(max_length=20, blank=True)
+    bill_ref_number = models.CharField(max_length=200, blank=True)
+    account_reference = models.CharField(max_length=200, blank=True, help_text="Normalized bill_ref_number")
+    msisdn = models.CharField(max_length=50, blank=True)
+    payer_name = models.CharField(max_length=200, blank=True)
+    payload = models.JSONField()
+
+    # Matching
+    status = models.CharField(max_length=20, choices=MATCH_STATUS, default='received')
+    donation = models.ForeignKey(Donation, on_delete=models.SET_NULL, blank=True, null=True, related_name='c2b_confirmations')
+    matched_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = "M-Pesa C2B Confirmation"
+        verbose_name_plural = "M-Pesa C2B Confirmations"
+        indexes = [
+            # The matcher's work queue
+            models.Index(fields=['id'], condition=Q(status='received'), name='c2b_received_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.trans_id} - {self.bill_ref_number} - KES {self.amount}"
+
+    @classmethod
+    def from_payload(cls, payload):
+        """Build an unsaved row from a Daraja C2B confirmation body"""
+        trans_time = None
+        if payload.get('TransTime'):
+            trans_time = timezone.make_aware(datetime.strptime(str(payload['TransTime']), '%Y%m%d%H%M%S'))
+
+        names = (payload.get('FirstName'), payload.get('MiddleName'), payload.get('LastName'))
+        return cls(
+            trans_id=payload['TransID'],
+            trans_time=trans_time,
+            amount=Decimal(str(payload.get('TransAmount') or 0)),
+            business_short_code=str(payload.get('BusinessShortCode') or ''),
+            bill_ref_number=payload.get('BillRefNumber') or '',
+            account_reference=normalize_account_reference(payload.get('BillRefNumber')),
+            msisdn=str(payload.get('MSISDN') or ''),
+            payer_name=' '.join(name for name in names if name),
+            payload=payload,
+        )
 
-        super().save(*args, **kwargs)
 
 class DonationImpact(BaseModel):
     """Track how donations are used and their impact"""
@@ -251,7 +623,8 @@ class Volunteer(BaseModel):
     ], default='pending')
     
     # Volunteer tracking
-    hours_contributed = models.PositiveIntegerField(default=0)
+    # Maintained from VolunteerTimeEntry rows
+    hours_contributed = models.DecimalField(max_digits=8, decimal_places=2, default=0)
     projects_participated = models.PositiveIntegerField(default=0)
     start_date = models.DateField(blank=True, null=True)
     
@@ -262,14 +635,194 @@ class Volunteer(BaseModel):
         ordering = ['-created_at']
         verbose_name = "Volunteer"
         verbose_name_plural = "Volunteers"
+        indexes = [
+            models.Index(fields=['status', 'is_active'], name='volunteer_status_idx'),
+        ]
 
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
 
+    def save(self, *args, **kwargs):
+        self.interests = VolunteerInterest.stored(self.interests)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            VolunteerInterest.refresh([self])
+
     @property
     def full_name(self):
         return f"{self.first_name} {self.last_name}"
 
+    @staticmethod
+    def normalize_interests(interests):
+        """Interest keys from the submitted JSON array, lowercased and de-duplicated"""
+        return InterestPosting.normalize(interests)
+
+
+class VolunteerInterest(InterestPosting):
+    """Volunteer interest postings for segments and matching where Volunteer.interests has no GIN index"""
+    volunteer = models.ForeignKey(Volunteer, on_delete=models.CASCADE, related_name='interest_postings')
+    interest = models.CharField(max_length=50)
+
+    owner_field = 'volunteer'
+    segment_source = 'volunteers'
+
+    class Meta:
+        verbose_name = "Volunteer Interest"
+        verbose_name_plural = "Volunteer Interests"
+        constraints = [
+            models.UniqueConstraint(fields=['interest', 'volunteer'], name='volunteer_interest_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.volunteer} - {self.interest}"
+
+
+class VolunteerTimeEntry(BaseModel):
+    """Hours a volunteer gave to an event or program on a given day"""
+    volunteer = models.ForeignKey(Volunteer, on_delete=models.CASCADE, related_name='time_entries')
+    event = models.ForeignKey(
+        'news.Event', on_delete=models.PROTECT, related_name='volunteer_time_entries', blank=True, null=True
+    )
+    program = models.ForeignKey(
+        'programs.Program', on_delete=models.PROTECT, related_name='volunteer_time_entries', blank=True, null=True
+    )
+    date = models.DateField()
+    hours = models.DecimalField(max_digits=5, decimal_places=2)
+    county = models.CharField(max_length=100, blank=True, default='', help_text="County the session took place in")
+    notes = models.CharField(max_length=200, blank=True, null=True)
+    recorded_by = models.CharField(max_length=150, blank=True, null=True)
+
+    class Meta:
+        ordering = ['-date', '-created_at']
+        verbose_name = "Volunteer Time Entry"
+        verbose_name_plural = "Volunteer Time Entries"
+        constraints = [
+            models.CheckConstraint(
+                check=Q(event__isnull=False, program__isnull=True) | Q(event__isnull=True, program__isnull=False),
+                name='time_entry_one_activity',
+            ),
+            models.CheckConstraint(check=Q(hours__gt=0), name='time_entry_positive_hours'),
+            # One entry per volunteer, activity and day; a resubmitted sheet corrects it instead
+            models.UniqueConstraint(
+                fields=['volunteer', 'event', 'date'], condition=Q(event__isnull=False),
+                name='time_entry_unique_event_day',
+            ),
+            models.UniqueConstraint(
+                fields=['volunteer', 'program', 'date'], condition=Q(program__isnull=False),
+                name='time_entry_unique_program_day',
+            ),
+        ]
+        # Aggregates by period and activity read these indexes instead of the table
+        indexes = [
+            models.Index(fields=['date', 'hours'], name='time_entry_date_idx'),
+            models.Index(fields=['event', 'date', 'hours'], name='time_entry_event_idx'),
+            models.Index(fields=['program', 'date', 'hours'], name='time_entry_program_idx'),
+            models.Index(fields=['volunteer', 'event', 'program'], name='time_entry_volunteer_idx'),
+            models.Index(fields=['county', 'date', 'hours'], name='time_entry_county_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.volunteer} - {self.hours}h on {self.date}"
+
+    @property
+    def activity_key(self):
+        return ('event', self.event_id) if self.event_id else ('program', self.program_id)
+
+    @staticmethod
+    def normalize_county(county):
+        """'  uasin  GISHU ' -> 'Uasin Gishu', so the report filters and groups on exact values"""
+        return ' '.join(
+            '-'.join(part[:1].upper() + part[1:].lower() for part in word.split('-'))
+            for word in (county or '').split()
+        )
+
+    @classmethod
+    def _activity_keys(cls, volunteer_ids):
+        return {
+            (volunteer_id, ('event', event_id) if event_id else ('program', program_id))
+            for volunteer_id, event_id, program_id in cls.objects.filter(volunteer_id__in=volunteer_ids)
+            .values_list('volunteer_id', 'event_id', 'program_id').distinct()
+        }
+
+    @classmethod
+    def _apply_totals(cls, hours, projects):
+        """Add per-volunteer hour and project deltas in one UPDATE"""
+        volunteer_ids = set(hours) | set(projects)
+        if not volunteer_ids:
+            return
+        Volunteer.objects.filter(pk__in=volunteer_ids).update(
+            hours_contributed=F('hours_contributed') + Case(
+                *[When(pk=pk, then=Value(delta)) for pk, delta in hours.items()],
+                default=Value(Decimal('0')), output_field=DecimalField(max_digits=8, decimal_places=2),
+            ),
+            projects_participated=F('projects_participated') + Case(
+                *[When(pk=pk, then=Value(delta)) for pk, delta in projects.items()],
+                default=Value(0), output_field=models.IntegerField(),
+            ),
+            updated_at=timezone.now(),
+        )
+
+    @classmethod
+    def record(cls, entries):
+        """Store entries and roll them into the volunteers' totals in the same transaction.
+
+        An entry for a volunteer, activity and day that is already recorded
+        replaces the stored hours rather than adding to them, so resubmitting
+        a sheet corrects it. Returns (created, updated) entries.
+        """
+        volunteer_ids = {entry.volunteer_id for entry in entries}
+        with transaction.atomic():
+            # Serialize concurrent submissions for the same volunteers
+            list(Volunteer.objects.select_for_update().filter(pk__in=volunteer_ids).values_list('pk'))
+            seen = cls._activity_keys(volunteer_ids)
+            stored = {
+                (entry.volunteer_id, entry.activity_key, entry.date): entry
+                for entry in cls.objects.filter(volunteer_id__in=volunteer_ids, date__in={e.date for e in entries})
+            }
+
+            hours, projects = defaultdict(Decimal), defaultdict(int)
+            new, updated = [], []
+            now = timezone.now()
+            for entry in entries:
+                current = stored.get((entry.volunteer_id, entry.activity_key, entry.date))
+                if current is None:
+                    new.append(entry)
+                    continue
+                hours[entry.volunteer_id] += Decimal(entry.hours) - current.hours
+                current.hours, current.notes, current.county = entry.hours, entry.notes, entry.county
+                current.recorded_by, current.updated_at = entry.recorded_by, now
+                entry.pk = current.pk
+                updated.append(current)
+            cls.objects.bulk_update(updated, ['hours', 'notes', 'county', 'recorded_by', 'updated_at'])
+            created = cls.objects.bulk_create(new)
+
+            for entry in created:
+                hours[entry.volunteer_id] += Decimal(entry.hours)
+                key = (entry.volunteer_id, entry.activity_key)
+                if key not in seen:
+                    seen.add(key)
+                    projects[entry.volunteer_id] += 1
+            cls._apply_totals({pk: delta for pk, delta in hours.items() if delta}, projects)
+        return created, updated
+
+    @classmethod
+    def remove(cls, entries):
+        """Delete entries and take them back out of the volunteers' totals"""
+        entries = list(entries)
+        volunteer_ids = {entry.volunteer_id for entry in entries}
+        with transaction.atomic():
+            list(Volunteer.objects.select_for_update().filter(pk__in=volunteer_ids).values_list('pk'))
+            before = cls._activity_keys(volunteer_ids)
+            cls.objects.filter(pk__in=[entry.pk for entry in entries]).delete()
+            after = cls._activity_keys(volunteer_ids)
+
+            hours, projects = defaultdict(Decimal), defaultdict(int)
+            for entry in entries:
+                hours[entry.volunteer_id] -= Decimal(entry.hours)
+            for volunteer_id, _ in before - after:
+                projects[volunteer_id] -= 1
+            cls._apply_totals(hours, projects)
+
 
 class Partnership(BaseModel):
     """Partnership inquiries and collaborations"""
@@ -0,0 +1,176 @@
+"""Reconcile donations stuck in ``pending`` against the payment providers.
+
+Provider callbacks (``mpesa_stk``, ``stripe_webhook``) are the primary way a
+donation leaves ``pending``, but callbacks get lost. The reconciler asks the
+provider directly for every pending donation older than a grace period,
+applies the answers in bulk, and fails donations past the timeout whose final
+status check still shows no payment. Paybill sign-ups are never expired: their
+C2B payment can arrive at any time.
+"""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import requests
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from core.throttling import RateLimiter
+from . import stripe_gateway
+from .models import Donation
+from .utils import get_mpesa_access_token, query_mpesa_stk_status
+
+logger = logging.getLogger(__name__)
+
+STRIPE_COMPLETED = {'succeeded'}
+STRIPE_FAILED = {'canceled'}
+
+
+class MpesaStatusChecker:
+    method = 'mpesa'
+
+    def __init__(self):
+        self.session = requests.Session()
+        self.access_token = get_mpesa_access_token()
+        if not self.access_token:
+            raise Exception("Failed to get M-Pesa access token")
+
+    def __call__(self, payment_reference):
+        data = query_mpesa_stk_status(payment_reference, self.access_token, session=self.session)
+        # While the payment is in flight Daraja answers with an errorCode instead
+        result_code = data.get('ResultCode')
+        if result_code is None:
+            return None
+        return 'completed' if str(result_code) == '0' else 'failed'
+
+
+class StripeStatusChecker:
+    method = 'stripe'
+
+    def __call__(self, payment_reference):
+        intent = stripe_gateway.retrieve_payment_intent(payment_reference)
+        if intent.status in STRIPE_COMPLETED:
+            return 'completed'
+        if intent.status in STRIPE_FAILED:
+            return 'failed'
+        return None
+
+
+CHECKERS = {
+    'mpesa': MpesaStatusChecker,
+    'stripe': StripeStatusChecker,
+}
+
+
+def pending_batches(method, older_than, batch_size):
+    """Yield (id, payment_reference) batches through the partial pending index."""
+    queryset = Donation.objects.filter(
+        status='pending', payment_method=method, created_at__lt=older_than,
+    ).exclude(payment_reference__isnull=True).exclude(payment_reference='')
+
+    last_id = 0
+    while True:
+        batch = list(
+            queryset.filter(id__gt=last_id).order_by('id').values_list('id', 'payment_reference')[:batch_size]
+        )
+        if not batch:
+            return
+        yield batch
+        last_id = batch[-1][0]
+
+
+def apply_transitions(completed_ids, failed_ids):
+    """Move donations out of pending in bulk; only rows still pending are touched."""
+    now = timezone.now()
+    completed_count = failed_count = 0
+
+    with transaction.atomic():
+        if completed_ids:
+            donations = list(
+                Donation.objects.select_for_update().filter(id__in=completed_ids, status='pending')
+            )
+            completed_count = Donation.objects.filter(id__in=[d.id for d in donations]).update(
+                status='completed', processed_at=now, updated_at=now
+            )
+            for donation in donations:
+                donation.status = 'completed'
+                donation.processed_at = now
+            Donation.apply_completion_effects(donations)
+
+        if failed_ids:
+            failed_count = Donation.objects.filter(id__in=failed_ids, status='pending').update(
+                status='failed', updated_at=now
+            )
+
+    return completed_count, failed_count
+
+
+def stale_pending(methods, expires_before):
+    """Pending provider donations past the timeout, excluding paybill sign-ups."""
+    return Donation.objects.filter(
+        status='pending', payment_method__in=methods, created_at__lt=expires_before,
+    ).filter(Q(mpesa_account_reference__isnull=True) | Q(mpesa_account_reference=''))
+
+
+def expire_stale(queryset):
+    """Fail the given stale donations; callers only pass rows known to be unpaid."""
+    now = timezone.now()
+    return queryset.filter(status='pending').update(status='failed', updated_at=now)
+
+
+def reconcile_pending(methods=('mpesa', 'stripe'), grace=timedelta(minutes=10),
+                      timeout=timedelta(hours=24), batch_size=200, concurrency=8, rate=20):
+    """Run one reconciliation pass and return its metrics."""
+    started = time.monotonic()
+    older_than = timezone.now() - grace
+    expires_before = timezone.now() - timeout
+    limiter = RateLimiter(rate)
+    metrics = {'checked': 0, 'completed': 0, 'failed': 0, 'unresolved': 0, 'errors': 0, 'expired': 0}
+
+    def check(checker, donation_id, reference):
+        limiter.wait()
+        try:
+            return donation_id, checker(reference)
+        except Exception:
+            logger.warning("Status query failed for donation %s", donation_id, exc_info=True)
+            return donation_id, 'error'
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='reconcile') as pool:
+        for method in methods:
+            try:
+                checker = CHECKERS[method]()
+            except Exception:
+                logger.exception("Skipping %s reconciliation", method)
+                continue
+
+            for batch in pending_batches(method, older_than, batch_size):
+                results = list(pool.map(lambda row: check(checker, *row), batch))
+                completed_ids = [pk for pk, outcome in results if outcome == 'completed']
+                failed_ids = [pk for pk, outcome in results if outcome == 'failed']
+                completed, failed = apply_transitions(completed_ids, failed_ids)
+                # A still-unresolved answer on the final check means nothing was paid;
+                # rows whose query errored are left for the next run
+                unresolved_ids = [pk for pk, outcome in results if outcome is None]
+                if unresolved_ids:
+                    metrics['expired'] += expire_stale(
+                        stale_pending([method], expires_before).filter(id__in=unresolved_ids)
+                    )
+
+                metrics['checked'] += len(batch)
+                metrics['completed'] += completed
+                metrics['failed'] += failed
+                metrics['errors'] += sum(1 for _, outcome in results if outcome == 'error')
+                metrics['unresolved'] += sum(1 for _, outcome in results if outcome is None)
+                logger.info("Reconciled %s batch: %s", method, metrics)
+
+    # Donations that never got a provider reference have nothing to query
+    metrics['expired'] += expire_stale(
+        stale_pending(methods, expires_before).filter(
+            Q(payment_reference__isnull=True) | Q(payment_reference='')
+        )
+    )
+    metrics['duration_seconds'] = round(time.monotonic() - started, 2)
+    logger.info("Pending donation reconciliation finished: %s", metrics)
+    return metrics
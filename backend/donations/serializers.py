@@ -1,19 +1,37 @@
+from decimal import Decimal
 from rest_framework import serializers
-from .models import DonationCampaign, Donation, Volunteer, Partnership
+from news.models import Event
+from programs.models import Program
+from .models import DonationCampaign, Donation, DonorProfile, Volunteer, VolunteerTimeEntry, Partnership
 
 
 class DonationCampaignSerializer(serializers.ModelSerializer):
-    progress_percentage = serializers.ReadOnlyField()
-    remaining_amount = serializers.ReadOnlyField()
+    # Read from DonationCampaign.objects.with_progress() annotations
+    progress_percentage = serializers.ReadOnlyField(source='progress')
+    remaining_amount = serializers.ReadOnlyField(source='remaining')
     
     class Meta:
         model = DonationCampaign
         fields = [
-            'id', 'title', 'slug', 'description', 'goal_amount', 'raised_amount',
+            'id', 'title', 'slug', 'description', 'goal_amount', 'raised_amount', 'donor_count',
             'progress_percentage', 'remaining_amount', 'start_date', 'end_date',
             'image', 'campaign_type', 'is_featured', 'is_urgent'
         ]
 
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if instance.counter_shards:
+            # Add the shard totals that compaction has not folded into the row yet
+            amount, count = instance.pending_counter_totals()
+            if amount or count:
+                raised = instance.raised_amount + amount
+                data['raised_amount'] = self.fields['raised_amount'].to_representation(raised)
+                data['donor_count'] = instance.donor_count + count
+                if instance.goal_amount > 0:
+                    data['progress_percentage'] = min(100.0, float(raised * 100 / instance.goal_amount))
+                data['remaining_amount'] = max(Decimal('0'), instance.goal_amount - raised)
+        return data
+
 
 class DonationSerializer(serializers.ModelSerializer):
     class Meta:
@@ -74,6 +92,23 @@ class DonationSerializer(serializers.ModelSerializer):
         return data
 
 
+class DonorProfileSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = DonorProfile
+        fields = [
+            'email', 'donor_name', 'total_donated', 'donations_count',
+            'first_donation_at', 'last_donation_at', 'campaign_breakdown'
+        ]
+
+
+class DonationHistorySerializer(serializers.Serializer):
+    """Serializes the lean values() rows of the donor history listing"""
+    created_at = serializers.DateTimeField()
+    amount = serializers.DecimalField(max_digits=10, decimal_places=2)
+    currency = serializers.CharField()
+    status = serializers.CharField()
+
+
 class VolunteerSerializer(serializers.ModelSerializer):
     class Meta:
         model = Volunteer
@@ -83,6 +118,52 @@ class VolunteerSerializer(serializers.ModelSerializer):
         ]
 
 
+class VolunteerHoursSerializer(serializers.Serializer):
+    volunteer = serializers.IntegerField()
+    hours = serializers.DecimalField(max_digits=5, decimal_places=2, min_value=Decimal('0.25'), max_value=24)
+    notes = serializers.CharField(max_length=200, required=False, allow_blank=True)
+
+
+class VolunteerTimeEntryBulkSerializer(serializers.Serializer):
+    """A coordinator's attendance sheet for one session of an event or program"""
+    event = serializers.SlugRelatedField(slug_field='slug', queryset=Event.objects.all(), required=False)
+    program = serializers.SlugRelatedField(slug_field='slug', queryset=Program.objects.all(), required=False)
+    date = serializers.DateField()
+    county = serializers.CharField(max_length=100, required=False, allow_blank=True)
+    entries = VolunteerHoursSerializer(many=True, allow_empty=False, max_length=1000)
+
+    def validate(self, data):
+        if bool(data.get('event')) == bool(data.get('program')):
+            raise serializers.ValidationError("Provide either an event or a program.")
+
+        volunteer_ids = [entry['volunteer'] for entry in data['entries']]
+        if len(set(volunteer_ids)) != len(volunteer_ids):
+            raise serializers.ValidationError({'entries': "Each volunteer may appear only once per session."})
+
+        # One query for the whole sheet rather than one per row
+        known = set(Volunteer.objects.filter(pk__in=volunteer_ids).values_list('pk', flat=True))
+        unknown = sorted(set(volunteer_ids) - known)
+        if unknown:
+            raise serializers.ValidationError({'entries': f"Unknown volunteers: {unknown}"})
+        return data
+
+    def create(self, validated_data):
+        recorded_by = validated_data.get('recorded_by')
+        return VolunteerTimeEntry.record([
+            VolunteerTimeEntry(
+                volunteer_id=entry['volunteer'],
+                event=validated_data.get('event'),
+                program=validated_data.get('program'),
+                date=validated_data['date'],
+                hours=entry['hours'],
+                county=VolunteerTimeEntry.normalize_county(validated_data.get('county')),
+                notes=entry.get('notes') or None,
+                recorded_by=recorded_by,
+            )
+            for entry in validated_data['entries']
+        ])
+
+
 class PartnershipSerializer(serializers.ModelSerializer):
     class Meta:
         model = Partnership
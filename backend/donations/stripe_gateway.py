@@ -0,0 +1,59 @@
+import requests
+import stripe
+from django.conf import settings
+
+
+# ----- SDK configuration (runs once per process) -----
+
+def build_http_client():
+    """Stripe HTTP client sharing one pooled keep-alive session across threads."""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=settings.STRIPE_POOL_SIZE,
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return stripe.http_client.RequestsClient(timeout=settings.STRIPE_TIMEOUT, session=session)
+
+
+stripe.api_key = settings.STRIPE_SECRET_KEY
+stripe.api_base = settings.STRIPE_API_BASE
+stripe.max_network_retries = settings.STRIPE_MAX_NETWORK_RETRIES
+stripe.default_http_client = build_http_client()
+
+
+# ----- Payment Intents -----
+
+def idempotency_key(donation):
+    """Deterministic key so retries of the same donation reuse one intent."""
+    return f"donation-{donation.transaction_id}-payment-intent"
+
+
+def request_payment_intent(donation):
+    """Call Stripe for the donation's PaymentIntent; replays return the original intent."""
+    return stripe.PaymentIntent.create(
+        amount=int(donation.amount * 100),  # cents
+        currency=donation.currency.lower(),
+        metadata={
+            'donation_id': donation.id,
+            'transaction_id': donation.transaction_id,
+            'donor_name': donation.donor_name,
+            'donor_email': donation.donor_email,
+        },
+        idempotency_key=idempotency_key(donation),
+    )
+
+
+def create_payment_intent(donation):
+    """Create (or fetch the existing) PaymentIntent for the donation and store its id."""
+    intent = request_payment_intent(donation)
+    if donation.payment_reference != intent.id:
+        donation.payment_reference = intent.id
+        donation.save(update_fields=['payment_reference', 'updated_at'])
+
+    return intent
+
+
+def retrieve_payment_intent(payment_intent_id):
+    return stripe.PaymentIntent.retrieve(payment_intent_id)
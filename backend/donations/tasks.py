@@ -0,0 +1,38 @@
+import logging
+
+import stripe
+from celery import shared_task
+
+from . import stripe_gateway
+from .models import Donation
+
+logger = logging.getLogger(__name__)
+
+# Failures worth another attempt; anything else (card or request errors) fails the donation
+RETRYABLE_STRIPE_ERRORS = (
+    stripe.error.APIConnectionError,
+    stripe.error.RateLimitError,
+    stripe.error.APIError,
+)
+
+
+@shared_task(bind=True, acks_late=True, max_retries=5)
+def create_payment_intent(self, donation_id):
+    """Create the PaymentIntent for a donation queued by create_donation in background mode."""
+    donation = Donation.objects.filter(pk=donation_id, status='pending').first()
+    if donation is None or donation.payment_reference:
+        # Already handled by an earlier delivery of this task, or no longer payable
+        return
+
+    try:
+        stripe_gateway.create_payment_intent(donation)
+    except RETRYABLE_STRIPE_ERRORS as exc:
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=exc, countdown=2 ** self.request.retries)
+        logger.exception("PaymentIntent creation gave up for donation %s", donation.id)
+        donation.status = 'failed'
+        donation.save(update_fields=['status', 'updated_at'])
+    except Exception:
+        logger.exception("PaymentIntent creation failed for donation %s", donation.id)
+        donation.status = 'failed'
+        donation.save(update_fields=['status', 'updated_at'])
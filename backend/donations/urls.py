@@ -1,18 +1,30 @@
 from django.urls import path
 from .views import (
-    DonationCampaignsListView, FeaturedCampaignsListView, DonationCampaignDetailView,
-    create_donation, stripe_webhook, mpesa_stk, VolunteerCreateView, PartnershipCreateView,
-    donation_stats
+    DonationCampaignsListView, FeaturedCampaignsListView, DonationCampaignDetailView, campaign_progress_series,
+    create_donation, stripe_webhook, stripe_payment_intent, mpesa_stk,
+    mpesa_c2b_validation, mpesa_c2b_confirmation, VolunteerCreateView, PartnershipCreateView,
+    donation_stats, DonorHistoryListView, event_volunteer_matches, program_volunteer_matches,
+    upcoming_volunteer_matches, volunteer_time_entries_bulk, volunteer_hours_report
 )
 
 urlpatterns = [
     path('campaigns/', DonationCampaignsListView.as_view(), name='donation-campaigns'),
     path('campaigns/featured/', FeaturedCampaignsListView.as_view(), name='featured-campaigns'),
     path('campaigns/<slug:slug>/', DonationCampaignDetailView.as_view(), name='campaign-detail'),
+    path('campaigns/<slug:slug>/series/', campaign_progress_series, name='campaign-progress-series'),
     path('create/', create_donation, name='create-donation'),
     path('stripe-webhook/', stripe_webhook, name='stripe-webhook'),
+    path('stripe-intents/<str:poll_token>/', stripe_payment_intent, name='stripe-payment-intent'),
     path('mpesa-callback/', mpesa_stk, name='mpesa_stk'),
+    path('mpesa-c2b/<str:token>/validation/', mpesa_c2b_validation, name='mpesa-c2b-validation'),
+    path('mpesa-c2b/<str:token>/confirmation/', mpesa_c2b_confirmation, name='mpesa-c2b-confirmation'),
     path('volunteers/', VolunteerCreateView.as_view(), name='volunteer-create'),
+    path('volunteers/matches/upcoming/', upcoming_volunteer_matches, name='volunteer-matches-upcoming'),
+    path('volunteers/matches/events/<slug:slug>/', event_volunteer_matches, name='volunteer-matches-event'),
+    path('volunteers/matches/programs/<slug:slug>/', program_volunteer_matches, name='volunteer-matches-program'),
+    path('volunteers/time-entries/bulk/', volunteer_time_entries_bulk, name='volunteer-time-entries-bulk'),
+    path('volunteers/hours/', volunteer_hours_report, name='volunteer-hours-report'),
     path('partnerships/', PartnershipCreateView.as_view(), name='partnership-create'),
     path('stats/', donation_stats, name='donation-stats'),
+    path('history/', DonorHistoryListView.as_view(), name='donor-history'),
 ]
\ No newline at end of file
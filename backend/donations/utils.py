@@ -1,32 +1,62 @@
+import base64
+import hmac
 import requests
 from django.conf import settings
+from django.utils import timezone
 
 # ----- Helper Functions -----
 
+def normalize_account_reference(account_reference):
+    """Canonical paybill account reference: the part after '#', alphanumerics only, uppercased.
+
+    Donors type ``299239#John Doe``, ``#johndoe`` or just ``John Doe``; all map to ``JOHNDOE``.
+    """
+    name = (account_reference or '').rsplit('#', 1)[-1]
+    return ''.join(ch for ch in name if ch.isalnum()).upper()
+
+def c2b_caller_allowed(request, token):
+    """Whether a C2B callback carries our URL token and, when an allow-list is set, comes from Safaricom.
+
+    The token is part of the URLs registered with Daraja (``mpesa-c2b/<token>/...``), so an
+    unconfigured token rejects every call rather than leaving the endpoints open.
+    """
+    expected = settings.MPESA_C2B_TOKEN
+    if not expected or not hmac.compare_digest(str(token), expected):
+        return False
+    if settings.MPESA_C2B_ALLOWED_IPS:
+        # The proxy in front of gunicorn appends the peer it saw; earlier entries are caller-supplied
+        forwarded = request.META.get('HTTP_X_FORWARDED_FOR', '')
+        address = forwarded.split(',')[-1].strip() if forwarded else request.META.get('REMOTE_ADDR', '')
+        if address not in settings.MPESA_C2B_ALLOWED_IPS:
+            return False
+    return True
+
 def get_mpesa_access_token():
     """Get OAuth access token from Safaricom Daraja API."""
     consumer_key = settings.MPESA_CONSUMER_KEY
     consumer_secret = settings.MPESA_CONSUMER_SECRET
-    auth_url = 'https://sandbox.safaricom.co.ke/oauth/v1/generate?grant_type=client_credentials'
+    auth_url = f'{settings.MPESA_BASE_URL}/oauth/v1/generate?grant_type=client_credentials'
     
-    response = requests.get(auth_url, auth=(consumer_key, consumer_secret))
+    response = requests.get(auth_url, auth=(consumer_key, consumer_secret), timeout=settings.MPESA_TIMEOUT)
     if response.status_code == 200:
         return response.json().get('access_token')
     return None
 
+def get_stk_password(timestamp):
+    """Daraja password: base64(shortcode + passkey + timestamp)."""
+    password_str = settings.MPESA_SHORTCODE + settings.MPESA_PASSKEY + timestamp
+    return base64.b64encode(password_str.encode()).decode()
+
 def initiate_mpesa_stk_push(donation):
     """Initiate M-Pesa STK push transaction for the given donation."""
     access_token = get_mpesa_access_token()
     if not access_token:
         raise Exception("Failed to get M-Pesa access token")
 
-    stk_push_url = 'https://sandbox.safaricom.co.ke/mpesa/stkpush/v1/processrequest'
+    stk_push_url = f'{settings.MPESA_BASE_URL}/mpesa/stkpush/v1/processrequest'
     timestamp = donation.created.strftime('%Y%m%d%H%M%S')
     shortcode = settings.MPESA_SHORTCODE
-    passkey = settings.MPESA_PASSKEY
-    import base64
-    password_str = shortcode + passkey + timestamp
-    password = base64.b64encode(password_str.encode()).decode()
+    password = get_stk_password(timestamp)
 
     payload = {
         "BusinessShortCode": shortcode,
@@ -50,4 +80,26 @@ def initiate_mpesa_stk_push(donation):
     if response.status_code == 200:
         return response.json()
     else:
-        raise Exception(f"M-Pesa STK Push failed: {response.text}")
\ No newline at end of file
+        raise Exception(f"M-Pesa STK Push failed: {response.text}")
+
+def query_mpesa_stk_status(checkout_request_id, access_token, session=None):
+    """Query the Daraja STK push status for a CheckoutRequestID.
+
+    Returns the response JSON; a ``ResultCode`` is only present once the
+    transaction has finished (``"0"`` means paid).
+    """
+    query_url = f'{settings.MPESA_BASE_URL}/mpesa/stkpushquery/v1/query'
+    timestamp = timezone.localtime().strftime('%Y%m%d%H%M%S')
+    payload = {
+        "BusinessShortCode": settings.MPESA_SHORTCODE,
+        "Password": get_stk_password(timestamp),
+        "Timestamp": timestamp,
+        "CheckoutRequestID": checkout_request_id,
+    }
+    headers = {
+        "Authorization": f"Bearer {access_token}",
+        "Content-Type": "application/json"
+    }
+
+    response = (session or requests).post(query_url, json=payload, headers=headers, timeout=settings.MPESA_TIMEOUT)
+    return response.json()
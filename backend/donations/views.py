@@ -1,24 +1,39 @@
 from rest_framework import generics, status
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from django.views.decorators.csrf import csrf_exempt
 from django.conf import settings
+from django.core import signing
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Max, Q, Sum
+from django.db.models.functions import TruncDay, TruncHour, TruncMonth, TruncWeek, TruncYear
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from datetime import datetime, time
+import hashlib
+import json
 import stripe
 import uuid
-from .utils import initiate_mpesa_stk_push
+from core.timewindows import WINDOWS
+from core.views import VisitorSketchMixin
+from news.models import Event
+from programs.models import Program
+from .utils import c2b_caller_allowed, initiate_mpesa_stk_push
+from . import matching, stripe_gateway, tasks
 
  
 
-from .models import DonationCampaign, Donation, Volunteer, Partnership
+from .models import (
+    DonationCampaign, Donation, DonorProfile, CampaignProgressPoint, MpesaC2BConfirmation,
+    Volunteer, VolunteerTimeEntry, Partnership
+)
 from .serializers import (
-    DonationCampaignSerializer, DonationSerializer,
-    VolunteerSerializer, PartnershipSerializer
+    DonationCampaignSerializer, DonationSerializer, DonationHistorySerializer,
+    VolunteerSerializer, VolunteerTimeEntryBulkSerializer, PartnershipSerializer
 )
 
-# Set Stripe API key
-stripe.api_key = settings.STRIPE_SECRET_KEY
-
 
 # 🔐 Public API View Mixin
 class PublicAPIView:
@@ -27,90 +42,301 @@ class PublicAPIView:
 
 # 📢 Donation Campaign Views
 
-class DonationCampaignsListView(PublicAPIView, generics.ListAPIView):
+class CampaignFilterMixin:
+    """Filtering and ordering on the SQL-annotated campaign progress"""
+    ORDERING_FIELDS = {
+        'progress': 'progress',
+        'remaining': 'remaining',
+        'end_date': 'end_date',
+        'start_date': 'start_date',
+        'raised': 'raised_amount',
+        'created': 'created_at',
+    }
+
+    def get_queryset(self):
+        queryset = super().get_queryset().with_progress()
+        params = self.request.query_params
+
+        campaign_type = params.get('campaign_type', None)
+        if campaign_type:
+            queryset = queryset.filter(campaign_type=campaign_type)
+
+        is_urgent = params.get('is_urgent', None)
+        if is_urgent is not None:
+            queryset = queryset.filter(is_urgent=is_urgent.lower() in ('1', 'true', 'yes'))
+
+        ending_before = parse_date(params.get('ending_before', '') or '')
+        if ending_before:
+            queryset = queryset.filter(end_date__lte=ending_before)
+
+        window = params.get('window', None)
+        if window in WINDOWS:
+            queryset = DonationCampaign.TIME_WINDOWS.filter(queryset, window)
+
+        try:
+            min_progress = float(params['min_progress'])
+        except (KeyError, ValueError):
+            min_progress = None
+        if min_progress is not None:
+            queryset = queryset.filter(progress__gte=min_progress)
+
+        ordering = params.get('ordering', None)
+        if ordering and ordering.lstrip('-') in self.ORDERING_FIELDS:
+            prefix = '-' if ordering.startswith('-') else ''
+            queryset = queryset.order_by(f"{prefix}{self.ORDERING_FIELDS[ordering.lstrip('-')]}", 'id')
+
+        return queryset
+
+
+class DonationCampaignsListView(PublicAPIView, CampaignFilterMixin, generics.ListAPIView):
     """List all active donation campaigns"""
     serializer_class = DonationCampaignSerializer
     queryset = DonationCampaign.objects.filter(is_active=True)
 
 
-class FeaturedCampaignsListView(PublicAPIView, generics.ListAPIView):
+class FeaturedCampaignsListView(PublicAPIView, CampaignFilterMixin, generics.ListAPIView):
     """List featured donation campaigns"""
     serializer_class = DonationCampaignSerializer
     queryset = DonationCampaign.objects.filter(is_active=True, is_featured=True)
 
 
-class DonationCampaignDetailView(PublicAPIView, generics.RetrieveAPIView):
+class DonationCampaignDetailView(VisitorSketchMixin, PublicAPIView, generics.RetrieveAPIView):
     """Get campaign details by slug"""
+    visitor_source = 'campaigns'
     serializer_class = DonationCampaignSerializer
     lookup_field = 'slug'
-    queryset = DonationCampaign.objects.filter(is_active=True)
+    queryset = DonationCampaign.objects.filter(is_active=True).with_progress()
 
 
-# 💰 Donation Handling
+SERIES_INTERVALS = {
+    'hour': TruncHour,
+    'day': TruncDay,
+    'week': TruncWeek,
+}
 
-@api_view(['POST'])
-@permission_classes([AllowAny])
-def create_donation(request):
-    """Create a new donation, defaults to M-Pesa payment."""
-    serializer = DonationSerializer(data=request.data)
-    if not serializer.is_valid():
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-    payment_method = request.data.get('payment_method', 'mpesa').lower()
-    transaction_id = str(uuid.uuid4())
+def parse_series_bound(value):
+    """Accept either a date or a datetime for the series range"""
+    if not value:
+        return None
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(value)
+        moment = datetime.combine(day, time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
 
-    donation = serializer.save(transaction_id=transaction_id, status='pending')
 
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def campaign_progress_series(request, slug):
+    """Raised-amount time series for a campaign's progress chart, downsampled to ?interval="""
+    campaign = get_object_or_404(DonationCampaign.objects.only('id'), slug=slug, is_active=True)
+
+    interval = request.query_params.get('interval', 'day')
+    if interval not in SERIES_INTERVALS:
+        return Response(
+            {'error': f"interval must be one of: {', '.join(SERIES_INTERVALS)}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
     try:
-        if payment_method == 'mpesa':
-            # Expect phone number in donation.phone_number (make sure your serializer/model supports this)
+        start = parse_series_bound(request.query_params.get('start'))
+        end = parse_series_bound(request.query_params.get('end'))
+    except ValueError:
+        return Response({'error': 'start and end must be ISO dates or datetimes'},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    # One range scan over campaign_progress_bucket_unique, grouped into the requested interval
+    points = CampaignProgressPoint.objects.filter(campaign_id=campaign.id)
+    if start:
+        points = points.filter(bucket__gte=start)
+    if end:
+        points = points.filter(bucket__lt=end)
+    series = points.annotate(period=SERIES_INTERVALS[interval]('bucket')).values('period').annotate(
+        amount=Sum('amount'),
+        donor_count=Sum('donor_count'),
+        cumulative_amount=Max('cumulative_amount'),
+        cumulative_donor_count=Max('cumulative_donor_count'),
+    ).order_by('period')
+
+    return Response({
+        'campaign': slug,
+        'interval': interval,
+        'points': list(series),
+    })
+
+
+# 💰 Donation Handling
+
+# Signs the token clients poll with for a background PaymentIntent's client secret
+INTENT_POLL_SALT = 'donations.stripe-intent'
+INTENT_POLL_MAX_AGE = 60 * 60  # seconds
+
+
+def start_payment(donation):
+    """Start (or resume) payment for a pending donation and build the create response.
+
+    Safe to repeat for the same donation: the STK push is only sent while no
+    CheckoutRequestID is stored, and PaymentIntents are created with an
+    idempotency key, so a replay returns the original intent's client secret.
+    """
+    if donation.payment_method == 'mpesa':
+        if not donation.payment_reference:
             response = initiate_mpesa_stk_push(donation)
             donation.payment_reference = response.get('CheckoutRequestID', '')
             donation.save()
 
+        return Response({
+            'message': 'M-Pesa payment initiated. Please complete payment on your phone.',
+            'donation_id': donation.id,
+            'checkout_request_id': donation.payment_reference,
+        }, status=status.HTTP_201_CREATED)
+
+    elif donation.payment_method == 'stripe':
+        if settings.STRIPE_BACKGROUND_INTENTS:
+            if not donation.payment_reference:
+                tasks.create_payment_intent.delay(donation.id)
             return Response({
-                'message': 'M-Pesa payment initiated. Please complete payment on your phone.',
+                'message': 'Stripe payment is being prepared.',
                 'donation_id': donation.id,
-                'checkout_request_id': donation.payment_reference,
-            }, status=status.HTTP_201_CREATED)
-
-        elif payment_method == 'stripe':
-            import stripe
-            stripe.api_key = settings.STRIPE_SECRET_KEY
-
-            intent = stripe.PaymentIntent.create(
-                amount=int(donation.amount * 100),  # cents
-                currency=donation.currency.lower(),
-                metadata={
-                    'donation_id': donation.id,
-                    'donor_name': donation.donor_name,
-                    'donor_email': donation.donor_email,
-                }
-            )
+                'transaction_id': donation.transaction_id,
+                'poll_token': signing.dumps(donation.transaction_id, salt=INTENT_POLL_SALT),
+            }, status=status.HTTP_202_ACCEPTED)
+
+        intent = stripe_gateway.create_payment_intent(donation)
+
+        return Response({
+            'message': 'Stripe payment initiated.',
+            'donation_id': donation.id,
+            'transaction_id': donation.transaction_id,
+            'client_secret': intent.client_secret,
+            'payment_intent_id': intent.id,
+        }, status=status.HTTP_201_CREATED)
+
+    else:
+        # Other payment methods can be handled here
+        return Response({
+            'message': 'Donation created successfully.',
+            'donation_id': donation.id,
+            'payment_instructions': f'Please complete payment via {donation.payment_method}.'
+        }, status=status.HTTP_201_CREATED)
+
+
+def idempotency_scope(request):
+    """Who an Idempotency-Key belongs to: the signed-in user, else the client's nonce."""
+    if request.user.is_authenticated:
+        return f"user:{request.user.pk}"
+    return f"client:{request.headers.get('Idempotency-Client', '')}"
+
+
+def request_hash(validated_data):
+    """Fingerprint of a create request, so a replay can be checked against the original."""
+    body = json.dumps(validated_data, sort_keys=True, default=lambda value: getattr(value, 'pk', str(value)))
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+def replay_donation(transaction_id, body_hash):
+    """Answer a create_donation retry for an Idempotency-Key that already has a donation."""
+    if not Donation.objects.filter(transaction_id=transaction_id, request_hash=body_hash).exists():
+        return None, Response(
+            {'error': 'Idempotency-Key was already used with a different request.'},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
 
-            donation.payment_reference = intent.id
-            donation.save()
+    # A retry after a failed initiation tries again; the conditional update lets one retry win
+    Donation.objects.filter(
+        Q(payment_reference='') | Q(payment_reference__isnull=True),
+        transaction_id=transaction_id, status='failed',
+    ).update(status='pending', updated_at=timezone.now())
+    donation = Donation.objects.get(transaction_id=transaction_id)
+
+    if donation.status != 'pending':
+        return None, Response({
+            'message': 'Donation already processed.',
+            'donation_id': donation.id,
+            'transaction_id': donation.transaction_id,
+            'status': donation.status,
+        }, status=status.HTTP_200_OK)
+
+    if donation.payment_method == 'mpesa' and not donation.payment_reference:
+        # The original request is still sending the STK push; pushing again would double-charge
+        return None, Response(
+            {'error': 'Donation is still being initiated. Retry shortly.'},
+            status=status.HTTP_409_CONFLICT,
+        )
 
-            return Response({
-                'message': 'Stripe payment initiated.',
-                'donation_id': donation.id,
-                'client_secret': intent.client_secret,
-                'payment_intent_id': intent.id,
-            }, status=status.HTTP_201_CREATED)
+    return donation, None
 
-        else:
-            # Other payment methods can be handled here
-            return Response({
-                'message': 'Donation created successfully.',
-                'donation_id': donation.id,
-                'payment_instructions': f'Please complete payment via {payment_method}.'
-            }, status=status.HTTP_201_CREATED)
 
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def create_donation(request):
+    """Create a new donation, defaults to M-Pesa payment."""
+    serializer = DonationSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    # A client retry carrying the same Idempotency-Key maps onto the same donation; keys
+    # are scoped to the caller and only replay for an identical request body
+    client_key = request.headers.get('Idempotency-Key')
+    if client_key:
+        scope = idempotency_scope(request)
+        transaction_id = str(uuid.uuid5(uuid.NAMESPACE_URL, f"keefa-donation:{scope}:{client_key}"))
+        body_hash = request_hash(serializer.validated_data)
+        try:
+            with transaction.atomic():
+                donation = serializer.save(transaction_id=transaction_id, request_hash=body_hash, status='pending')
+        except IntegrityError:
+            donation, response = replay_donation(transaction_id, body_hash)
+            if response is not None:
+                return response
+    else:
+        donation = serializer.save(transaction_id=str(uuid.uuid4()), status='pending')
+
+    try:
+        return start_payment(donation)
     except Exception as e:
         donation.status = 'failed'
         donation.save()
         return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def stripe_payment_intent(request, poll_token):
+    """Return the client secret once a background PaymentIntent is ready.
+
+    Only the signed poll_token handed out by create_donation unlocks the secret.
+    """
+    try:
+        transaction_id = signing.loads(poll_token, salt=INTENT_POLL_SALT, max_age=INTENT_POLL_MAX_AGE)
+    except signing.BadSignature:
+        return Response({'error': 'Donation not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    donation = Donation.objects.filter(transaction_id=transaction_id, payment_method='stripe').first()
+    if not donation:
+        return Response({'error': 'Donation not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    if donation.status == 'failed':
+        return Response({'error': 'Stripe payment could not be initiated.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    if not donation.payment_reference:
+        return Response({'status': 'processing'}, status=status.HTTP_202_ACCEPTED)
+
+    try:
+        intent = stripe_gateway.retrieve_payment_intent(donation.payment_reference)
+    except stripe.error.StripeError as e:
+        return Response({'error': str(e)}, status=status.HTTP_502_BAD_GATEWAY)
+
+    return Response({
+        'donation_id': donation.id,
+        'client_secret': intent.client_secret,
+        'payment_intent_id': intent.id,
+    }, status=status.HTTP_200_OK)
+
+
 @csrf_exempt
 @api_view(['POST'])
 @permission_classes([AllowAny])
@@ -140,6 +366,43 @@ def mpesa_stk(request):
         return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
 
+@csrf_exempt
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def mpesa_c2b_validation(request, token):
+    """Accept C2B paybill payments; donor matching happens after confirmation."""
+    if not c2b_caller_allowed(request, token):
+        return Response({'ResultCode': 1, 'ResultDesc': 'Forbidden'}, status=status.HTTP_403_FORBIDDEN)
+    if str(request.data.get('BusinessShortCode', '')) != settings.MPESA_SHORTCODE:
+        return Response({'ResultCode': 'C2B00015', 'ResultDesc': 'Rejected'})
+    try:
+        amount = float(request.data.get('TransAmount') or 0)
+    except (TypeError, ValueError):
+        amount = 0
+    if amount <= 0:
+        return Response({'ResultCode': 'C2B00013', 'ResultDesc': 'Rejected'})
+    return Response({'ResultCode': 0, 'ResultDesc': 'Accepted'})
+
+
+@csrf_exempt
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def mpesa_c2b_confirmation(request, token):
+    """Record a C2B paybill confirmation with a single insert; match_mpesa_c2b resolves it later."""
+    if not c2b_caller_allowed(request, token):
+        return Response({'ResultCode': 1, 'ResultDesc': 'Forbidden'}, status=status.HTTP_403_FORBIDDEN)
+    if str(request.data.get('BusinessShortCode', '')) != settings.MPESA_SHORTCODE:
+        return Response({'ResultCode': 1, 'ResultDesc': 'Unknown BusinessShortCode'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        confirmation = MpesaC2BConfirmation.from_payload(request.data)
+    except (KeyError, TypeError, ValueError, ArithmeticError) as e:
+        return Response({'ResultCode': 1, 'ResultDesc': f'Invalid payload: {e}'}, status=status.HTTP_400_BAD_REQUEST)
+
+    # Safaricom re-sends confirmations it thinks were lost; the unique TransID absorbs them
+    MpesaC2BConfirmation.objects.bulk_create([confirmation], ignore_conflicts=True)
+    return Response({'ResultCode': 0, 'ResultDesc': 'Accepted'})
+
+
 def stripe_webhook(request):
     """Handle Stripe webhook events"""
     payload = request.body
@@ -179,6 +442,21 @@ def stripe_webhook(request):
     return Response({'status': 'success'})
 
 
+# 🧾 Donor History
+
+class DonorHistoryListView(generics.ListAPIView):
+    """List the authenticated donor's donations, newest first"""
+    serializer_class = DonationHistorySerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        # Only columns held in donation_donor_history_idx are read
+        email = DonorProfile.normalize_email(self.request.user.email)
+        return Donation.objects.filter(donor_email=email).order_by('-created_at').values(
+            'created_at', 'amount', 'currency', 'status'
+        )
+
+
 # 👥 Public Submission Forms
 
 class VolunteerCreateView(PublicAPIView, generics.CreateAPIView):
@@ -219,6 +497,126 @@ class PartnershipCreateView(PublicAPIView, generics.CreateAPIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+# 🤝 Volunteer Matching
+
+def match_limit(request):
+    try:
+        return max(1, min(int(request.query_params.get('limit', 20)), 100))
+    except ValueError:
+        return 20
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def event_volunteer_matches(request, slug):
+    """Ranked volunteer candidates for an event"""
+    event = get_object_or_404(Event.objects.only('id', 'event_type', 'start_date'), slug=slug)
+    return Response({'event': slug, 'candidates': matching.match_event(event, match_limit(request))})
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def program_volunteer_matches(request, slug):
+    """Ranked volunteer candidates for a program"""
+    program = get_object_or_404(Program.objects.only('id', 'program_type'), slug=slug)
+    return Response({'program': slug, 'candidates': matching.match_program(program, match_limit(request))})
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def upcoming_volunteer_matches(request):
+    """Ranked volunteer candidates for every upcoming event"""
+    return Response({'events': matching.match_upcoming_events(match_limit(request))})
+
+
+# ⏱️ Volunteer Hours
+
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def volunteer_time_entries_bulk(request):
+    """Record a whole session's volunteer attendance at once"""
+    serializer = VolunteerTimeEntryBulkSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    created, updated = serializer.save(recorded_by=request.user.get_username())
+    return Response(
+        {
+            'message': f"Recorded {len(created)} time entries, corrected {len(updated)}",
+            'created': len(created),
+            'updated': len(updated),
+            'hours': sum(entry.hours for entry in created + updated),
+        },
+        status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
+    )
+
+
+HOURS_PERIODS = {
+    'day': TruncDay,
+    'week': TruncWeek,
+    'month': TruncMonth,
+    'year': TruncYear,
+}
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def volunteer_hours_report(request):
+    """Volunteer hours grouped by ?period= and optionally by ?activity=event|program and ?by=county"""
+    params = request.query_params
+    period = params.get('period', 'month')
+    activity = params.get('activity', None)
+    by = params.get('by', None)
+    if period not in HOURS_PERIODS or activity not in (None, 'event', 'program') or by not in (None, 'county'):
+        return Response(
+            {'error': f"period must be one of: {', '.join(HOURS_PERIODS)}; activity must be event or program; "
+                      "by must be county"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    # Every filter and grouping column sits in one of the time_entry_*_idx indexes with hours
+    entries = VolunteerTimeEntry.objects.all()
+    start = parse_date(params.get('start', '') or '')
+    end = parse_date(params.get('end', '') or '')
+    if start:
+        entries = entries.filter(date__gte=start)
+    if end:
+        entries = entries.filter(date__lte=end)
+    if params.get('event'):
+        entries = entries.filter(event__slug=params['event'])
+    if params.get('program'):
+        entries = entries.filter(program__slug=params['program'])
+    if params.get('county'):
+        entries = entries.filter(county=VolunteerTimeEntry.normalize_county(params['county']))
+
+    group_by = ['period']
+    if by:
+        group_by.append(by)
+    if activity:
+        entries = entries.filter(**{f"{activity}__isnull": False})
+        group_by.append(f"{activity}_id")
+    rows = list(
+        entries.annotate(period=HOURS_PERIODS[period]('date')).values(*group_by)
+        .annotate(hours=Sum('hours'), entries=Count('id')).order_by(*group_by)
+    )
+
+    if activity:
+        model = Event if activity == 'event' else Program
+        names = dict(model.objects.filter(pk__in={row[f"{activity}_id"] for row in rows}).values_list(
+            'pk', 'title' if activity == 'event' else 'name'
+        ))
+        for row in rows:
+            row['activity'] = names.get(row[f"{activity}_id"])
+
+    return Response({
+        'period': period,
+        'activity': activity,
+        'by': by,
+        'total_hours': sum((row['hours'] for row in rows), 0),
+        'rows': rows,
+    })
+
+
 # 📊 Donation Statistics
 
 @api_view(['GET'])
@@ -1 +1,4 @@
-# KEEFA Django Backend
\ No newline at end of file
+# KEEFA Django Backend
+from .celery import app as celery_app
+
+__all__ = ('celery_app',)
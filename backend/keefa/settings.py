@@ -188,6 +188,11 @@ CKEDITOR_5_CONFIGS = {
 }
 
 
+# Public site, used for links in feeds and emails
+FRONTEND_URL = config('FRONTEND_URL', default='http://localhost:4321')
+# This API's own public address, for links that must reach the backend (e.g. unsubscribe)
+API_URL = config('API_URL', default='http://localhost:8000')
+
 # Email settings
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = config('EMAIL_HOST', default='smtp.gmail.com')
@@ -197,10 +202,56 @@ EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
 DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='noreply@cbongo.org')
 
+# Newsletter dispatch: SMTP connections, recipients per batch and the provider's messages/second cap
+NEWSLETTER_CONCURRENCY = config('NEWSLETTER_CONCURRENCY', default=4, cast=int)
+NEWSLETTER_BATCH_SIZE = config('NEWSLETTER_BATCH_SIZE', default=100, cast=int)
+NEWSLETTER_RATE = config('NEWSLETTER_RATE', default=10, cast=float)
+
 # Stripe settings
 STRIPE_PUBLISHABLE_KEY = config('STRIPE_PUBLISHABLE_KEY', default='')
 STRIPE_SECRET_KEY = config('STRIPE_SECRET_KEY', default='')
 STRIPE_WEBHOOK_SECRET = config('STRIPE_WEBHOOK_SECRET', default='')
+STRIPE_API_BASE = config('STRIPE_API_BASE', default='https://api.stripe.com')
+STRIPE_TIMEOUT = config('STRIPE_TIMEOUT', default=8, cast=int)  # seconds
+STRIPE_MAX_NETWORK_RETRIES = config('STRIPE_MAX_NETWORK_RETRIES', default=2, cast=int)
+STRIPE_POOL_SIZE = config('STRIPE_POOL_SIZE', default=10, cast=int)
+STRIPE_BACKGROUND_INTENTS = config('STRIPE_BACKGROUND_INTENTS', default=False, cast=bool)
+
+# M-Pesa (Daraja) settings
+MPESA_CONSUMER_KEY = config('MPESA_CONSUMER_KEY', default='')
+MPESA_CONSUMER_SECRET = config('MPESA_CONSUMER_SECRET', default='')
+MPESA_SHORTCODE = config('MPESA_SHORTCODE', default='')
+MPESA_PASSKEY = config('MPESA_PASSKEY', default='')
+MPESA_BASE_URL = config('MPESA_BASE_URL', default='https://sandbox.safaricom.co.ke')
+MPESA_CALLBACK_URL = config('MPESA_CALLBACK_URL', default='')
+MPESA_TIMEOUT = config('MPESA_TIMEOUT', default=10, cast=int)  # seconds
+# Secret path segment of the C2B URLs registered with Daraja; C2B callbacks are refused while unset
+MPESA_C2B_TOKEN = config('MPESA_C2B_TOKEN', default='')
+# Safaricom's published callback source addresses; empty skips the address check
+MPESA_C2B_ALLOWED_IPS = config('MPESA_C2B_ALLOWED_IPS', default='', cast=lambda v: [s.strip() for s in v.split(',') if s.strip()])
+
+# Cache: a shared Redis cache when CACHE_URL is set, per-process memory otherwise
+# (cache versions then fall back to core.CacheMarker rows so processes still agree)
+CACHE_URL = config('CACHE_URL', default='')
+if CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Sharded campaign counters: how long a summed read of the shards is reused
+CAMPAIGN_COUNTER_CACHE_SECONDS = config('CAMPAIGN_COUNTER_CACHE_SECONDS', default=5, cast=int)
+
+# Unique-visitor sketches: how often a worker merges its in-memory sketches into the database
+VISITOR_SKETCH_FLUSH_SECONDS = config('VISITOR_SKETCH_FLUSH_SECONDS', default=30, cast=int)
 
 # Celery settings
 CELERY_BROKER_URL = config('REDIS_URL', default='redis://localhost:6379/0')
@@ -231,6 +282,11 @@ LOGGING = {
             'level': 'INFO',
             'propagate': True,
         },
+        'donations': {
+            'handlers': ['file', 'console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
     },
 }
 
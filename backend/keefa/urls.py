@@ -3,6 +3,7 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from django.shortcuts import redirect # Added for the redirect
+from core.views import sitemap_index, sitemap_shard
 
 # Function to handle the root URL
 def root_redirect(request):
@@ -13,6 +14,10 @@ urlpatterns = [
     path('', root_redirect),
 
     path('admin/', admin.site.urls),
+
+    # Sitemaps for crawlers
+    path('sitemap.xml', sitemap_index, name='sitemap-index'),
+    path('sitemap-<slug:section>-<int:number>.xml', sitemap_shard, name='sitemap-shard'),
     
     # API Endpoints
     path('api/v1/', include('core.urls')),
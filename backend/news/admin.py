@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import NewsCategory, NewsArticle, Event, EventRegistration, Newsletter
+from core.admin import InterestSegmentFilter
+from .models import NewsCategory, NewsArticle, Event, EventRegistration, Newsletter, NewsletterEdition
 
 
 @admin.register(NewsCategory)
@@ -67,7 +68,7 @@ class EventAdmin(admin.ModelAdmin):
             'fields': ('contact_person', 'contact_email', 'contact_phone')
         }),
         ('Status', {
-            'fields': ('status', 'is_featured')
+            'fields': ('status', 'is_featured', 'publish_date')
         }),
         ('Media', {
             'fields': ('gallery_images',)
@@ -80,6 +81,7 @@ class EventRegistrationAdmin(admin.ModelAdmin):
     list_display = ['full_name', 'event', 'email', 'attendance_status', 'payment_status', 'registration_date']
     list_filter = ['attendance_status', 'payment_status', 'event', 'registration_date']
     search_fields = ['first_name', 'last_name', 'email', 'event__title']
+    readonly_fields = ['checked_in_at', 'checkin_device']
     
     fieldsets = (
         ('Participant Information', {
@@ -88,16 +90,23 @@ class EventRegistrationAdmin(admin.ModelAdmin):
         ('Registration Status', {
             'fields': ('attendance_status', 'payment_status')
         }),
+        ('Check-in', {
+            'fields': ('checked_in_at', 'checkin_device')
+        }),
         ('Additional Information', {
             'fields': ('dietary_requirements', 'special_needs', 'comments')
         }),
     )
 
 
+class NewsletterSegmentFilter(InterestSegmentFilter):
+    segment_source = 'newsletter'
+
+
 @admin.register(Newsletter)
 class NewsletterAdmin(admin.ModelAdmin):
     list_display = ['email', 'first_name', 'last_name', 'frequency', 'is_subscribed', 'created_at']
-    list_filter = ['frequency', 'is_subscribed', 'created_at']
+    list_filter = [NewsletterSegmentFilter, 'frequency', 'is_subscribed', 'created_at']
     search_fields = ['email', 'first_name', 'last_name']
     
     fieldsets = (
@@ -113,4 +122,12 @@ class NewsletterAdmin(admin.ModelAdmin):
         ('Tracking', {
             'fields': ('subscription_source',)
         }),
-    )
\ No newline at end of file
+    )
+
+
+@admin.register(NewsletterEdition)
+class NewsletterEditionAdmin(admin.ModelAdmin):
+    list_display = ['__str__', 'subject', 'status', 'sent_count', 'failed_count', 'started_at', 'finished_at']
+    list_filter = ['frequency', 'status']
+    readonly_fields = ['last_subscriber_id', 'sent_count', 'failed_count', 'started_at', 'finished_at']
+    exclude = ['content']
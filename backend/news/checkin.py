@@ -0,0 +1,120 @@
+"""Offline event check-in.
+
+Door staff download an event's roster once while they have a connection:
+one compact row per registration with a hash of the attendee's check-in
+code, so a device can match scanned codes without holding the codes
+themselves. Scans are queued on the device and synced in batches; each
+batch is applied with a single ``bulk_update``. When two devices disagree
+about a registration, the scan with the later ``scanned_at`` wins, whatever
+order the batches arrive in.
+"""
+import base64
+import hashlib
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.crypto import salted_hmac
+from django.utils.dateparse import parse_datetime
+
+from .models import EventRegistration
+
+CHECKIN_SALT = 'event-check-in'
+MAX_SYNC_BATCH = 1000
+# A scan may mark an attendee in, or undo a mistaken scan
+SCAN_STATUSES = ('attended', 'registered')
+ROSTER_FIELDS = ['id', 'first_name', 'last_name', 'code_hash', 'attendance_status', 'checked_in_at']
+
+
+def check_in_code(registration_id, event_id):
+    """The code printed on an attendee's ticket"""
+    digest = salted_hmac(CHECKIN_SALT, f"{event_id}:{registration_id}").digest()
+    return base64.b32encode(digest[:10]).decode()[:12]
+
+
+def code_hash(code):
+    return hashlib.sha256(code.strip().upper().encode()).hexdigest()[:16]
+
+
+def roster(event):
+    """Compact roster of an event's registrations: field names once, then one list per attendee"""
+    rows = EventRegistration.objects.filter(event=event).exclude(attendance_status='cancelled').order_by(
+        'last_name', 'first_name', 'id'
+    ).values_list('id', 'first_name', 'last_name', 'attendance_status', 'checked_in_at')
+    return {
+        'event': event.slug,
+        'generated_at': timezone.now(),
+        'fields': ROSTER_FIELDS,
+        'rows': [
+            [pk, first_name, last_name, code_hash(check_in_code(pk, event.pk)), attendance, checked_in_at]
+            for pk, first_name, last_name, attendance, checked_in_at in rows.iterator()
+        ],
+    }
+
+
+def parse_scans(scans):
+    """{registration id: (status, scanned_at)} keeping the latest scan of each; ValueError on bad input"""
+    if not isinstance(scans, list) or not scans:
+        raise ValueError("scans must be a non-empty list")
+    if len(scans) > MAX_SYNC_BATCH:
+        raise ValueError(f"At most {MAX_SYNC_BATCH} scans per request")
+    now = timezone.now()
+    latest = {}
+    for scan in scans:
+        try:
+            pk = int(scan['id'])
+            scan_status = scan.get('status', 'attended')
+            scanned_at = parse_datetime(str(scan['scanned_at']))
+        except (KeyError, TypeError, ValueError, AttributeError):
+            raise ValueError("Each scan needs an id and a scanned_at timestamp")
+        if scanned_at is None or scan_status not in SCAN_STATUSES:
+            raise ValueError(f"Invalid scan for registration {scan['id']}")
+        if timezone.is_naive(scanned_at):
+            scanned_at = timezone.make_aware(scanned_at)
+        # A device clock running fast must not win every later conflict
+        scanned_at = min(scanned_at, now)
+        if pk not in latest or scanned_at > latest[pk][1]:
+            latest[pk] = (scan_status, scanned_at)
+    return latest
+
+
+def sync(event, scans, device=''):
+    """Apply a batch of offline scans; returns the applied ids, stale scans with the current state, and unknown ids"""
+    latest = parse_scans(scans)
+    now = timezone.now()
+    applied, conflicts = [], []
+    with transaction.atomic():
+        registrations = EventRegistration.objects.select_for_update().filter(
+            event=event, id__in=latest
+        ).only('id', 'attendance_status', 'checked_in_at', 'checkin_scanned_at', 'checkin_device')
+        found = {registration.pk: registration for registration in registrations}
+        changed = []
+        for pk, (scan_status, scanned_at) in latest.items():
+            registration = found.get(pk)
+            if registration is None:
+                continue
+            if registration.attendance_status == 'cancelled' or (
+                registration.checkin_scanned_at and registration.checkin_scanned_at >= scanned_at
+            ):
+                conflicts.append({
+                    'id': pk,
+                    'attendance_status': registration.attendance_status,
+                    'checked_in_at': registration.checked_in_at,
+                })
+                continue
+            registration.attendance_status = scan_status
+            registration.checked_in_at = scanned_at if scan_status == 'attended' else None
+            registration.checkin_scanned_at = scanned_at
+            registration.checkin_device = device[:64]
+            registration.updated_at = now
+            changed.append(registration)
+            applied.append(pk)
+        EventRegistration.objects.bulk_update(
+            changed,
+            ['attendance_status', 'checked_in_at', 'checkin_scanned_at', 'checkin_device', 'updated_at'],
+            batch_size=MAX_SYNC_BATCH,
+        )
+    return {
+        'applied': applied,
+        'conflicts': conflicts,
+        'unknown': sorted(set(latest) - set(found)),
+    }
@@ -0,0 +1,184 @@
+"""RSS, Atom and JSON Feed syndication of published news articles.
+
+A feed is rendered once per content change: the cache key carries the feed's
+``Last-Modified`` (the newest ``updated_at``/``publish_date`` among its
+articles) and article count, so any edit, publication or removal selects a
+new key. The first request after a change streams the document while it is
+being written and stores the bytes; later requests are served from the cache
+or answered with 304 Not Modified. The cached bytes must not depend on the
+request, so every absolute URL in a feed is built from ``API_URL`` and
+``FRONTEND_URL`` rather than the request's host.
+"""
+import io
+import json
+import mimetypes
+from urllib.parse import urljoin
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.utils import timezone
+from django.utils.feedgenerator import Atom1Feed, Enclosure, Rss201rev2Feed
+from django.utils.xmlutils import SimplerXMLGenerator
+
+from .models import NewsArticle
+from .publishing import published_articles
+
+FEED_ITEM_LIMIT = 50
+FEED_CACHE_SECONDS = 60 * 60 * 24
+
+FEED_CONTENT_TYPES = {
+    'rss': 'application/rss+xml; charset=utf-8',
+    'atom': 'application/atom+xml; charset=utf-8',
+    'json': 'application/feed+json; charset=utf-8',
+}
+
+ARTICLE_FIELDS = (
+    'title', 'slug', 'excerpt', 'featured_image', 'author', 'tags',
+    'publish_date', 'updated_at', 'category__name',
+)
+
+
+def visible_articles(category=None):
+    articles = published_articles()
+    if category is not None:
+        articles = articles.filter(category=category)
+    return articles
+
+
+def feed_state(articles, category=None):
+    """(last_modified, article count) of a feed; one aggregate over the feed index"""
+    row = articles.aggregate(updated=Max('updated_at'), published=Max('publish_date'), count=Count('id'))
+    moments = [row['updated'], row['published'], category.updated_at if category else None]
+    return max((moment for moment in moments if moment), default=None), row['count']
+
+
+def cache_key(feed_format, scope, last_modified, count):
+    stamp = int(last_modified.timestamp()) if last_modified else 0
+    return f"news-feed:{scope}:{feed_format}:{stamp}:{count}"
+
+
+def news_page():
+    return f"{settings.FRONTEND_URL.rstrip('/')}/news"
+
+
+def article_link(slug):
+    return f"{news_page()}?article={slug}"
+
+
+def api_url(path):
+    return urljoin(f"{settings.API_URL.rstrip('/')}/", path)
+
+
+def feed_url(request):
+    """Canonical address of the requested feed, without the caller's host or query string"""
+    return api_url(request.path)
+
+
+def media_url(path):
+    return api_url(f"{settings.MEDIA_URL}{path}") if path else None
+
+
+def _drain(buffer):
+    chunk = buffer.getvalue().encode('utf-8')
+    buffer.seek(0)
+    buffer.truncate()
+    return chunk
+
+
+def iter_xml_feed(feed_format, meta, rows, last_modified):
+    """Yield an RSS or Atom document item by item instead of building it in memory"""
+    feed_class = Atom1Feed if feed_format == 'atom' else Rss201rev2Feed
+    feed = feed_class(
+        title=meta['title'], link=meta['link'], description=meta['description'],
+        feed_url=meta['feed_url'], language=settings.LANGUAGE_CODE,
+    )
+    feed.latest_post_date = lambda: last_modified or timezone.now()
+
+    buffer = io.StringIO()
+    handler = SimplerXMLGenerator(buffer, 'utf-8', short_empty_elements=True)
+    handler.startDocument()
+    if feed_format == 'atom':
+        item_tag = 'entry'
+        handler.startElement('feed', feed.root_attributes())
+    else:
+        item_tag = 'item'
+        handler.startElement('rss', feed.rss_attributes())
+        handler.startElement('channel', feed.root_attributes())
+    feed.add_root_elements(handler)
+    yield _drain(buffer)
+
+    for row in rows:
+        image = media_url(row['featured_image'])
+        feed.add_item(
+            title=row['title'],
+            link=article_link(row['slug']),
+            description=row['excerpt'],
+            author_name=row['author'],
+            pubdate=row['publish_date'],
+            updateddate=row['updated_at'],
+            unique_id=article_link(row['slug']),
+            categories=[row['category__name']] + NewsArticle(tags=row['tags']).get_tags_list(),
+            enclosures=[Enclosure(image, '0', mimetypes.guess_type(image)[0] or 'image/jpeg')] if image else None,
+        )
+        item = feed.items.pop()
+        handler.startElement(item_tag, feed.item_attributes(item))
+        feed.add_item_elements(handler, item)
+        handler.endElement(item_tag)
+        yield _drain(buffer)
+
+    if feed_format == 'rss':
+        feed.endChannelElement(handler)
+        handler.endElement('rss')
+    else:
+        handler.endElement('feed')
+    yield _drain(buffer)
+
+
+def iter_json_feed(meta, rows):
+    """Yield a JSON Feed 1.1 document item by item"""
+    header = {
+        'version': 'https://jsonfeed.org/version/1.1',
+        'title': meta['title'],
+        'home_page_url': meta['link'],
+        'feed_url': meta['feed_url'],
+        'description': meta['description'],
+        'language': settings.LANGUAGE_CODE,
+    }
+    yield json.dumps(header)[:-1].encode() + b', "items": ['
+
+    for position, row in enumerate(rows):
+        item = {
+            'id': article_link(row['slug']),
+            'url': article_link(row['slug']),
+            'title': row['title'],
+            'summary': row['excerpt'],
+            'date_published': row['publish_date'].isoformat(),
+            'date_modified': row['updated_at'].isoformat(),
+            'authors': [{'name': row['author']}],
+            'tags': [row['category__name']] + NewsArticle(tags=row['tags']).get_tags_list(),
+        }
+        image = media_url(row['featured_image'])
+        if image:
+            item['image'] = image
+        yield (b', ' if position else b'') + json.dumps(item).encode()
+
+    yield b']}'
+
+
+def stream_and_cache(key, chunks):
+    """Pass chunks through to the response and cache the whole document once it is complete"""
+    written = []
+    for chunk in chunks:
+        written.append(chunk)
+        yield chunk
+    cache.set(key, b''.join(written), FEED_CACHE_SECONDS)
+
+
+def render_feed(feed_format, meta, articles, last_modified, key):
+    rows = articles.order_by('-publish_date').values(*ARTICLE_FIELDS)[:FEED_ITEM_LIMIT].iterator()
+    if feed_format == 'json':
+        chunks = iter_json_feed(meta, rows)
+    else:
+        chunks = iter_xml_feed(feed_format, meta, rows, last_modified)
+    return stream_and_cache(key, chunks)
@@ -0,0 +1,113 @@
+"""iCalendar (RFC 5545) feeds of events for calendar subscriptions.
+
+Feeds are rendered from a lean ``values()`` query and cached, together with
+their ETag, under ``Event.cache_version()``; any committed Event write moves
+the version and so retires every cached calendar at once. A polling client
+that sends back the ETag costs one cache lookup and gets 304.
+"""
+import hashlib
+from datetime import timezone as dt_timezone
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Event
+
+CALENDAR_CACHE_SECONDS = 60 * 60 * 24
+CALENDAR_CONTENT_TYPE = 'text/calendar; charset=utf-8'
+
+EVENT_FIELDS = (
+    'slug', 'title', 'event_type', 'start_date', 'end_date', 'venue', 'address',
+    'latitude', 'longitude', 'status', 'contact_person', 'contact_email', 'created_at', 'updated_at',
+)
+
+ICAL_STATUS = {
+    'cancelled': 'CANCELLED',
+    'postponed': 'TENTATIVE',
+}
+
+
+def escape_text(value):
+    return (
+        str(value or '').replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+        .replace('\r\n', '\\n').replace('\n', '\\n')
+    )
+
+
+def fold(line):
+    """Split content lines longer than 75 octets, as RFC 5545 requires"""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= 75:
+        return line
+    parts, start, limit = [], 0, 75
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        # Never cut through a multi-byte character
+        while end < len(encoded) and (encoded[end] & 0xC0) == 0x80:
+            end -= 1
+        parts.append(encoded[start:end].decode('utf-8'))
+        start, limit = end, 74
+    return '\r\n '.join(parts)
+
+
+def utc_stamp(moment):
+    return moment.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def event_url(slug):
+    return f"{settings.FRONTEND_URL.rstrip('/')}/news?event={slug}"
+
+
+def vevent_lines(row, uid_domain):
+    lines = [
+        'BEGIN:VEVENT',
+        f"UID:{row['slug']}@{uid_domain}",
+        f"DTSTAMP:{utc_stamp(row['updated_at'])}",
+        f"CREATED:{utc_stamp(row['created_at'])}",
+        f"LAST-MODIFIED:{utc_stamp(row['updated_at'])}",
+        f"DTSTART:{utc_stamp(row['start_date'])}",
+        f"DTEND:{utc_stamp(row['end_date'])}",
+        f"SUMMARY:{escape_text(row['title'])}",
+        f"LOCATION:{escape_text(', '.join(part for part in (row['venue'], row['address']) if part))}",
+        f"CATEGORIES:{escape_text(dict(Event.EVENT_TYPES).get(row['event_type'], row['event_type']))}",
+        f"STATUS:{ICAL_STATUS.get(row['status'], 'CONFIRMED')}",
+        f"URL:{event_url(row['slug'])}",
+    ]
+    if row['latitude'] is not None and row['longitude'] is not None:
+        lines.append(f"GEO:{row['latitude']};{row['longitude']}")
+    if row['contact_email']:
+        name = escape_text(row['contact_person'] or row['contact_email']).replace('"', "'")
+        lines.append(f'ORGANIZER;CN="{name}":mailto:{row["contact_email"]}')
+    lines.append('END:VEVENT')
+    return lines
+
+
+def render_calendar(name, rows):
+    uid_domain = urlparse(settings.FRONTEND_URL).hostname or 'keefa.org'
+    lines = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        'PRODID:-//KEEFA//Events//EN',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f"X-WR-CALNAME:{escape_text(name)}",
+        'X-PUBLISHED-TTL:PT1H',
+    ]
+    for row in rows:
+        lines.extend(vevent_lines(row, uid_domain))
+    lines.append('END:VCALENDAR')
+    return ('\r\n'.join(fold(line) for line in lines) + '\r\n').encode('utf-8')
+
+
+def calendar(scope, name, events):
+    """(etag, body, event count) for a calendar of the given events, cached until the next Event write"""
+    key = f"event-calendar:{Event.cache_version()}:{scope}"
+    cached = cache.get(key)
+    if cached is None:
+        rows = list(events.order_by('start_date').values(*EVENT_FIELDS))
+        body = render_calendar(name, rows)
+        cached = (f'"{hashlib.md5(body).hexdigest()}"', body, len(rows))
+        if rows or not scope.startswith('event:'):
+            cache.set(key, cached, CALENDAR_CACHE_SECONDS)
+    return cached
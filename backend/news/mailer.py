@@ -0,0 +1,93 @@
+"""Batched sending over a pool of reused SMTP connections.
+
+Each worker thread opens one connection and keeps it for all of its
+batches; a ``RateLimiter`` shared by the threads holds the total rate under
+the provider's cap. At most two batches per connection are queued at once,
+so a caller streaming recipients from the database never gets far ahead of
+the mail server.
+"""
+import logging
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.core.mail import get_connection
+
+from core.throttling import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+
+def batched(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class PooledMailer:
+    """Sends batches of ``(id, email, ...)`` rows; ``settle(batch, sent_ids, failed_ids)`` runs as each completes"""
+
+    def __init__(self, concurrency, rate=0, connection_kwargs=None, settle=None):
+        self.concurrency = concurrency
+        self.limiter = RateLimiter(rate)
+        self.connection_kwargs = connection_kwargs or {}
+        self.settle = settle or (lambda batch, sent, failed: None)
+        self.local = threading.local()
+        self.connections = []
+        self.in_flight = set()
+        self.pool = None
+
+    def __enter__(self):
+        self.pool = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='mailer')
+        return self
+
+    def __exit__(self, *exc_info):
+        try:
+            self.settle_done(wait(self.in_flight)[0])
+        finally:
+            self.pool.shutdown()
+            for connection in self.connections:
+                connection.close()
+
+    def connection(self):
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = self.local.connection = get_connection(fail_silently=False, **self.connection_kwargs)
+            connection.open()
+            self.connections.append(connection)
+        return connection
+
+    def send(self, batch, build):
+        connection = self.connection()
+        sent, failed = [], []
+        for row in batch:
+            self.limiter.wait()
+            try:
+                if build(row, connection).send():
+                    sent.append(row[0])
+                    continue
+            except Exception:
+                logger.warning("Mail to %s failed", row[1], exc_info=True)
+                # The session may be broken; reconnect for the next message
+                try:
+                    connection.close()
+                    connection.open()
+                except Exception:
+                    logger.warning("Could not reopen SMTP connection", exc_info=True)
+            failed.append(row[0])
+        return batch, sent, failed
+
+    def submit(self, batch, build):
+        """Queue a batch; ``build(row, connection)`` returns its message. Blocks while the queue is full"""
+        self.in_flight.add(self.pool.submit(self.send, batch, build))
+        if len(self.in_flight) >= self.concurrency * 2:
+            done, self.in_flight = wait(self.in_flight, return_when=FIRST_COMPLETED)
+            self.settle_done(done)
+
+    def settle_done(self, done):
+        for future in done:
+            self.settle(*future.result())
@@ -0,0 +1,90 @@
+import time
+import uuid
+
+from django.utils import timezone
+from core.benchmarks import BenchmarkCommand
+from news.models import Newsletter, NewsletterEdition
+from news.newsletter import dispatch, prepare_edition
+from news.smtp_sink import SMTPSinkServer
+
+INTERESTS = [['events'], ['scholarships'], ['community', 'events'], None]
+
+
+class Command(BenchmarkCommand):
+    help = 'Benchmark newsletter dispatch to fake subscribers through a local SMTP sink, including a crash and resume'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--subscribers', type=int, default=200000)
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--batch-size', type=int, default=200)
+        parser.add_argument('--latency-ms', type=int, default=0, help='Simulated SMTP DATA response time')
+        parser.add_argument('--crash-after', type=int, default=5, help='Batches sent before the simulated crash')
+
+    def handle(self, *args, **options):
+        run_id = uuid.uuid4().hex[:8]
+        frequency = 'quarterly'
+        # An edition far in the past so the real one for this period is untouched
+        day = timezone.localdate().replace(year=2000)
+
+        sink = SMTPSinkServer('127.0.0.1', 0, options['latency_ms'])
+        sink.start_in_background()
+        connection_kwargs = {
+            'backend': 'django.core.mail.backends.smtp.EmailBackend',
+            'host': '127.0.0.1', 'port': sink.port,
+            'username': '', 'password': '', 'use_tls': False, 'use_ssl': False,
+        }
+
+        edition = None
+        try:
+            start = time.perf_counter()
+            Newsletter.objects.bulk_create([
+                Newsletter(
+                    email=f"bench-{run_id}-{i}@example.invalid", first_name=f"Reader{i}",
+                    frequency=frequency, interests=INTERESTS[i % len(INTERESTS)],
+                )
+                for i in range(options['subscribers'])
+            ], batch_size=5000)
+            self.stdout.write(f"created {options['subscribers']} subscribers in {time.perf_counter() - start:.1f}s")
+
+            NewsletterEdition.objects.filter(frequency=frequency, period_start__year=2000).delete()
+            edition = prepare_edition(frequency, day)
+            audience = Newsletter.objects.filter(
+                frequency=frequency, is_subscribed=True, is_active=True
+            ).count()
+
+            first = dispatch(
+                edition, batch_size=options['batch_size'], concurrency=options['concurrency'],
+                rate=0, connection_kwargs=connection_kwargs, max_batches=options['crash_after'],
+            )
+            edition.refresh_from_db()
+            self.stdout.write(
+                f"crashed after {first['batches']} batches: {first['sent']} sent, "
+                f"checkpoint at subscriber {edition.last_subscriber_id}"
+            )
+
+            second = dispatch(
+                edition, batch_size=options['batch_size'], concurrency=options['concurrency'],
+                rate=0, connection_kwargs=connection_kwargs,
+            )
+            edition.refresh_from_db()
+            self.report(audience, second, edition, sink)
+        finally:
+            sink.shutdown()
+            sink.server_close()
+            if edition is not None:
+                edition.delete()
+            Newsletter.objects.filter(email__startswith=f"bench-{run_id}-").delete()
+
+    def report(self, audience, resumed, edition, sink):
+        duplicates = sum(1 for count in sink.recipients.values() if count > 1)
+        self.stdout.write(
+            f"resumed: {resumed['sent']} sent in {resumed['batches']} batches, "
+            f"{resumed['sent'] / resumed['seconds'] if resumed['seconds'] else 0:.0f} messages/s"
+        )
+        self.stdout.write(
+            f"edition {edition.status}: {edition.sent_count} sent, {edition.failed_count} failed "
+            f"of {audience} due; sink saw {sink.stats['messages']} messages over "
+            f"{sink.stats['connections']} connections"
+        )
+        style = self.style.SUCCESS if not duplicates else self.style.ERROR
+        self.stdout.write(style(f"{len(sink.recipients)} distinct recipients, {duplicates} mailed more than once"))
@@ -0,0 +1,42 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from news.models import NewsletterEdition
+from news.newsletter import dispatch, prepare_edition
+
+
+class Command(BaseCommand):
+    help = 'Send the current newsletter edition of each frequency to subscribers not yet mailed'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--frequency', action='append', choices=[choice for choice, _ in NewsletterEdition.FREQUENCIES],
+            help='Only this frequency (repeatable); defaults to all'
+        )
+        parser.add_argument('--batch-size', type=int, default=settings.NEWSLETTER_BATCH_SIZE)
+        parser.add_argument('--concurrency', type=int, default=settings.NEWSLETTER_CONCURRENCY,
+                            help='Parallel SMTP connections')
+        parser.add_argument('--rate', type=float, default=settings.NEWSLETTER_RATE,
+                            help='Messages per second across all connections (0 for no limit)')
+        parser.add_argument('--loop', action='store_true', help='Keep running, checking every --interval seconds')
+        parser.add_argument('--interval', type=int, default=3600)
+
+    def handle(self, *args, **options):
+        frequencies = options['frequency'] or [choice for choice, _ in NewsletterEdition.FREQUENCIES]
+        while True:
+            for frequency in frequencies:
+                edition = prepare_edition(frequency)
+                if edition.status == 'sent':
+                    continue
+                totals = dispatch(
+                    edition, batch_size=options['batch_size'],
+                    concurrency=options['concurrency'], rate=options['rate'],
+                )
+                self.stdout.write(self.style.SUCCESS(
+                    f"{edition}: sent {totals['sent']}, failed {totals['failed']} "
+                    f"in {totals['batches']} batches ({totals['seconds']}s)"
+                ))
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+from news.publishing import release_due, seconds_until_next_release
+
+
+class Command(BaseCommand):
+    help = 'Retire cached article and event listings when scheduled items go live'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true',
+                            help='Keep running, waking at each scheduled publish time')
+        parser.add_argument('--interval', type=int, default=300,
+                            help='Longest sleep between checks when nothing is scheduled sooner')
+
+    def handle(self, *args, **options):
+        while True:
+            released = release_due()
+            if released:
+                self.stdout.write(self.style.SUCCESS(f"Published scheduled {', '.join(released)} items."))
+            if not options['loop']:
+                break
+            time.sleep(seconds_until_next_release(options['interval']))
@@ -0,0 +1,34 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from news.reminders import LEADS, send_reminders
+
+
+class Command(BaseCommand):
+    help = 'Remind registrants of events starting within 24 hours and within 1 hour'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kind', action='append', choices=list(LEADS),
+                            help='Only this reminder (repeatable); defaults to both')
+        parser.add_argument('--batch-size', type=int, default=settings.NEWSLETTER_BATCH_SIZE)
+        parser.add_argument('--concurrency', type=int, default=settings.NEWSLETTER_CONCURRENCY,
+                            help='Parallel SMTP connections')
+        parser.add_argument('--rate', type=float, default=settings.NEWSLETTER_RATE,
+                            help='Messages per second across all connections (0 for no limit)')
+        parser.add_argument('--loop', action='store_true', help='Keep running, checking every --interval seconds')
+        parser.add_argument('--interval', type=int, default=300)
+
+    def handle(self, *args, **options):
+        while True:
+            totals = send_reminders(
+                kinds=options['kind'], batch_size=options['batch_size'],
+                concurrency=options['concurrency'], rate=options['rate'],
+            )
+            self.stdout.write(self.style.SUCCESS(
+                f"Reminded {totals['events']} events: sent {totals['sent']}, failed {totals['failed']} "
+                f"in {totals['batches']} batches ({totals['seconds']}s)"
+            ))
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from news.models import Event
+
+
+class Command(BaseCommand):
+    help = 'Move events between upcoming, ongoing and completed as their dates pass'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true',
+                            help='Keep running, waking at the next start or end of an event')
+        parser.add_argument('--interval', type=int, default=300,
+                            help='Longest sleep between checks')
+
+    def handle(self, *args, **options):
+        while True:
+            changed = Event.transition_statuses()
+            if changed:
+                self.stdout.write(self.style.SUCCESS(f"Updated the status of {changed} events."))
+            if not options['loop']:
+                break
+            moment = Event.next_transition()
+            delay = options['interval']
+            if moment is not None:
+                delay = min(delay, max(1, (moment - timezone.now()).total_seconds()))
+            time.sleep(delay)
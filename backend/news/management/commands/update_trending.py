@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand
+from news import trending
+
+
+class Command(BaseCommand):
+    help = 'Fold new article views into the decayed trending scores and re-rank'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Keep running every --interval seconds')
+        parser.add_argument('--interval', type=int, default=300)
+
+    def handle(self, *args, **options):
+        while True:
+            rescored, ranked = trending.update()
+            self.stdout.write(self.style.SUCCESS(f"Rescored {rescored} articles; {ranked} trending."))
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-19 13:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0002_delete_organization_alter_event_description_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='newsarticle',
+            index=models.Index(fields=['is_published', 'is_active', 'publish_date', 'updated_at'], name='article_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='newsarticle',
+            index=models.Index(fields=['category', 'is_published', 'is_active', 'publish_date', 'updated_at'], name='article_category_feed_idx'),
+        ),
+    ]
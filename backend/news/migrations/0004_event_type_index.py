@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-19 13:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0003_article_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['is_active', 'event_type', 'start_date'], name='event_active_type_idx'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.7 on 2026-10-19 13:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0004_event_type_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NewsletterEdition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('frequency', models.CharField(choices=[('weekly', 'Weekly'), ('monthly', 'Monthly'), ('quarterly', 'Quarterly')], max_length=20)),
+                ('period_start', models.DateField(help_text='First day of the period this edition is sent in')),
+                ('subject', models.CharField(max_length=200)),
+                ('content', models.JSONField(blank=True, default=dict)),
+                ('status', models.CharField(choices=[('draft', 'Draft'), ('sending', 'Sending'), ('sent', 'Sent')], default='draft', max_length=20)),
+                ('last_subscriber_id', models.BigIntegerField(default=0)),
+                ('sent_count', models.PositiveIntegerField(default=0)),
+                ('failed_count', models.PositiveIntegerField(default=0)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Newsletter Edition',
+                'verbose_name_plural': 'Newsletter Editions',
+                'ordering': ['-period_start', 'frequency'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='newsletter',
+            index=models.Index(fields=['frequency', 'is_subscribed', 'is_active', 'id'], name='newsletter_audience_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='newsletteredition',
+            constraint=models.UniqueConstraint(fields=('frequency', 'period_start'), name='newsletter_edition_unique'),
+        ),
+    ]
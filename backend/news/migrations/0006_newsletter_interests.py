@@ -0,0 +1,55 @@
+# Generated by Django 4.2.7 on 2026-10-19 13:51
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def build_interest_index(apps, schema_editor):
+    """GIN index on PostgreSQL; interest postings for existing subscribers elsewhere"""
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE INDEX IF NOT EXISTS newsletter_interests_gin '
+            'ON news_newsletter USING gin (interests jsonb_path_ops)'
+        )
+        return
+
+    Newsletter = apps.get_model('news', 'Newsletter')
+    NewsletterInterest = apps.get_model('news', 'NewsletterInterest')
+    postings = []
+    for pk, interests in Newsletter.objects.values_list('id', 'interests').iterator():
+        if isinstance(interests, list):
+            keys = {str(interest).strip().lower() for interest in interests if str(interest).strip()}
+            postings.extend(NewsletterInterest(subscriber_id=pk, interest=key) for key in sorted(keys))
+    NewsletterInterest.objects.bulk_create(postings, batch_size=1000)
+
+
+def drop_interest_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS newsletter_interests_gin')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0005_newsletter_editions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NewsletterInterest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('interest', models.CharField(max_length=50)),
+                ('subscriber', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='interest_postings', to='news.newsletter')),
+            ],
+            options={
+                'verbose_name': 'Newsletter Interest',
+                'verbose_name_plural': 'Newsletter Interests',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='newsletterinterest',
+            constraint=models.UniqueConstraint(fields=('interest', 'subscriber'), name='newsletter_interest_unique'),
+        ),
+        migrations.RunPython(build_interest_index, drop_interest_index),
+    ]
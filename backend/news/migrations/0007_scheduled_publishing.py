@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-19 13:53
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+def publish_existing_events(apps, schema_editor):
+    # Events created before scheduling existed have always been public
+    Event = apps.get_model('news', 'Event')
+    Event.objects.update(publish_date=models.F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0006_newsletter_interests'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='publish_date',
+            field=models.DateTimeField(default=django.utils.timezone.now, help_text='Hidden from the site until this time'),
+        ),
+        migrations.AlterField(
+            model_name='newsarticle',
+            name='publish_date',
+            field=models.DateTimeField(default=django.utils.timezone.now, help_text='Hidden from the site until this time'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['is_active', 'publish_date'], name='event_publish_idx'),
+        ),
+        migrations.RunPython(publish_existing_events, migrations.RunPython.noop),
+    ]
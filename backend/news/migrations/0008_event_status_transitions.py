@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-19 13:55
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def transition_existing_events(apps, schema_editor):
+    """Bring hand-set statuses in line with the dates before ?status= relies on them"""
+    Event = apps.get_model('news', 'Event')
+    now = timezone.now()
+    scheduled = Event.objects.filter(status__in=('upcoming', 'ongoing', 'completed'))
+    scheduled.filter(start_date__gt=now).update(status='upcoming')
+    scheduled.filter(start_date__lte=now, end_date__gte=now).update(status='ongoing')
+    scheduled.filter(end_date__lt=now).update(status='completed')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0007_scheduled_publishing'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['is_active', 'status', 'start_date'], name='event_status_idx'),
+        ),
+        migrations.RunPython(transition_existing_events, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:01
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0009_event_geohash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArticleTrend',
+            fields=[
+                ('article', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='trend', serialize=False, to='news.newsarticle')),
+                ('score', models.FloatField(default=0)),
+                ('views_seen', models.PositiveIntegerField(default=0)),
+                ('scored_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Article Trend',
+                'verbose_name_plural': 'Article Trends',
+                'indexes': [models.Index(fields=['scored_at'], name='article_trend_scored_idx')],
+            },
+        ),
+    ]
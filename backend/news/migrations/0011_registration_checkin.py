@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0010_article_trend'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eventregistration',
+            name='checked_in_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='eventregistration',
+            name='checkin_device',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='eventregistration',
+            name='checkin_scanned_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
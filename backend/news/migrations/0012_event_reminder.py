@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:04
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0011_registration_checkin'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventReminder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('day', '24 hours before'), ('hour', '1 hour before')], max_length=10)),
+                ('claim', models.CharField(max_length=32)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('registration', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reminders', to='news.eventregistration')),
+            ],
+            options={
+                'verbose_name': 'Event Reminder',
+                'verbose_name_plural': 'Event Reminders',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='eventreminder',
+            constraint=models.UniqueConstraint(fields=('registration', 'kind'), name='event_reminder_once'),
+        ),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:07
+
+from django.db import migrations, models
+
+from core.content import backfill
+
+
+def process_existing_content(apps, schema_editor):
+    """Derive the stored content columns of existing articles and events"""
+    backfill(apps.get_model('news', 'NewsArticle'), 'content')
+    backfill(apps.get_model('news', 'Event'), 'description')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0012_event_reminder'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='body_html',
+            field=models.TextField(blank=True, default='', editable=False, help_text='Sanitized HTML'),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='body_text',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='first_image',
+            field=models.CharField(blank=True, default='', editable=False, max_length=500),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='outline',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='reading_minutes',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='newsarticle',
+            name='body_html',
+            field=models.TextField(blank=True, default='', editable=False, help_text='Sanitized HTML'),
+        ),
+        migrations.AddField(
+            model_name='newsarticle',
+            name='body_text',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='newsarticle',
+            name='first_image',
+            field=models.CharField(blank=True, default='', editable=False, max_length=500),
+        ),
+        migrations.AddField(
+            model_name='newsarticle',
+            name='outline',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.AddField(
+            model_name='newsarticle',
+            name='reading_minutes',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='newsarticle',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(process_existing_content, migrations.RunPython.noop),
+    ]
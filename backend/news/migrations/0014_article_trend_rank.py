@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0013_processed_content'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='articletrend',
+            name='rank',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='articletrend',
+            index=models.Index(condition=models.Q(('rank__isnull', False)), fields=['rank'], name='article_trend_rank_idx'),
+        ),
+    ]
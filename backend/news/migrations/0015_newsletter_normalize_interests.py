@@ -0,0 +1,30 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:40
+
+from django.db import migrations
+
+
+def normalize_interests(apps, schema_editor):
+    """Store subscriber interests lowercased, as Newsletter.save now does"""
+    Newsletter = apps.get_model('news', 'Newsletter')
+    changed = []
+    for subscriber in Newsletter.objects.only('id', 'interests').iterator():
+        if not isinstance(subscriber.interests, list):
+            continue
+        interests = list(dict.fromkeys(
+            str(interest).strip().lower() for interest in subscriber.interests if str(interest).strip()
+        ))
+        if interests != subscriber.interests:
+            subscriber.interests = interests
+            changed.append(subscriber)
+    Newsletter.objects.bulk_update(changed, ['interests'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0014_article_trend_rank'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_interests, migrations.RunPython.noop),
+    ]
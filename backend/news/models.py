@@ -1,8 +1,11 @@
-from django.db import models
+from datetime import timedelta
+from django.db import models, transaction
 from django.utils import timezone
 from django.contrib.auth.models import User
 from django_ckeditor_5.fields import CKEditor5Field 
-from core.models import BaseModel
+from core.models import BaseModel, CacheVersionMixin, GeohashModel, InterestPosting, ProcessedContentModel
+from core.timebuckets import bucket_ceil, bucket_end
+from core.timewindows import TimeWindows
 
 
 class NewsCategory(BaseModel):
@@ -22,8 +25,13 @@ class NewsCategory(BaseModel):
         return self.name
 
 
-class NewsArticle(BaseModel):
+class NewsArticle(CacheVersionMixin, ProcessedContentModel, BaseModel):
     """News articles and updates"""
+    CACHE_VERSION_KEY = 'news:article-version'
+    CONTENT_FIELD = 'content'
+    # Large text columns that list endpoints never read
+    LIST_DEFERRED_FIELDS = ('content', 'body_html', 'body_text', 'outline', 'gallery_images')
+
     title = models.CharField(max_length=200)
     slug = models.SlugField(unique=True)
     excerpt = models.TextField(max_length=300)
@@ -40,7 +48,7 @@ class NewsArticle(BaseModel):
     
     # Author and Publishing
     author = models.CharField(max_length=100, default="KEEFA Team")
-    publish_date = models.DateTimeField(default=timezone.now)
+    publish_date = models.DateTimeField(default=timezone.now, help_text="Hidden from the site until this time")
     
     # SEO
     meta_title = models.CharField(max_length=60, blank=True, null=True)
@@ -58,6 +66,15 @@ class NewsArticle(BaseModel):
         ordering = ['-publish_date']
         verbose_name = "News Article"
         verbose_name_plural = "News Articles"
+        indexes = [
+            models.Index(
+                fields=['is_published', 'is_active', 'publish_date', 'updated_at'], name='article_feed_idx'
+            ),
+            models.Index(
+                fields=['category', 'is_published', 'is_active', 'publish_date', 'updated_at'],
+                name='article_category_feed_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.title
@@ -68,7 +85,30 @@ class NewsArticle(BaseModel):
         return []
 
 
-class Event(BaseModel):
+class ArticleTrend(models.Model):
+    """Exponentially decayed view score of an article, maintained by the update_trending job"""
+    article = models.OneToOneField(NewsArticle, on_delete=models.CASCADE, primary_key=True, related_name='trend')
+    # Decayed views as of scored_at; decay it to "now" before comparing
+    score = models.FloatField(default=0)
+    # NewsArticle.views_count already folded into the score
+    views_seen = models.PositiveIntegerField(default=0)
+    scored_at = models.DateTimeField()
+    # Position in the last trending ranking (0 is top), null when not ranked
+    rank = models.PositiveSmallIntegerField(blank=True, null=True)
+
+    class Meta:
+        verbose_name = "Article Trend"
+        verbose_name_plural = "Article Trends"
+        indexes = [
+            models.Index(fields=['scored_at'], name='article_trend_scored_idx'),
+            models.Index(fields=['rank'], condition=models.Q(rank__isnull=False), name='article_trend_rank_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.article} ({self.score:.1f})"
+
+
+class Event(CacheVersionMixin, GeohashModel, ProcessedContentModel, BaseModel):
     """Upcoming events and activities"""
     EVENT_TYPES = [
         ('workshop', 'Workshop'),
@@ -87,6 +127,14 @@ class Event(BaseModel):
         ('cancelled', 'Cancelled'),
         ('postponed', 'Postponed'),
     ]
+
+    # Statuses that follow the event's dates; cancelled and postponed are only set by hand
+    SCHEDULED_STATUSES = ('upcoming', 'ongoing', 'completed')
+
+    CACHE_VERSION_KEY = 'news:event-version'
+    CONTENT_FIELD = 'description'
+    LIST_DEFERRED_FIELDS = ('description', 'body_html', 'body_text', 'outline', 'gallery_images')
+    TIME_WINDOWS = TimeWindows(start='start_date', end='end_date', soon=timedelta(days=1))
     
     title = models.CharField(max_length=200)
     slug = models.SlugField(unique=True)
@@ -121,15 +169,70 @@ class Event(BaseModel):
     # Status
     status = models.CharField(max_length=20, choices=EVENT_STATUS, default='upcoming')
     is_featured = models.BooleanField(default=False)
+    publish_date = models.DateTimeField(default=timezone.now, help_text="Hidden from the site until this time")
 
     class Meta:
         ordering = ['start_date']
         verbose_name = "Event"
         verbose_name_plural = "Events"
+        indexes = [
+            models.Index(fields=['is_active', 'event_type', 'start_date'], name='event_active_type_idx'),
+            models.Index(fields=['is_active', 'publish_date'], name='event_publish_idx'),
+            models.Index(fields=['is_active', 'status', 'start_date'], name='event_status_idx'),
+            models.Index(fields=['geohash'], name='event_geohash_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        if self.status in self.SCHEDULED_STATUSES:
+            self.status = self.status_at(self.TIME_WINDOWS.now())
+        super().save(*args, **kwargs)
+
+    def status_at(self, moment):
+        if self.start_date > moment:
+            return 'upcoming'
+        if self.end_date >= moment:
+            return 'ongoing'
+        return 'completed'
+
+    @classmethod
+    def transition_statuses(cls):
+        """Move events between upcoming, ongoing and completed in three set-based UPDATEs.
+
+        Uses the bucketed clock of TIME_WINDOWS, so status agrees with the
+        time windows. Returns the number of events changed.
+        """
+        now = cls.TIME_WINDOWS.now()
+        scheduled = cls.objects.filter(status__in=cls.SCHEDULED_STATUSES)
+        changed = (
+            scheduled.filter(start_date__gt=now).exclude(status='upcoming').update(status='upcoming')
+            + scheduled.filter(start_date__lte=now, end_date__gte=now).exclude(status='ongoing').update(status='ongoing')
+            + scheduled.filter(end_date__lt=now).exclude(status='completed').update(status='completed')
+        )
+        if changed:
+            # UPDATEs bypass save(), so retire cached event lists here
+            transaction.on_commit(cls.touch_cache_version)
+        return changed
+
+    @classmethod
+    def next_transition(cls):
+        """The bucket boundary at which the next status change is due, or None"""
+        now = cls.TIME_WINDOWS.now()
+        seconds = cls.TIME_WINDOWS.bucket_seconds
+        start = cls.objects.filter(status='upcoming', start_date__gt=now).aggregate(first=models.Min('start_date'))
+        end = cls.objects.filter(status__in=('upcoming', 'ongoing'), end_date__gte=now).aggregate(
+            first=models.Min('end_date')
+        )
+        moments = []
+        if start['first']:
+            moments.append(bucket_ceil(start['first'], seconds))
+        if end['first']:
+            # Completed once the clock has passed end_date
+            moments.append(bucket_end(end['first'], seconds))
+        return min(moments) if moments else None
+
     @property
     def is_past(self):
         return self.end_date < timezone.now()
@@ -160,6 +263,10 @@ class EventRegistration(BaseModel):
         ('no_show', 'No Show'),
         ('cancelled', 'Cancelled'),
     ], default='registered')
+    # Offline check-in (see news.checkin): when the attendee was scanned in, and the scan that last set the status
+    checked_in_at = models.DateTimeField(blank=True, null=True)
+    checkin_scanned_at = models.DateTimeField(blank=True, null=True)
+    checkin_device = models.CharField(max_length=64, blank=True, default='')
     
     # Payment (if applicable)
     payment_status = models.CharField(max_length=20, choices=[
@@ -188,6 +295,31 @@ class EventRegistration(BaseModel):
         return f"{self.first_name} {self.last_name}"
 
 
+class EventReminder(models.Model):
+    """A registration's reminder, claimed before it is sent so that it goes out at most once (see news.reminders)"""
+    KINDS = [
+        ('day', '24 hours before'),
+        ('hour', '1 hour before'),
+    ]
+
+    registration = models.ForeignKey(EventRegistration, on_delete=models.CASCADE, related_name='reminders')
+    kind = models.CharField(max_length=10, choices=KINDS)
+    # The run that claimed it, and when (created_at); sent_at stays empty until the message is delivered
+    claim = models.CharField(max_length=32)
+    sent_at = models.DateTimeField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Event Reminder"
+        verbose_name_plural = "Event Reminders"
+        constraints = [
+            models.UniqueConstraint(fields=['registration', 'kind'], name='event_reminder_once'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} reminder for {self.registration}"
+
+
 class Newsletter(BaseModel):
     """Newsletter subscriptions"""
     email = models.EmailField(unique=True)
@@ -214,7 +346,77 @@ class Newsletter(BaseModel):
         ordering = ['-created_at']
         verbose_name = "Newsletter Subscription"
         verbose_name_plural = "Newsletter Subscriptions"
+        indexes = [
+            # Due audience of an edition, walked in id order from its checkpoint
+            models.Index(fields=['frequency', 'is_subscribed', 'is_active', 'id'], name='newsletter_audience_idx'),
+        ]
 
     def __str__(self):
         name = f"{self.first_name} {self.last_name}".strip()
-        return name if name else self.email
\ No newline at end of file
+        return name if name else self.email
+
+    def save(self, *args, **kwargs):
+        self.interests = NewsletterInterest.stored(self.interests)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            NewsletterInterest.refresh([self])
+
+
+class NewsletterInterest(InterestPosting):
+    """Subscriber interest postings for segments where Newsletter.interests has no GIN index"""
+    subscriber = models.ForeignKey(Newsletter, on_delete=models.CASCADE, related_name='interest_postings')
+    interest = models.CharField(max_length=50)
+
+    owner_field = 'subscriber'
+    segment_source = 'newsletter'
+
+    class Meta:
+        verbose_name = "Newsletter Interest"
+        verbose_name_plural = "Newsletter Interests"
+        constraints = [
+            models.UniqueConstraint(fields=['interest', 'subscriber'], name='newsletter_interest_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.subscriber} - {self.interest}"
+
+
+class NewsletterEdition(BaseModel):
+    """One issue of the newsletter for a frequency and period, with its send checkpoint"""
+    FREQUENCIES = [
+        ('weekly', 'Weekly'),
+        ('monthly', 'Monthly'),
+        ('quarterly', 'Quarterly'),
+    ]
+
+    STATUS = [
+        ('draft', 'Draft'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+    ]
+
+    frequency = models.CharField(max_length=20, choices=FREQUENCIES)
+    period_start = models.DateField(help_text="First day of the period this edition is sent in")
+    subject = models.CharField(max_length=200)
+
+    # Rendered once per edition: {'sections': [{'key', 'title', 'html', 'text'}]}
+    content = models.JSONField(default=dict, blank=True)
+
+    status = models.CharField(max_length=20, choices=STATUS, default='draft')
+    # Subscribers up to this id have been sent to (or failed); a resumed run starts after it
+    last_subscriber_id = models.BigIntegerField(default=0)
+    sent_count = models.PositiveIntegerField(default=0)
+    failed_count = models.PositiveIntegerField(default=0)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['-period_start', 'frequency']
+        verbose_name = "Newsletter Edition"
+        verbose_name_plural = "Newsletter Editions"
+        constraints = [
+            models.UniqueConstraint(fields=['frequency', 'period_start'], name='newsletter_edition_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_frequency_display()} newsletter {self.period_start:%Y-%m-%d}"
@@ -0,0 +1,245 @@
+"""Build and send newsletter editions.
+
+An edition is rendered once: its sections (one per news category, plus
+upcoming events) are stored on ``NewsletterEdition.content`` and each
+distinct combination of sections a subscriber's interests select is turned
+into a message body only once. Recipients are streamed from the due
+audience in id order. As batches finish, the edition's
+``last_subscriber_id`` checkpoint moves past the last batch that, with every
+batch before it, has been sent. A crashed run resumes from there: nobody is
+skipped, and only the few batches that were in flight can be mailed again.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from datetime import date, datetime, timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.core.mail import EmailMultiAlternatives
+from django.db.models import F
+from django.template.loader import get_template, render_to_string
+from django.utils import timezone
+from django.utils.html import escape, strip_tags
+from django.utils.text import Truncator
+
+from .mailer import PooledMailer, batched
+from .models import NewsArticle, Newsletter, NewsletterEdition
+from .publishing import published_events
+
+logger = logging.getLogger(__name__)
+
+UNSUBSCRIBE_SALT = 'newsletter-unsubscribe'
+NAME_TOKEN = '%%RECIPIENT_NAME%%'
+UNSUBSCRIBE_TOKEN = '%%UNSUBSCRIBE_URL%%'
+EVENTS_SECTION = 'events'
+
+
+# Periods
+
+def period_start(frequency, day):
+    if frequency == 'weekly':
+        return day - timedelta(days=day.weekday())
+    if frequency == 'monthly':
+        return day.replace(day=1)
+    return date(day.year, 3 * ((day.month - 1) // 3) + 1, 1)
+
+
+def previous_period_start(frequency, start):
+    return period_start(frequency, start - timedelta(days=1))
+
+
+def next_period_start(frequency, start):
+    if frequency == 'weekly':
+        return start + timedelta(days=7)
+    months = 1 if frequency == 'monthly' else 3
+    year, month = divmod(start.month - 1 + months, 12)
+    return date(start.year + year, month + 1, 1)
+
+
+def aware(day):
+    return timezone.make_aware(datetime.combine(day, datetime.min.time()))
+
+
+# Content
+
+def build_content(frequency, start):
+    """Sections for the edition sent at ``start``: the previous period's articles and the coming events"""
+    covers_from = aware(previous_period_start(frequency, start))
+    covers_to = aware(start)
+    site = settings.FRONTEND_URL.rstrip('/')
+
+    sections = []
+    articles = NewsArticle.objects.filter(
+        is_published=True, is_active=True, publish_date__gte=covers_from, publish_date__lt=covers_to,
+    ).order_by('category__order', 'category__name', '-publish_date').values(
+        'title', 'slug', 'excerpt', 'publish_date', 'category__slug', 'category__name'
+    )
+    by_category = {}
+    for article in articles:
+        by_category.setdefault((article['category__slug'], article['category__name']), []).append({
+            'title': article['title'],
+            'link': f"{site}/news?article={article['slug']}",
+            'summary': Truncator(strip_tags(article['excerpt'])).words(40),
+            'when': None,
+        })
+    for (key, title), items in by_category.items():
+        sections.append(render_section(key, title, items))
+
+    events = published_events().filter(
+        status='upcoming',
+        start_date__gte=covers_to, start_date__lt=aware(next_period_start(frequency, start)),
+    ).order_by('start_date').values('title', 'slug', 'start_date', 'venue')
+    items = [{
+        'title': event['title'],
+        'link': f"{site}/news?event={event['slug']}",
+        'summary': event['venue'],
+        'when': timezone.localtime(event['start_date']).strftime('%a %d %b %Y, %H:%M'),
+    } for event in events]
+    if items:
+        sections.append(render_section(EVENTS_SECTION, 'Upcoming Events', items))
+
+    return {'sections': sections}
+
+
+def render_section(key, title, items):
+    context = {'title': title, 'items': items}
+    return {
+        'key': key,
+        'title': title,
+        'html': render_to_string('news/newsletter/section.html', context),
+        'text': render_to_string('news/newsletter/section.txt', context),
+    }
+
+
+def prepare_edition(frequency, day=None):
+    """The edition due for ``frequency`` in the period containing ``day``, built if it is new"""
+    start = period_start(frequency, day or timezone.localdate())
+    edition, created = NewsletterEdition.objects.get_or_create(
+        frequency=frequency, period_start=start,
+        defaults={'subject': f"KEEFA {frequency.capitalize()} Update - {start:%d %B %Y}"},
+    )
+    if created or not edition.content:
+        edition.content = build_content(frequency, start)
+        edition.save(update_fields=['content', 'updated_at'])
+    return edition
+
+
+class EditionRenderer:
+    """Message bodies per section combination, personalised by token substitution"""
+
+    def __init__(self, edition):
+        self.edition = edition
+        self.sections = edition.content.get('sections', [])
+        self.category_keys = {section['key'] for section in self.sections if section['key'] != EVENTS_SECTION}
+        self.html_template = get_template('news/newsletter/edition.html')
+        self.text_template = get_template('news/newsletter/edition.txt')
+        self.bodies = {}
+        self.lock = threading.Lock()
+
+    def selection(self, interests):
+        wanted = {str(interest).strip().lower() for interest in interests} if isinstance(interests, list) else set()
+        chosen = self.category_keys & wanted
+        # Subscribers without matching interests get every section
+        return frozenset(chosen or self.category_keys)
+
+    def bodies_for(self, selection):
+        bodies = self.bodies.get(selection)
+        if bodies is None:
+            context = {
+                'subject': self.edition.subject,
+                'frequency': self.edition.get_frequency_display().lower(),
+                'site_url': settings.FRONTEND_URL,
+                'greeting_name': NAME_TOKEN,
+                'unsubscribe_url': UNSUBSCRIBE_TOKEN,
+                'sections': [s for s in self.sections if s['key'] in selection or s['key'] == EVENTS_SECTION],
+            }
+            bodies = (self.text_template.render(context), self.html_template.render(context))
+            with self.lock:
+                self.bodies[selection] = bodies
+        return bodies
+
+    def message(self, email, first_name, interests, connection):
+        text, html = self.bodies_for(self.selection(interests))
+        name = first_name or 'friend'
+        url = unsubscribe_url(email)
+        message = EmailMultiAlternatives(
+            subject=self.edition.subject,
+            body=text.replace(NAME_TOKEN, name).replace(UNSUBSCRIBE_TOKEN, url),
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[email],
+            connection=connection,
+            headers={'List-Unsubscribe': f"<{url}>", 'List-Unsubscribe-Post': 'List-Unsubscribe=One-Click'},
+        )
+        message.attach_alternative(
+            html.replace(NAME_TOKEN, escape(name)).replace(UNSUBSCRIBE_TOKEN, escape(url)), 'text/html'
+        )
+        return message
+
+
+def unsubscribe_url(email):
+    token = signing.dumps(email, salt=UNSUBSCRIBE_SALT)
+    return f"{settings.API_URL.rstrip('/')}/api/v1/news/newsletter/unsubscribe/?token={token}"
+
+
+# Sending
+
+def due_audience(edition):
+    return Newsletter.objects.filter(
+        frequency=edition.frequency, is_subscribed=True, is_active=True, id__gt=edition.last_subscriber_id,
+    ).order_by('id').values_list('id', 'email', 'first_name', 'interests')
+
+
+def recipient_batches(edition, batch_size):
+    return batched(due_audience(edition).iterator(chunk_size=2000), batch_size)
+
+
+def dispatch(edition, batch_size=None, concurrency=None, rate=None, connection_kwargs=None, max_batches=None):
+    """Send an edition to its due audience; resumes from the checkpoint of an interrupted run"""
+    batch_size = batch_size or settings.NEWSLETTER_BATCH_SIZE
+    concurrency = concurrency or settings.NEWSLETTER_CONCURRENCY
+    rate = settings.NEWSLETTER_RATE if rate is None else rate
+
+    if edition.status == 'sent':
+        return {'sent': 0, 'failed': 0, 'batches': 0}
+    NewsletterEdition.objects.filter(pk=edition.pk).update(
+        status='sending', started_at=edition.started_at or timezone.now()
+    )
+
+    renderer = EditionRenderer(edition)
+    started = time.monotonic()
+    totals = {'sent': 0, 'failed': 0, 'batches': 0}
+
+    def build(row, connection):
+        _, email, first_name, interests = row
+        return renderer.message(email, first_name, interests, connection)
+
+    # Last subscriber id of each batch handed to the mailer, in order, and those of finished batches
+    submitted, finished = deque(), set()
+
+    def settle(batch, sent, failed):
+        totals['sent'] += len(sent)
+        totals['failed'] += len(failed)
+        changes = {'sent_count': F('sent_count') + len(sent), 'failed_count': F('failed_count') + len(failed)}
+        # Batches finish out of order; checkpoint only past the run of finished ones at the front
+        finished.add(batch[-1][0])
+        while submitted and submitted[0] in finished:
+            changes['last_subscriber_id'] = submitted.popleft()
+            finished.discard(changes['last_subscriber_id'])
+        NewsletterEdition.objects.filter(pk=edition.pk).update(**changes)
+
+    with PooledMailer(concurrency, rate, connection_kwargs, settle) as mailer:
+        for batch in recipient_batches(edition, batch_size):
+            submitted.append(batch[-1][0])
+            mailer.submit(batch, build)
+            totals['batches'] += 1
+            if max_batches and totals['batches'] >= max_batches:
+                break
+
+    if not max_batches or totals['batches'] < max_batches:
+        NewsletterEdition.objects.filter(pk=edition.pk).update(status='sent', finished_at=timezone.now())
+
+    totals['seconds'] = round(time.monotonic() - started, 2)
+    logger.info("Dispatched %s: %s", edition, totals)
+    return totals
@@ -0,0 +1,78 @@
+"""Scheduled publishing of news articles and events.
+
+Articles and events stay hidden until their ``publish_date``. Visibility is
+tested against "now" rounded down to the minute, so every request within a
+minute runs the same query and cached results stay shareable. Nothing is
+written when a scheduled item goes live, so the ``publish_scheduled``
+command moves the model's cache version at that minute's boundary instead.
+The last minute it handled is kept in ``CacheMarker`` so one-shot runs from
+cron pick up where the previous run stopped.
+"""
+from datetime import datetime, timezone as dt_timezone
+
+from django.db.models import Min
+from django.utils import timezone
+
+from core.models import CacheMarker
+from core.timebuckets import bucket_ceil, bucket_now
+from .models import Event, NewsArticle
+
+PUBLISH_BUCKET_SECONDS = 60
+LAST_RELEASE_KEY = 'news:last-release'
+
+
+def publish_now():
+    return bucket_now(PUBLISH_BUCKET_SECONDS)
+
+
+def publishable():
+    """(model, queryset of items that are or will be public) pairs"""
+    return (
+        (NewsArticle, NewsArticle.objects.filter(is_published=True, is_active=True)),
+        (Event, Event.objects.filter(is_active=True)),
+    )
+
+
+def published_articles():
+    return NewsArticle.objects.filter(is_published=True, is_active=True, publish_date__lte=publish_now())
+
+
+def published_events():
+    return Event.objects.filter(is_active=True, publish_date__lte=publish_now())
+
+
+def next_release():
+    """When the next scheduled article or event goes live, or None"""
+    now = publish_now()
+    upcoming = [
+        items.filter(publish_date__gt=now).aggregate(first=Min('publish_date'))['first']
+        for _, items in publishable()
+    ]
+    upcoming = [moment for moment in upcoming if moment]
+    if not upcoming:
+        return None
+    # Items show from the first minute boundary at or after their publish_date
+    return bucket_ceil(min(upcoming), PUBLISH_BUCKET_SECONDS)
+
+
+def release_due():
+    """Retire the caches of models with items that went live since the last run; returns their names"""
+    now = publish_now()
+    since = CacheMarker.read(LAST_RELEASE_KEY)
+    if since is not None:
+        since = datetime.fromtimestamp(since, tz=dt_timezone.utc)
+    released = []
+    if since is not None and since < now:
+        for model, items in publishable():
+            if items.filter(publish_date__gt=since, publish_date__lte=now).exists():
+                model.touch_cache_version()
+                released.append(model.__name__)
+    CacheMarker.write(LAST_RELEASE_KEY, int(now.timestamp()))
+    return released
+
+
+def seconds_until_next_release(default):
+    moment = next_release()
+    if moment is None:
+        return default
+    return min(default, max(1, (moment - timezone.now()).total_seconds()))
@@ -0,0 +1,167 @@
+"""Reminders to event registrants 24 hours and 1 hour before the start.
+
+Events due for a reminder are found with a range query on ``start_date``
+(served by ``event_status_idx``). Each event's message is rendered once,
+with placeholders for the registrant's name and check-in code. Registrations
+are streamed in id order, skipping those whose reminder was sent or is
+claimed by a live run, and sent in batches through ``PooledMailer``. Markers
+for a batch are claimed before it is sent and stamped in one update once it
+is delivered; failed messages lose their marker, so the next run retries
+them. A marker left unstamped by a crashed run is reclaimed once its
+``CLAIM_LEASE`` runs out, so a crash delays those reminders instead of
+losing them; only a batch that takes longer than the lease to send could go
+out twice.
+"""
+import logging
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
+from django.db.models import Exists, OuterRef, Q
+from django.template.loader import get_template
+from django.utils import timezone
+from django.utils.html import escape
+
+from .checkin import check_in_code
+from .ical import event_url
+from .mailer import PooledMailer, batched
+from .models import EventRegistration, EventReminder
+from .newsletter import NAME_TOKEN
+from .publishing import published_events
+
+logger = logging.getLogger(__name__)
+
+CODE_TOKEN = '%%CHECK_IN_CODE%%'
+# How long a claimed but unsent marker belongs to its run
+CLAIM_LEASE = timedelta(minutes=10)
+
+# kind -> how long before the start it goes out; longest first
+LEADS = {
+    'day': timedelta(hours=24),
+    'hour': timedelta(hours=1),
+}
+
+
+def starts_in(start, now):
+    """'today at 09:00', 'tomorrow at 18:30' or 'on Friday 14 March at 10:00', in local time"""
+    start, today = timezone.localtime(start), timezone.localtime(now).date()
+    at = start.strftime('%H:%M')
+    if start.date() == today:
+        return f"today at {at}"
+    if start.date() == today + timedelta(days=1):
+        return f"tomorrow at {at}"
+    return f"on {start:%A %d %B} at {at}"
+
+
+def due_events(kind, now=None):
+    """Upcoming events that have entered the reminder's window but not the next, shorter one"""
+    now = now or timezone.now()
+    shorter = [lead for lead in LEADS.values() if lead < LEADS[kind]]
+    return published_events().filter(
+        status='upcoming',
+        start_date__gt=now + max(shorter, default=timedelta(0)),
+        start_date__lte=now + LEADS[kind],
+    ).order_by('start_date')
+
+
+def due_registrations(event, kind):
+    reminded = EventReminder.objects.filter(
+        Q(sent_at__isnull=False) | Q(created_at__gte=timezone.now() - CLAIM_LEASE),
+        registration=OuterRef('pk'), kind=kind,
+    )
+    return EventRegistration.objects.filter(event=event).exclude(attendance_status='cancelled').filter(
+        ~Exists(reminded)
+    ).order_by('id').values_list('id', 'email', 'first_name')
+
+
+class ReminderRenderer:
+    """One event's reminder, rendered once and personalised by token substitution"""
+
+    def __init__(self, event, now=None):
+        self.event = event
+        when = starts_in(event.start_date, now or timezone.now())
+        self.subject = f"Reminder: {event.title} starts {when}"
+        start = timezone.localtime(event.start_date)
+        context = {
+            'subject': self.subject,
+            'event': event,
+            'starts_in': when,
+            'when': start.strftime('%A %d %B %Y, %H:%M'),
+            'where': ', '.join(part for part in (event.venue, event.address) if part),
+            'link': event_url(event.slug),
+            'site_url': settings.FRONTEND_URL,
+            'greeting_name': NAME_TOKEN,
+            'check_in_code': CODE_TOKEN,
+        }
+        self.text = get_template('news/reminders/event.txt').render(context)
+        self.html = get_template('news/reminders/event.html').render(context)
+
+    def message(self, registration_id, email, first_name, connection):
+        name = first_name or 'friend'
+        code = check_in_code(registration_id, self.event.pk)
+        message = EmailMultiAlternatives(
+            subject=self.subject,
+            body=self.text.replace(NAME_TOKEN, name).replace(CODE_TOKEN, code),
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[email],
+            connection=connection,
+        )
+        message.attach_alternative(self.html.replace(NAME_TOKEN, escape(name)).replace(CODE_TOKEN, code), 'text/html')
+        return message
+
+
+def claim(kind, batch):
+    """The rows of a batch this run now owns; rows claimed by a concurrent run are dropped"""
+    token = uuid.uuid4().hex
+    ids = [row[0] for row in batch]
+    now = timezone.now()
+    # Take over markers whose run died before stamping them; created_at doubles as the claim time
+    EventReminder.objects.filter(
+        kind=kind, registration_id__in=ids, sent_at__isnull=True, created_at__lt=now - CLAIM_LEASE,
+    ).update(claim=token, created_at=now)
+    EventReminder.objects.bulk_create(
+        [EventReminder(registration_id=pk, kind=kind, claim=token) for pk in ids], ignore_conflicts=True
+    )
+    owned = set(EventReminder.objects.filter(kind=kind, registration_id__in=ids, claim=token).values_list(
+        'registration_id', flat=True
+    ))
+    return [row for row in batch if row[0] in owned]
+
+
+def send_reminders(kinds=None, batch_size=None, concurrency=None, rate=None, connection_kwargs=None, now=None):
+    """Send every due reminder; returns totals per run"""
+    batch_size = batch_size or settings.NEWSLETTER_BATCH_SIZE
+    concurrency = concurrency or settings.NEWSLETTER_CONCURRENCY
+    rate = settings.NEWSLETTER_RATE if rate is None else rate
+    started = time.monotonic()
+    totals = {'events': 0, 'sent': 0, 'failed': 0, 'batches': 0}
+
+    def settle(kind):
+        def record(batch, sent, failed):
+            EventReminder.objects.filter(kind=kind, registration_id__in=sent).update(sent_at=timezone.now())
+            # Give failed messages back to the next run
+            EventReminder.objects.filter(kind=kind, registration_id__in=failed, sent_at__isnull=True).delete()
+            totals['sent'] += len(sent)
+            totals['failed'] += len(failed)
+        return record
+
+    for kind in kinds or LEADS:
+        for event in due_events(kind, now):
+            totals['events'] += 1
+            renderer = ReminderRenderer(event, now)
+
+            def build(row, connection, renderer=renderer):
+                return renderer.message(*row, connection)
+
+            with PooledMailer(concurrency, rate, connection_kwargs, settle(kind)) as mailer:
+                for batch in batched(due_registrations(event, kind).iterator(chunk_size=2000), batch_size):
+                    batch = claim(kind, batch)
+                    if batch:
+                        mailer.submit(batch, build)
+                        totals['batches'] += 1
+
+    totals['seconds'] = round(time.monotonic() - started, 2)
+    logger.info("Event reminders: %s", totals)
+    return totals
@@ -17,7 +17,8 @@ class NewsArticleListSerializer(serializers.ModelSerializer):
         model = NewsArticle
         fields = [
             'id', 'title', 'slug', 'excerpt', 'featured_image', 'category_name',
-            'category_color', 'author', 'publish_date', 'views_count', 'tags_list'
+            'category_color', 'author', 'publish_date', 'views_count', 'tags_list',
+            'reading_minutes', 'first_image'
         ]
     
     def get_tags_list(self, obj):
@@ -29,6 +30,7 @@ class NewsArticleDetailSerializer(serializers.ModelSerializer):
     category_color = serializers.CharField(source='category.color', read_only=True)
     tags_list = serializers.SerializerMethodField()
     related_articles = NewsArticleListSerializer(many=True, read_only=True)
+    content = serializers.CharField(source='body_html', read_only=True)
     
     class Meta:
         model = NewsArticle
@@ -36,7 +38,7 @@ class NewsArticleDetailSerializer(serializers.ModelSerializer):
             'id', 'title', 'slug', 'excerpt', 'content', 'featured_image',
             'gallery_images', 'video_url', 'category_name', 'category_color',
             'author', 'publish_date', 'views_count', 'tags_list', 'related_articles',
-            'meta_title', 'meta_description'
+            'meta_title', 'meta_description', 'word_count', 'reading_minutes', 'outline'
         ]
     
     def get_tags_list(self, obj):
@@ -60,6 +62,7 @@ class EventDetailSerializer(serializers.ModelSerializer):
     is_past = serializers.ReadOnlyField()
     is_today = serializers.ReadOnlyField()
     registrations_count = serializers.SerializerMethodField()
+    description = serializers.CharField(source='body_html', read_only=True)
     
     class Meta:
         model = Event
@@ -69,7 +72,7 @@ class EventDetailSerializer(serializers.ModelSerializer):
             'requires_registration', 'registration_deadline', 'max_participants',
             'registration_fee', 'featured_image', 'gallery_images',
             'contact_person', 'contact_email', 'contact_phone', 'status',
-            'is_featured', 'is_past', 'is_today', 'registrations_count'
+            'is_featured', 'is_past', 'is_today', 'registrations_count', 'outline'
         ]
     
     def get_registrations_count(self, obj):
@@ -0,0 +1,91 @@
+"""Minimal local SMTP server that accepts and counts mail without delivering it.
+
+Enough of RFC 5321 for Django's SMTP backend (EHLO/HELO, MAIL, RCPT, DATA,
+RSET, NOOP, QUIT), so newsletter dispatch can be exercised and benchmarked
+without a real mail server.
+"""
+import socketserver
+import threading
+import time
+from collections import Counter
+
+
+class SMTPSinkHandler(socketserver.StreamRequestHandler):
+    disable_nagle_algorithm = True
+
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        self.server.count('connections')
+        self.reply('220 localhost SMTP sink ready')
+        recipients = []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode('utf-8', 'replace').strip()
+            verb = command[:4].upper()
+            if verb == 'EHLO':
+                self.reply('250-localhost')
+                self.reply('250 8BITMIME')
+            elif verb == 'HELO':
+                self.reply('250 localhost')
+            elif verb == 'MAIL':
+                recipients = []
+                self.reply('250 OK')
+            elif verb == 'RCPT':
+                recipients.append(command.partition(':')[2].strip().strip('<>').lower())
+                self.reply('250 OK')
+            elif verb == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                while self.rfile.readline() not in (b'.\r\n', b'.\n', b''):
+                    pass
+                self.server.simulate_latency()
+                self.server.delivered(recipients)
+                recipients = []
+                self.reply('250 OK queued')
+            elif verb == 'RSET':
+                recipients = []
+                self.reply('250 OK')
+            elif verb == 'NOOP':
+                self.reply('250 OK')
+            elif verb == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('502 Command not implemented')
+
+
+class SMTPSinkServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host='127.0.0.1', port=1025, latency_ms=0):
+        super().__init__((host, port), SMTPSinkHandler)
+        self.latency_ms = latency_ms
+        self.lock = threading.Lock()
+        self.stats = {'connections': 0, 'messages': 0}
+        self.recipients = Counter()
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def count(self, stat):
+        with self.lock:
+            self.stats[stat] += 1
+
+    def delivered(self, recipients):
+        with self.lock:
+            self.stats['messages'] += 1
+            self.recipients.update(recipients)
+
+    def simulate_latency(self):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+    def start_in_background(self):
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
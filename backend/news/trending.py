@@ -0,0 +1,109 @@
+"""Trending articles: exponentially decayed view counts.
+
+Views are read from ``NewsArticle.views_count`` by a periodic job rather
+than on each request. Each run folds the new views of the articles that
+were read since the last run into their ``ArticleTrend`` score, decaying
+the old score by the time elapsed (half-life ``HALF_LIFE``), and touches no
+other rows. It then ranks the articles scored within ``WINDOW`` and stores
+each one's position in ``ArticleTrend.rank``. The trending endpoints read
+the ranked ids from that table, through the cache, keyed by the run's
+version so every worker switches to a new ranking together.
+"""
+import time
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Q, Value, When
+from django.utils import timezone
+
+from core.models import CacheMarker
+from .models import ArticleTrend, NewsArticle
+
+HALF_LIFE = timedelta(hours=24)
+WINDOW = timedelta(days=7)
+RANKED_LIMIT = 100
+RANKING_KEY = 'news:trending'
+RANKING_VERSION_KEY = 'news:trending-version'
+RANKING_CACHE_SECONDS = 60 * 60 * 24
+
+
+def decay(score, since, now):
+    return score * 0.5 ** ((now - since).total_seconds() / HALF_LIFE.total_seconds())
+
+
+def fold_new_views(now):
+    """Add views recorded since the last run to the scores; returns the number of articles updated"""
+    rows = NewsArticle.objects.filter(
+        Q(trend__isnull=True) | Q(views_count__gt=F('trend__views_seen'))
+    ).values_list('id', 'views_count', 'publish_date', 'trend__score', 'trend__views_seen', 'trend__scored_at')
+
+    created, updated = [], []
+    for pk, views, published, score, seen, scored_at in rows.iterator():
+        if scored_at is None:
+            # First sighting: only a recent article's views count as fresh, older ones start from zero
+            fresh = views if published >= now - WINDOW else 0
+            created.append(ArticleTrend(article_id=pk, score=fresh, views_seen=views, scored_at=now))
+        else:
+            updated.append(ArticleTrend(
+                article_id=pk, score=decay(score, scored_at, now) + views - seen, views_seen=views, scored_at=now,
+            ))
+    ArticleTrend.objects.bulk_create(created, batch_size=500)
+    ArticleTrend.objects.bulk_update(updated, ['score', 'views_seen', 'scored_at'], batch_size=500)
+    return len(created) + len(updated)
+
+
+def rank(now):
+    """Ids of the top articles by current score, among those read within the window"""
+    candidates = ArticleTrend.objects.filter(
+        scored_at__gte=now - WINDOW, score__gt=0,
+        article__is_published=True, article__is_active=True,
+    ).values_list('article_id', 'score', 'scored_at')
+    scored = sorted(
+        ((decay(score, scored_at, now), pk) for pk, score, scored_at in candidates.iterator()),
+        reverse=True,
+    )
+    return [pk for _, pk in scored[:RANKED_LIMIT]]
+
+
+def store_ranking(ids):
+    """Replace the ranks in ArticleTrend with ids' order and move the ranking version"""
+    with transaction.atomic():
+        ArticleTrend.objects.filter(rank__isnull=False).update(rank=None)
+        ArticleTrend.objects.bulk_update(
+            [ArticleTrend(article_id=pk, rank=position) for position, pk in enumerate(ids)], ['rank']
+        )
+        CacheMarker.write(RANKING_VERSION_KEY, time.time_ns())
+
+
+def update():
+    """One run of the trending job; returns (articles rescored, articles ranked)"""
+    now = timezone.now()
+    rescored = fold_new_views(now)
+    ranked = rank(now)
+    store_ranking(ranked)
+    return rescored, len(ranked)
+
+
+def ranking():
+    """(version, ranked article ids) from the last job run; the version changes with every run"""
+    version = CacheMarker.read(RANKING_VERSION_KEY, 0)
+    key = f"{RANKING_KEY}:{version}"
+    ids = cache.get(key)
+    if ids is None:
+        ids = list(
+            ArticleTrend.objects.filter(rank__isnull=False).order_by('rank').values_list('article_id', flat=True)
+        )
+        cache.set(key, ids, RANKING_CACHE_SECONDS)
+    return version, ids
+
+
+def order_by_trending(queryset, ids):
+    """Trending articles first in rank order, then the rest by recency"""
+    if not ids:
+        return queryset.order_by('-publish_date')
+    return queryset.order_by(
+        Case(*(When(pk=pk, then=Value(position)) for position, pk in enumerate(ids)),
+             default=Value(len(ids)), output_field=IntegerField()),
+        '-publish_date',
+    )
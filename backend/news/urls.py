@@ -1,20 +1,30 @@
 from django.urls import path
 from .views import (
-    NewsCategoriesListView, NewsArticlesListView, FeaturedNewsListView,
+    NewsCategoriesListView, NewsArticlesListView, FeaturedNewsListView, TrendingNewsListView,
     NewsArticleDetailView, EventsListView, UpcomingEventsListView,
     EventDetailView, EventRegistrationCreateView, NewsletterSubscribeView,
-    news_overview
+    news_overview, news_feed, events_calendar, event_calendar, newsletter_unsubscribe,
+    event_checkin_roster, event_checkin_sync
 )
 
 urlpatterns = [
     path('categories/', NewsCategoriesListView.as_view(), name='news-categories'),
     path('articles/', NewsArticlesListView.as_view(), name='news-articles'),
     path('articles/featured/', FeaturedNewsListView.as_view(), name='featured-news'),
+    path('articles/trending/', TrendingNewsListView.as_view(), name='trending-news'),
     path('articles/<slug:slug>/', NewsArticleDetailView.as_view(), name='news-article-detail'),
     path('events/', EventsListView.as_view(), name='events-list'),
+    path('events/calendar.ics', events_calendar, name='events-calendar'),
+    path('events/calendar/<slug:event_type>.ics', events_calendar, name='events-type-calendar'),
     path('events/upcoming/', UpcomingEventsListView.as_view(), name='upcoming-events'),
     path('events/<slug:slug>/', EventDetailView.as_view(), name='event-detail'),
+    path('events/<slug:slug>/calendar.ics', event_calendar, name='event-calendar'),
+    path('events/<slug:slug>/check-in/roster/', event_checkin_roster, name='event-checkin-roster'),
+    path('events/<slug:slug>/check-in/sync/', event_checkin_sync, name='event-checkin-sync'),
     path('events/register/', EventRegistrationCreateView.as_view(), name='event-registration'),
     path('newsletter/subscribe/', NewsletterSubscribeView.as_view(), name='newsletter-subscribe'),
+    path('newsletter/unsubscribe/', newsletter_unsubscribe, name='newsletter-unsubscribe'),
     path('overview/', news_overview, name='news-overview'),
+    path('feeds/<str:feed_format>/', news_feed, name='news-feed'),
+    path('feeds/categories/<slug:category_slug>/<str:feed_format>/', news_feed, name='news-category-feed'),
 ]
\ No newline at end of file
@@ -1,10 +1,24 @@
+import hashlib
+
 from rest_framework import generics, status
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAdminUser
 from rest_framework.authentication import SessionAuthentication, BasicAuthentication
 from rest_framework.response import Response
-from django.shortcuts import get_object_or_404
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.db.models import F
+from django.http import Http404, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, render
 from django.utils import timezone
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_http_methods
+from core import segments
+from core.views import GeoFilterMixin, VisitorSketchMixin
+from core.timewindows import WINDOWS
+from . import checkin, feeds, ical, newsletter, publishing, trending
 from .models import NewsCategory, NewsArticle, Event, EventRegistration, Newsletter
 from .serializers import (
     NewsCategorySerializer, NewsArticleListSerializer, NewsArticleDetailSerializer,
@@ -12,6 +26,10 @@ from .serializers import (
     NewsletterSerializer
 )
 
+ARTICLE_LIST_CACHE_SECONDS = 60 * 5
+TRENDING_DEFAULT_LIMIT = 10
+TRENDING_MAX_LIMIT = 50
+
 
 class NewsCategoriesListView(generics.ListAPIView):
     """List all active news categories"""
@@ -22,56 +40,111 @@ class NewsCategoriesListView(generics.ListAPIView):
 class NewsArticlesListView(generics.ListAPIView):
     """List all published news articles"""
     serializer_class = NewsArticleListSerializer
-    queryset = NewsArticle.objects.filter(is_published=True, is_active=True)
-    
+
     def get_queryset(self):
-        queryset = super().get_queryset()
+        queryset = publishing.published_articles().select_related('category').defer(
+            *NewsArticle.LIST_DEFERRED_FIELDS
+        )
         category = self.request.query_params.get('category', None)
         if category:
             queryset = queryset.filter(category__slug=category)
+        if self.request.query_params.get('ordering') == 'trending':
+            queryset = trending.order_by_trending(queryset, self.trending_ids)
         return queryset
 
+    def list(self, request, *args, **kwargs):
+        # Pages only change with an article write or a scheduled release, both of which move the version;
+        # trending pages also change with each run of the trending job
+        version = NewsArticle.cache_version()
+        if request.query_params.get('ordering') == 'trending':
+            trending_version, self.trending_ids = trending.ranking()
+            version = f"{version}:{trending_version}"
+        key = "news-articles:{}:{}".format(version, hashlib.md5(request.build_absolute_uri().encode()).hexdigest())
+        data = cache.get(key)
+        if data is None:
+            data = super().list(request, *args, **kwargs).data
+            cache.set(key, data, ARTICLE_LIST_CACHE_SECONDS)
+        return Response(data)
+
 
 class FeaturedNewsListView(generics.ListAPIView):
     """List featured news articles"""
     serializer_class = NewsArticleListSerializer
-    queryset = NewsArticle.objects.filter(
-        is_published=True, is_active=True, is_featured=True
-    )[:5]
 
+    def get_queryset(self):
+        return publishing.published_articles().filter(is_featured=True).select_related('category').defer(
+            *NewsArticle.LIST_DEFERRED_FIELDS
+        )[:5]
+
+
+class TrendingNewsListView(generics.ListAPIView):
+    """Most read articles of the past week, as ranked by the last update_trending run"""
+    serializer_class = NewsArticleListSerializer
+    pagination_class = None
+
+    def get_queryset(self):
+        try:
+            limit = min(int(self.request.query_params.get('limit', TRENDING_DEFAULT_LIMIT)), TRENDING_MAX_LIMIT)
+        except ValueError:
+            limit = TRENDING_DEFAULT_LIMIT
+        ids = self.trending_ids[:max(limit, 0)]
+        articles = publishing.published_articles().filter(id__in=ids).select_related('category').defer(
+            *NewsArticle.LIST_DEFERRED_FIELDS
+        ).in_bulk()
+        # Articles unpublished since the last run simply drop out
+        return [articles[pk] for pk in ids if pk in articles]
+
+    def list(self, request, *args, **kwargs):
+        trending_version, self.trending_ids = trending.ranking()
+        key = "news-trending:{}:{}:{}".format(
+            NewsArticle.cache_version(), trending_version, request.query_params.get('limit', '')
+        )
+        data = cache.get(key)
+        if data is None:
+            data = super().list(request, *args, **kwargs).data
+            cache.set(key, data, ARTICLE_LIST_CACHE_SECONDS)
+        return Response(data)
 
-class NewsArticleDetailView(generics.RetrieveAPIView):
+
+class NewsArticleDetailView(VisitorSketchMixin, generics.RetrieveAPIView):
     """Get news article details by slug"""
+    visitor_source = 'articles'
     serializer_class = NewsArticleDetailSerializer
     lookup_field = 'slug'
-    queryset = NewsArticle.objects.filter(is_published=True, is_active=True)
-    
+
+    def get_queryset(self):
+        return publishing.published_articles()
+
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
-        # Increment view count
+        # Increment view count without a save(), which would retire every cached article list
+        NewsArticle.objects.filter(pk=instance.pk).update(views_count=F('views_count') + 1)
         instance.views_count += 1
-        instance.save(update_fields=['views_count'])
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
 
 
-class EventsListView(generics.ListAPIView):
+class EventsListView(GeoFilterMixin, generics.ListAPIView):
     """List all active events"""
     serializer_class = EventListSerializer
-    queryset = Event.objects.filter(is_active=True)
-    
+
     def get_queryset(self):
-        queryset = super().get_queryset()
+        queryset = publishing.published_events().defer(*Event.LIST_DEFERRED_FIELDS)
         event_type = self.request.query_params.get('type', None)
         status_filter = self.request.query_params.get('status', None)
         
+        window = self.request.query_params.get('window', None)
+        
         if event_type:
             queryset = queryset.filter(event_type=event_type)
         
-        if status_filter == 'upcoming':
-            queryset = queryset.filter(start_date__gte=timezone.now())
-        elif status_filter == 'past':
-            queryset = queryset.filter(end_date__lt=timezone.now())
+        if status_filter == 'past':
+            # Older clients ask for past events; those are the completed ones
+            status_filter = 'completed'
+        if status_filter in dict(Event.EVENT_STATUS):
+            queryset = queryset.filter(status=status_filter)
+        if window in WINDOWS:
+            queryset = Event.TIME_WINDOWS.filter(queryset, window)
         
         return queryset
 
@@ -79,17 +152,29 @@ class EventsListView(generics.ListAPIView):
 class UpcomingEventsListView(generics.ListAPIView):
     """List upcoming events"""
     serializer_class = EventListSerializer
-    queryset = Event.objects.filter(
-        is_active=True, 
-        start_date__gte=timezone.now()
-    ).order_by('start_date')[:5]
 
+    def get_queryset(self):
+        events = publishing.published_events().defer(*Event.LIST_DEFERRED_FIELDS)
+        return Event.TIME_WINDOWS.filter(events, 'upcoming').order_by('start_date')[:5]
+
+    def list(self, request, *args, **kwargs):
+        # Image URLs are absolute, so each host (and query) gets its own entry
+        name = "upcoming-events:{}".format(hashlib.md5(request.build_absolute_uri().encode()).hexdigest())
+        data = Event.TIME_WINDOWS.cached(
+            name, lambda: super(UpcomingEventsListView, self).list(request, *args, **kwargs).data,
+            Event.cache_version(),
+        )
+        return Response(data)
 
-class EventDetailView(generics.RetrieveAPIView):
+
+class EventDetailView(VisitorSketchMixin, generics.RetrieveAPIView):
     """Get event details by slug"""
+    visitor_source = 'events'
     serializer_class = EventDetailSerializer
     lookup_field = 'slug'
-    queryset = Event.objects.filter(is_active=True)
+
+    def get_queryset(self):
+        return publishing.published_events()
 
 class EventRegistrationCreateView(generics.CreateAPIView):
     serializer_class = EventRegistrationSerializer
@@ -104,7 +189,7 @@ class EventRegistrationCreateView(generics.CreateAPIView):
 
 
         try:
-            event = Event.objects.get(slug=event_slug, is_active=True)
+            event = publishing.published_events().get(slug=event_slug)
         except Event.DoesNotExist:
             return Response({"error": "Event not found"}, status=status.HTTP_404_NOT_FOUND)
         
@@ -121,11 +206,35 @@ class EventRegistrationCreateView(generics.CreateAPIView):
         # Save registration with linked event
         registration = serializer.save(event=event)
         return Response(
-            {"message": f"Successfully registered for {event.title}!", "id": registration.id},
+            {
+                "message": f"Successfully registered for {event.title}!",
+                "id": registration.id,
+                "check_in_code": checkin.check_in_code(registration.id, event.id),
+            },
             status=status.HTTP_201_CREATED
         )       
   
 
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def event_checkin_roster(request, slug):
+    """Roster for offline check-in: every live registration with a hash of its check-in code"""
+    event = get_object_or_404(Event, slug=slug)
+    return Response(checkin.roster(event))
+
+
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def event_checkin_sync(request, slug):
+    """Apply a batch of offline scans: {"device": ..., "scans": [{"id", "status", "scanned_at"}, ...]}"""
+    event = get_object_or_404(Event, slug=slug)
+    try:
+        result = checkin.sync(event, request.data.get('scans'), str(request.data.get('device', '')))
+    except ValueError as exc:
+        return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(result)
+
+
 class NewsletterSubscribeView(generics.CreateAPIView):
     """Subscribe to newsletter"""
     serializer_class = NewsletterSerializer
@@ -152,27 +261,61 @@ class NewsletterSubscribeView(generics.CreateAPIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+@csrf_exempt
+@require_http_methods(['GET', 'POST'])
+def newsletter_unsubscribe(request):
+    """Unsubscribe through the signed link in every newsletter.
+
+    GET only shows a confirmation page, since mail scanners and link previews
+    follow links; the change is made by the page's POST or by a mail client's
+    RFC 8058 one-click POST to the List-Unsubscribe URL.
+    """
+    token = request.GET.get('token') or request.POST.get('token') or ''
+    context = {'token': token, 'site_url': settings.FRONTEND_URL}
+    try:
+        context['email'] = signing.loads(token, salt=newsletter.UNSUBSCRIBE_SALT)
+    except signing.BadSignature:
+        context['state'] = 'invalid'
+        return render(request, 'news/newsletter/unsubscribe.html', context, status=400)
+
+    if request.method == 'GET':
+        context['state'] = 'confirm'
+        return render(request, 'news/newsletter/unsubscribe.html', context)
+
+    now = timezone.now()
+    if Newsletter.objects.filter(email=context['email'], is_subscribed=True).update(
+        is_subscribed=False, unsubscribed_at=now, updated_at=now
+    ):
+        segments.invalidate('newsletter')
+    context['state'] = 'done'
+    return render(request, 'news/newsletter/unsubscribe.html', context)
+
+
 @api_view(['GET'])
 def news_overview(request):
     """Get overview data for news page"""
     try:
-        featured_article = NewsArticle.objects.filter(
-            is_published=True, is_active=True, is_featured=True
-        ).first()
+        featured_article = publishing.published_articles().filter(is_featured=True).first()
         
-        recent_articles = NewsArticle.objects.filter(
-            is_published=True, is_active=True
-        ).exclude(id=featured_article.id if featured_article else None)[:6]
+        recent_articles = publishing.published_articles().exclude(
+            id=featured_article.id if featured_article else None
+        ).select_related('category').defer(*NewsArticle.LIST_DEFERRED_FIELDS)[:6]
         
-        upcoming_events = Event.objects.filter(
-            is_active=True, 
-            start_date__gte=timezone.now()
-        ).order_by('start_date')[:3]
+        upcoming_events = Event.TIME_WINDOWS.cached(
+            'overview-events',
+            lambda: EventListSerializer(
+                Event.TIME_WINDOWS.filter(
+                    publishing.published_events().defer(*Event.LIST_DEFERRED_FIELDS), 'upcoming'
+                ).order_by('start_date')[:3],
+                many=True,
+            ).data,
+            Event.cache_version(),
+        )
         
         data = {
             'featured_article': NewsArticleDetailSerializer(featured_article).data if featured_article else None,
             'recent_articles': NewsArticleListSerializer(recent_articles, many=True).data,
-            'upcoming_events': EventListSerializer(upcoming_events, many=True).data,
+            'upcoming_events': upcoming_events,
         }
         
         return Response(data, status=status.HTTP_200_OK)
@@ -180,4 +323,83 @@ def news_overview(request):
         return Response(
             {'error': 'Failed to fetch news overview'}, 
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
-        )
\ No newline at end of file
+        )
+
+
+@require_GET
+def news_feed(request, feed_format, category_slug=None):
+    """RSS, Atom or JSON Feed of published articles, site-wide or for one category"""
+    if feed_format not in feeds.FEED_CONTENT_TYPES:
+        raise Http404("Unknown feed format")
+
+    category = None
+    if category_slug:
+        category = get_object_or_404(NewsCategory, slug=category_slug, is_active=True)
+    articles = feeds.visible_articles(category)
+    last_modified, count = feeds.feed_state(articles, category)
+
+    if last_modified:
+        since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+        if since is not None and int(last_modified.timestamp()) <= since:
+            response = HttpResponseNotModified()
+            response['Last-Modified'] = http_date(last_modified.timestamp())
+            return response
+
+    key = feeds.cache_key(feed_format, category_slug or 'site', last_modified, count)
+    body = cache.get(key)
+    if body is not None:
+        response = HttpResponse(body, content_type=feeds.FEED_CONTENT_TYPES[feed_format])
+    else:
+        meta = {
+            'title': f"KEEFA News - {category.name}" if category else "KEEFA News",
+            'link': feeds.news_page(),
+            'description': (category.description or f"{category.name} news from KEEFA") if category
+            else "News and updates from KEEFA",
+            'feed_url': feeds.feed_url(request),
+        }
+        response = StreamingHttpResponse(
+            feeds.render_feed(feed_format, meta, articles, last_modified, key),
+            content_type=feeds.FEED_CONTENT_TYPES[feed_format],
+        )
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    response['Cache-Control'] = 'public, max-age=300'
+    return response
+
+
+def calendar_response(request, etag, body, filename):
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH', '')
+    if if_none_match.strip() == '*' or etag in [tag.strip() for tag in if_none_match.split(',')]:
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(body, content_type=ical.CALENDAR_CONTENT_TYPE)
+        response['Content-Disposition'] = f'inline; filename="{filename}"'
+    response['ETag'] = etag
+    response['Cache-Control'] = 'public, max-age=300'
+    return response
+
+
+@require_GET
+def events_calendar(request, event_type=None):
+    """iCalendar feed of all active events, or of one event type"""
+    events = publishing.published_events()
+    name = "KEEFA Events"
+    if event_type is not None:
+        if event_type not in dict(Event.EVENT_TYPES):
+            raise Http404("Unknown event type")
+        events = events.filter(event_type=event_type)
+        name = f"KEEFA Events - {dict(Event.EVENT_TYPES)[event_type]}"
+
+    etag, body, _ = ical.calendar(f"type:{event_type or 'all'}", name, events)
+    return calendar_response(request, etag, body, f"keefa-{event_type or 'events'}.ics")
+
+
+@require_GET
+def event_calendar(request, slug):
+    """iCalendar file for a single event"""
+    etag, body, count = ical.calendar(
+        f"event:{slug}", "KEEFA Events", publishing.published_events().filter(slug=slug)
+    )
+    if not count:
+        raise Http404("Event not found")
+    return calendar_response(request, etag, body, f"{slug}.ics")
@@ -0,0 +1,140 @@
+"""GeoJSON for the impact map, clustered on the server per zoom level.
+
+All active project locations are read once per change (one ``values_list``
+query), projected once, and grouped into screen-space grid clusters for
+every zoom level in the same pass. Each zoom's FeatureCollection is cached
+as encoded bytes under the ProjectLocation cache version, so a map view at
+any zoom is one cache lookup however many locations there are.
+"""
+import hashlib
+import json
+
+from django.core.cache import cache
+
+from core.geo import bbox_q, grid_clusters, project
+from .models import ProjectLocation
+
+MIN_ZOOM = 0
+MAX_ZOOM = 18
+# From this zoom on every location is shown on its own
+MAX_CLUSTER_ZOOM = 14
+CLUSTER_CELL_PX = 60
+LAYER_CACHE_SECONDS = 60 * 60 * 24
+GEOJSON_CONTENT_TYPE = 'application/geo+json'
+
+
+def layer_key(version, zoom):
+    return f"project-map:{version}:{zoom}"
+
+
+def location_points(locations=None):
+    """(latitude, longitude, point feature) for every active location"""
+    locations = ProjectLocation.objects.filter(is_active=True) if locations is None else locations
+    return [
+        (float(latitude), float(longitude), point_feature(pk, name, county, status, beneficiaries, project_types,
+                                                          float(latitude), float(longitude)))
+        for pk, name, county, status, beneficiaries, project_types, latitude, longitude
+        in locations.order_by('id').values_list(
+            'id', 'name', 'county', 'status', 'beneficiaries_count', 'project_types', 'latitude', 'longitude'
+        ).iterator()
+    ]
+
+
+def point_feature(pk, name, county, status, beneficiaries, project_types, latitude, longitude):
+    return {
+        'type': 'Feature',
+        'id': pk,
+        'geometry': {'type': 'Point', 'coordinates': [round(longitude, 6), round(latitude, 6)]},
+        'properties': {
+            'name': name,
+            'county': county,
+            'status': status,
+            'beneficiaries_count': beneficiaries,
+            'project_types': [kind.strip() for kind in project_types.split(',') if kind.strip()],
+        },
+    }
+
+
+def cluster_feature(latitude, longitude, members, expansion_zoom):
+    return {
+        'type': 'Feature',
+        'geometry': {'type': 'Point', 'coordinates': [round(longitude, 6), round(latitude, 6)]},
+        'properties': {
+            'cluster': True,
+            'point_count': len(members),
+            'beneficiaries_count': sum(member[2]['properties']['beneficiaries_count'] for member in members),
+            'expansion_zoom': expansion_zoom,
+        },
+    }
+
+
+def encode(features):
+    return json.dumps({'type': 'FeatureCollection', 'features': features}, separators=(',', ':')).encode()
+
+
+def encoded_layer(features):
+    body = encode(features)
+    return f'"{hashlib.md5(body).hexdigest()}"', body
+
+
+def expansion_zoom(members, zoom, group_sizes):
+    """First zoom at which a cluster's members stop sharing one grid cell.
+
+    Each zoom's cells split the previous zoom's in four, so the cluster has
+    split once the group holding any one of its members is smaller.
+    """
+    pk = members[0][2]['id']
+    for next_zoom in range(zoom + 1, MAX_CLUSTER_ZOOM):
+        if group_sizes[next_zoom][pk] < len(members):
+            return next_zoom
+    return MAX_CLUSTER_ZOOM
+
+
+def build_layers(version):
+    """Cluster, encode and cache every zoom level; returns {zoom: (etag, body)}"""
+    points = location_points()
+    projected = project(points)
+    groupings = {zoom: grid_clusters(projected, zoom, CLUSTER_CELL_PX) for zoom in range(MIN_ZOOM, MAX_CLUSTER_ZOOM)}
+    # Per zoom, the size of the group each location falls in
+    group_sizes = {
+        zoom: {member[2]['id']: len(members) for _, _, members in groups for member in members}
+        for zoom, groups in groupings.items()
+    }
+    layers = {}
+    for zoom, groups in groupings.items():
+        layers[zoom] = encoded_layer([
+            members[0][2] if len(members) == 1 else cluster_feature(
+                latitude, longitude, members, expansion_zoom(members, zoom, group_sizes)
+            )
+            for latitude, longitude, members in groups
+        ])
+    # From MAX_CLUSTER_ZOOM on every zoom shows the same unclustered points
+    unclustered = encoded_layer([point[2] for point in points])
+    for zoom in range(MAX_CLUSTER_ZOOM, MAX_ZOOM + 1):
+        layers[zoom] = unclustered
+    cache.set_many({layer_key(version, zoom): value for zoom, value in layers.items()}, LAYER_CACHE_SECONDS)
+    return layers
+
+
+def map_layer(zoom):
+    """(etag, body) of the map at ``zoom``"""
+    version = ProjectLocation.cache_version()
+    cached = cache.get(layer_key(version, zoom))
+    if cached is None:
+        cached = build_layers(version)[zoom]
+    return cached
+
+
+def map_window(zoom, bbox):
+    """Features of the map at ``zoom`` inside a bounding box"""
+    if zoom >= MAX_CLUSTER_ZOOM:
+        # Unclustered: read just the window through the geohash index
+        locations = ProjectLocation.objects.filter(is_active=True).filter(bbox_q(*bbox))
+        return [point[2] for point in location_points(locations)]
+    _, body = map_layer(zoom)
+    return [feature for feature in json.loads(body)['features'] if in_bbox(feature, *bbox)]
+
+
+def in_bbox(feature, min_lat, min_lon, max_lat, max_lon):
+    longitude, latitude = feature['geometry']['coordinates']
+    return min_lat <= latitude <= max_lat and min_lon <= longitude <= max_lon
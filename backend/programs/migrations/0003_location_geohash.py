@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-19 13:57
+
+from django.db import migrations, models
+
+from core.geo import encode_geohash
+
+
+def backfill_geohash(apps, schema_editor):
+    """Geohash the coordinates of existing project locations"""
+    ProjectLocation = apps.get_model('programs', 'ProjectLocation')
+    located = ProjectLocation.objects.filter(latitude__isnull=False, longitude__isnull=False)
+    rows = []
+    for row in located.only('id', 'latitude', 'longitude').iterator():
+        row.geohash = encode_geohash(row.latitude, row.longitude)
+        rows.append(row)
+    ProjectLocation.objects.bulk_update(rows, ['geohash'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('programs', '0002_alter_program_application_process_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='projectlocation',
+            name='geohash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=12),
+        ),
+        migrations.AddIndex(
+            model_name='projectlocation',
+            index=models.Index(fields=['geohash'], name='project_location_geohash_idx'),
+        ),
+        migrations.RunPython(backfill_geohash, migrations.RunPython.noop),
+    ]
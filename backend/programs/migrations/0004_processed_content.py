@@ -0,0 +1,82 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:07
+
+from django.db import migrations, models
+
+from core.content import backfill
+
+
+def process_existing_content(apps, schema_editor):
+    """Derive the stored content columns of existing programs and success stories"""
+    backfill(apps.get_model('programs', 'Program'), 'full_description')
+    backfill(apps.get_model('programs', 'SuccessStory'), 'story')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('programs', '0003_location_geohash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='program',
+            name='body_html',
+            field=models.TextField(blank=True, default='', editable=False, help_text='Sanitized HTML'),
+        ),
+        migrations.AddField(
+            model_name='program',
+            name='body_text',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='program',
+            name='first_image',
+            field=models.CharField(blank=True, default='', editable=False, max_length=500),
+        ),
+        migrations.AddField(
+            model_name='program',
+            name='outline',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.AddField(
+            model_name='program',
+            name='reading_minutes',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='program',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='successstory',
+            name='body_html',
+            field=models.TextField(blank=True, default='', editable=False, help_text='Sanitized HTML'),
+        ),
+        migrations.AddField(
+            model_name='successstory',
+            name='body_text',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='successstory',
+            name='first_image',
+            field=models.CharField(blank=True, default='', editable=False, max_length=500),
+        ),
+        migrations.AddField(
+            model_name='successstory',
+            name='outline',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.AddField(
+            model_name='successstory',
+            name='reading_minutes',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='successstory',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(process_existing_content, migrations.RunPython.noop),
+    ]
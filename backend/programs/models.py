@@ -1,11 +1,23 @@
+from datetime import timedelta
 from django.db import models
 from django.utils import timezone
 from django_ckeditor_5.fields import CKEditor5Field
-from core.models import BaseModel
+from core.models import BaseModel, CacheVersionMixin, GeohashModel, ProcessedContentModel
+from core.timewindows import TimeWindows
 
 
-class Program(BaseModel):
+class Program(CacheVersionMixin, ProcessedContentModel, BaseModel):
     """Main programs offered by the organization"""
+    CACHE_VERSION_KEY = 'programs:program-version'
+    CONTENT_FIELD = 'full_description'
+    # Large text columns that list endpoints never read
+    LIST_DEFERRED_FIELDS = (
+        'full_description', 'body_html', 'body_text', 'outline',
+        'eligibility_criteria', 'application_process', 'requirements',
+    )
+    # Windows over the application period: ongoing (open), ending_soon, past (closed)
+    TIME_WINDOWS = TimeWindows(end='application_deadline', dates=True, soon=timedelta(days=14))
+
     PROGRAM_TYPES = [
         ('scholarship', 'Scholarship Program'),
         ('workshop', 'Workshop & Mentorship'),
@@ -192,8 +204,10 @@ class WorkshopRegistration(BaseModel):
         return f"{self.first_name} {self.last_name}"
 
 
-class ProjectLocation(BaseModel):
+class ProjectLocation(CacheVersionMixin, GeohashModel, BaseModel):
     """Community project locations"""
+    CACHE_VERSION_KEY = 'programs:location-version'
+
     name = models.CharField(max_length=200)
     county = models.CharField(max_length=100)
     sub_county = models.CharField(max_length=100)
@@ -225,13 +239,24 @@ class ProjectLocation(BaseModel):
         ordering = ['county', 'name']
         verbose_name = "Project Location"
         verbose_name_plural = "Project Locations"
+        indexes = [
+            models.Index(fields=['geohash'], name='project_location_geohash_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name}, {self.county}"
 
 
-class SuccessStory(BaseModel):
+class SuccessStory(CacheVersionMixin, ProcessedContentModel, BaseModel):
     """Detailed success stories from beneficiaries"""
+    CACHE_VERSION_KEY = 'programs:story-version'
+    CONTENT_FIELD = 'story'
+    # What list rows read: the program's name but none of the story's or the program's rich text
+    LIST_FIELDS = (
+        'id', 'name', 'title', 'profile_image', 'location', 'current_status', 'publish_date',
+        'reading_minutes', 'first_image', 'program__name',
+    )
+
     name = models.CharField(max_length=100)
     program = models.ForeignKey(Program, on_delete=models.CASCADE, related_name='success_stories')
     title = models.CharField(max_length=200)
@@ -6,17 +6,33 @@ from .models import (
 
 
 class ProgramSerializer(serializers.ModelSerializer):
+    full_description = serializers.CharField(source='body_html', read_only=True)
+
     class Meta:
         model = Program
         fields = [
             'id', 'name', 'slug', 'program_type', 'short_description', 
             'full_description', 'image', 'icon', 'color', 'beneficiaries_count', 
-            'success_rate', 'is_accepting_applications', 'application_deadline'
+            'success_rate', 'is_accepting_applications', 'application_deadline',
+            'reading_minutes'
+        ]
+
+
+class ProgramListSerializer(serializers.ModelSerializer):
+    """Programs without their rich HTML, for lists"""
+    class Meta:
+        model = Program
+        fields = [
+            'id', 'name', 'slug', 'program_type', 'short_description',
+            'image', 'icon', 'color', 'beneficiaries_count',
+            'success_rate', 'is_accepting_applications', 'application_deadline',
+            'reading_minutes'
         ]
 
 
 class ProgramDetailSerializer(serializers.ModelSerializer):
     success_stories = serializers.SerializerMethodField()
+    full_description = serializers.CharField(source='body_html', read_only=True)
     
     class Meta:
         model = Program
@@ -25,7 +41,7 @@ class ProgramDetailSerializer(serializers.ModelSerializer):
             'full_description', 'image', 'icon', 'color', 'beneficiaries_count', 
             'success_rate', 'eligibility_criteria', 'application_process', 
             'requirements', 'is_accepting_applications', 'application_deadline',
-            'success_stories'
+            'success_stories', 'reading_minutes', 'outline'
         ]
     
     def get_success_stories(self, obj):
@@ -69,13 +85,15 @@ class ProjectLocationSerializer(serializers.ModelSerializer):
 
 class SuccessStorySerializer(serializers.ModelSerializer):
     program_name = serializers.CharField(source='program.name', read_only=True)
+    story = serializers.CharField(source='body_html', read_only=True)
     
     class Meta:
         model = SuccessStory
         fields = [
             'id', 'name', 'program_name', 'title', 'story', 'profile_image',
             'before_image', 'after_image', 'video_url', 'age', 'location',
-            'current_status', 'achievements', 'impact_metrics', 'publish_date'
+            'current_status', 'achievements', 'impact_metrics', 'publish_date',
+            'reading_minutes', 'outline'
         ]
 
 
@@ -86,5 +104,5 @@ class SuccessStoryListSerializer(serializers.ModelSerializer):
         model = SuccessStory
         fields = [
             'id', 'name', 'program_name', 'title', 'profile_image',
-            'location', 'current_status', 'publish_date'
+            'location', 'current_status', 'publish_date', 'reading_minutes', 'first_image'
         ]
\ No newline at end of file
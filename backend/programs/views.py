@@ -1,23 +1,43 @@
 from rest_framework import generics, status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
+from django.http import HttpResponse, HttpResponseBadRequest, HttpResponseNotModified
 from django.shortcuts import get_object_or_404
+from django.views.decorators.http import require_GET
+from core import geo
+from core.timewindows import WINDOWS
+from core.views import GeoFilterMixin
+from . import mapping
 from .models import (
     Program, ScholarshipApplication, WorkshopRegistration, 
     ProjectLocation, SuccessStory
 )
 from .serializers import (
-    ProgramSerializer, ProgramDetailSerializer, ScholarshipApplicationSerializer,
+    ProgramSerializer, ProgramListSerializer, ProgramDetailSerializer, ScholarshipApplicationSerializer,
     WorkshopRegistrationSerializer, ProjectLocationSerializer, 
     SuccessStorySerializer, SuccessStoryListSerializer
 )
 
 
 class ProgramsListView(generics.ListAPIView):
-    """List all active programs"""
-    serializer_class = ProgramSerializer
+    """List all active programs; ?include=description adds each program's sanitized HTML description"""
     queryset = Program.objects.filter(is_active=True)
 
+    def with_description(self):
+        return self.request.query_params.get('include') == 'description'
+
+    def get_serializer_class(self):
+        return ProgramSerializer if self.with_description() else ProgramListSerializer
+
+    def get_queryset(self):
+        deferred = set(Program.LIST_DEFERRED_FIELDS) - ({'body_html'} if self.with_description() else set())
+        queryset = super().get_queryset().defer(*deferred)
+        # ?window=ongoing|ending_soon|past filters on the application deadline
+        window = self.request.query_params.get('window', None)
+        if window in WINDOWS and window != 'upcoming':
+            queryset = Program.TIME_WINDOWS.filter(queryset, window)
+        return queryset
+
 
 class ProgramDetailView(generics.RetrieveAPIView):
     """Get program details by slug"""
@@ -64,16 +84,41 @@ class WorkshopRegistrationCreateView(generics.CreateAPIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class ProjectLocationsListView(generics.ListAPIView):
+class ProjectLocationsListView(GeoFilterMixin, generics.ListAPIView):
     """List all active project locations"""
     serializer_class = ProjectLocationSerializer
     queryset = ProjectLocation.objects.filter(is_active=True)
 
 
+@require_GET
+def project_locations_geojson(request):
+    """Clustered GeoJSON of project locations for the map at ?zoom=, optionally limited to ?bbox="""
+    try:
+        zoom = int(request.GET.get('zoom', mapping.MIN_ZOOM))
+        bbox = geo.parse_bbox(request.GET['bbox']) if request.GET.get('bbox') else None
+    except ValueError:
+        return HttpResponseBadRequest("zoom must be a whole number and bbox 'min_lng,min_lat,max_lng,max_lat'")
+    zoom = max(mapping.MIN_ZOOM, min(mapping.MAX_ZOOM, zoom))
+
+    if bbox is None:
+        etag, body = mapping.map_layer(zoom)
+        if etag in [tag.strip() for tag in request.META.get('HTTP_IF_NONE_MATCH', '').split(',')]:
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(body, content_type=mapping.GEOJSON_CONTENT_TYPE)
+        response['ETag'] = etag
+    else:
+        response = HttpResponse(
+            mapping.encode(mapping.map_window(zoom, bbox)), content_type=mapping.GEOJSON_CONTENT_TYPE
+        )
+    response['Cache-Control'] = 'public, max-age=300'
+    return response
+
+
 class SuccessStoriesListView(generics.ListAPIView):
     """List all active success stories"""
     serializer_class = SuccessStoryListSerializer
-    queryset = SuccessStory.objects.filter(is_active=True)
+    queryset = SuccessStory.objects.filter(is_active=True).select_related('program').only(*SuccessStory.LIST_FIELDS)
 
 
 class SuccessStoryDetailView(generics.RetrieveAPIView):
@@ -85,18 +130,23 @@ class SuccessStoryDetailView(generics.RetrieveAPIView):
 class FeaturedSuccessStoriesListView(generics.ListAPIView):
     """List featured success stories"""
     serializer_class = SuccessStorySerializer
-    queryset = SuccessStory.objects.filter(is_active=True, is_featured=True)
+    # Featured stories are shown in full, from the sanitized HTML
+    queryset = SuccessStory.objects.filter(is_active=True, is_featured=True).select_related('program').defer(
+        'story', 'body_text', *(f"program__{field}" for field in Program.LIST_DEFERRED_FIELDS)
+    )
 
 
 @api_view(['GET'])
 def programs_overview(request):
     """Get overview data for programs page"""
     try:
-        programs = Program.objects.filter(is_active=True)
-        featured_stories = SuccessStory.objects.filter(is_active=True, is_featured=True)[:6]
+        programs = Program.objects.filter(is_active=True).defer(*Program.LIST_DEFERRED_FIELDS)
+        featured_stories = SuccessStory.objects.filter(is_active=True, is_featured=True).select_related(
+            'program'
+        ).only(*SuccessStory.LIST_FIELDS)[:6]
         
         data = {
-            'programs': ProgramSerializer(programs, many=True).data,
+            'programs': ProgramListSerializer(programs, many=True).data,
             'featured_stories': SuccessStoryListSerializer(featured_stories, many=True).data,
         }
         
@@ -112,7 +162,9 @@ def programs_overview(request):
 def impact_data(request):
     """Get impact data for impact page"""
     try:
-        success_stories = SuccessStory.objects.filter(is_active=True)
+        success_stories = SuccessStory.objects.filter(is_active=True).select_related('program').defer(
+            'story', 'body_text', *(f"program__{field}" for field in Program.LIST_DEFERRED_FIELDS)
+        )
         project_locations = ProjectLocation.objects.filter(is_active=True)
         
         # Calculate impact metrics
@@ -89,10 +89,12 @@ def user_dashboard(request):
     }
     
     if user.user_type == 'donor':
-        from donations.models import Donation
-        donations = Donation.objects.filter(donor_email=user.email)[:5]
-        dashboard_data['recent_donations'] = donations.count()
-        dashboard_data['total_donated'] = sum(d.amount for d in donations if d.status == 'completed')
+        from donations.models import DonorProfile
+        from donations.serializers import DonorProfileSerializer
+        profile = DonorProfile.objects.filter(pk=DonorProfile.normalize_email(user.email)).first()
+        dashboard_data['donor_profile'] = DonorProfileSerializer(profile).data if profile else None
+        dashboard_data['donations_count'] = profile.donations_count if profile else 0
+        dashboard_data['total_donated'] = profile.total_donated if profile else 0
     
     elif user.user_type == 'volunteer':
         from donations.models import Volunteer
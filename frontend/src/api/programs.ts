@@ -7,7 +7,8 @@ export interface Programs {
   slug: string;
   program_type: string;
   short_description: string;
-  full_description: string;
+  // Omitted by the programs list unless requested with ?include=description
+  full_description?: string;
   image: string;
   icon: string;
   color: string;